@@ -0,0 +1,198 @@
+"""
+async_extraction.py
+
+Concurrent OpenAI request engine used by the structurer scripts.
+- `TokenBucket`: refilling budget for requests-per-minute and tokens-per-minute quotas
+- `AsyncExtractor`: rate-limited, retrying ChatCompletion calls with a bounded number in flight,
+  recording latency, retries, rate-limit waits and token usage in a `PipelineMetrics`
+
+Point `openai.api_base` (or OPENAI_API_BASE) at `fake_openai_server.py` to run it locally.
+
+`openai` and `aiohttp` (~0.3s to import) are only imported once there is a request to send,
+so runs answered entirely by the checkpoint, prefilter, local model or cache never load them.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+
+from extraction_prompt import estimate_tokens
+from pipeline_metrics import PipelineMetrics
+
+# Retried with exponential backoff; anything else (bad request, auth) fails straight away
+RETRYABLE_ERRORS = ("RateLimitError", "ServiceUnavailableError", "Timeout", "APIConnectionError", "TryAgain")
+
+
+def is_retryable(exc: Exception) -> bool:
+    from openai import error as openai_error
+
+    if isinstance(exc, tuple(getattr(openai_error, name) for name in RETRYABLE_ERRORS)):
+        return True
+    if isinstance(exc, openai_error.APIError):
+        status = exc.http_status
+        return status is None or status >= 500
+    return isinstance(exc, asyncio.TimeoutError)
+
+
+def retry_after_seconds(exc: Exception):
+    headers = getattr(exc, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def iter_async(items):
+    for item in items:
+        yield item
+
+
+class TokenBucket:
+    """Budget of `capacity` units refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        # The lock keeps waiters FIFO so one large request is not starved by small ones
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.level < amount:
+                await asyncio.sleep((amount - self.level) / self.rate)
+                self._refill()
+            self.level -= amount
+
+    def adjust(self, amount: float):
+        # Charge (or refund) the difference once real usage is known; may go negative
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class AsyncExtractor:
+    """Rate-limited, retrying ChatCompletion client with a concurrency cap."""
+
+    def __init__(
+        self,
+        model: str = "gpt-3.5-turbo",
+        temperature: float = 0,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 3500,
+        tokens_per_minute: int = 90000,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        completion_tokens: int = 250,
+        request_timeout: float = 60.0,
+        metrics: PipelineMetrics = None,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens = completion_tokens
+        self.request_timeout = request_timeout
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.metrics = metrics if metrics is not None else PipelineMetrics(model)
+
+    def backoff_delay(self, attempt: int, exc: Exception = None) -> float:
+        hinted = retry_after_seconds(exc) if exc is not None else None
+        if hinted is not None:
+            return hinted
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def chat(self, messages: list, completion_tokens: int = None, kind: str = "single") -> str:
+        import openai
+
+        expected = completion_tokens if completion_tokens is not None else self.completion_tokens
+        estimated = sum(estimate_tokens(m["content"]) for m in messages) + expected
+        metrics = self.metrics
+        for attempt in range(self.max_retries + 1):
+            waited = time.perf_counter()
+            await self.requests.acquire(1)
+            await self.tokens.acquire(estimated)
+            started = time.perf_counter()
+            metrics.inc("llm_throttle_seconds_total", started - waited)
+            try:
+                response = await openai.ChatCompletion.acreate(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    request_timeout=self.request_timeout,
+                )
+            except Exception as e:
+                metrics.observe("llm_request_seconds", time.perf_counter() - started, kind=kind)
+                metrics.inc("llm_request_errors_total", kind=kind, reason=type(e).__name__)
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                metrics.inc("llm_retries_total", kind=kind, reason=type(e).__name__)
+                await asyncio.sleep(self.backoff_delay(attempt, e))
+                continue
+
+            metrics.observe("llm_request_seconds", time.perf_counter() - started, kind=kind)
+            metrics.inc("llm_requests_total", kind=kind)
+            usage = response.get("usage") or {}
+            if "total_tokens" in usage:
+                self.tokens.adjust(usage["total_tokens"] - estimated)
+                metrics.tokens(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+            else:
+                metrics.tokens(estimated - expected, expected)
+            return response.choices[0].message["content"].strip()
+
+    async def map(self, items, fn, on_result):
+        """Run `await fn(item)` over `items` with at most `max_concurrency` in flight.
+
+        `items` may be a lazy iterator or an async iterator; it is consumed only a little ahead
+        of the workers. `on_result(item, result)` is called as each call finishes (completion order);
+        if it returns an awaitable, the worker awaits it before taking the next item.
+        """
+        queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        done = object()
+        # Nothing to send (e.g. an incremental run with every tweet already answered):
+        # skip the HTTP client altogether
+        items = aiter(items) if hasattr(items, "__aiter__") else iter_async(items)
+        first = await anext(items, done)
+        if first is done:
+            return
+
+        async def producer():
+            await queue.put(first)
+            async for item in items:
+                await queue.put(item)
+            for _ in range(self.max_concurrency):
+                await queue.put(done)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                handled = on_result(item, await fn(item))
+                if inspect.isawaitable(handled):
+                    await handled
+
+        import aiohttp
+        import openai
+
+        # Reuse one HTTP connection pool for every request in the run
+        async with aiohttp.ClientSession() as session:
+            token = openai.aiosession.set(session)
+            try:
+                await asyncio.gather(producer(), *(worker() for _ in range(self.max_concurrency)))
+            finally:
+                openai.aiosession.reset(token)
@@ -0,0 +1,112 @@
+"""
+checkpoint_log.py
+
+Append-only JSONL write-ahead log for structurer runs.
+- `CheckpointLog.append`: one line per finished tweet, flushed and fsync'd before returning;
+  `append_many` writes several with a single fsync
+- `replay`: streams records back without loading the whole log
+- `compact`: writes the deduplicated final CSV (last record per Tweet_ID wins)
+
+A run killed mid-write leaves at most one partial last line, which `replay` skips.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+
+def _json_default(value):
+    # numpy scalars (e.g. Tweet_ID read by pandas as int64) -> plain Python
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CheckpointLog:
+    """Durable append-only log of extraction records."""
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record: dict):
+        self.append_many([record])
+
+    def append_many(self, records: list):
+        self._file.write("".join(
+            json.dumps(record, ensure_ascii=False, default=_json_default) + "\n" for record in records
+        ))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(path: str):
+    """Yield every complete record in the log, oldest first."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Torn final write from a crash; that tweet simply gets redone
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def done_ids(path: str) -> set:
+    return {record["Tweet_ID"] for record in replay(path)}
+
+
+def import_csv_checkpoint(csv_path: str, log_path: str) -> int:
+    """One-off migration of an old full-rewrite CSV checkpoint into the log."""
+    count = 0
+    with CheckpointLog(log_path, fsync=False) as log:
+        for chunk in pd.read_csv(csv_path, chunksize=10000):
+            for record in chunk.to_dict(orient="records"):
+                log.append(record)
+                count += 1
+    return count
+
+
+def compact(log_path: str, output_csv: str, chunk_size: int = 10000) -> int:
+    """Write the last record per Tweet_ID to `output_csv`, streaming in chunks."""
+    # First pass remembers only which line holds each ID's latest record, plus the
+    # union of fields so every chunk is written with the same columns
+    latest, columns = {}, {}
+    for i, record in enumerate(replay(log_path)):
+        latest[record["Tweet_ID"]] = i
+        columns.update(dict.fromkeys(record))
+    columns = list(columns)
+
+    written, chunk = 0, []
+
+    def flush():
+        pd.DataFrame(chunk, columns=columns).to_csv(
+            output_csv, mode="a" if written else "w", header=not written, index=False
+        )
+
+    for i, record in enumerate(replay(log_path)):
+        if latest.get(record["Tweet_ID"]) != i:
+            continue
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            flush()
+            written, chunk = written + len(chunk), []
+    if chunk or not written:
+        flush()
+        written += len(chunk)
+    return written
@@ -0,0 +1,396 @@
+"""
+entity_resolution.py
+
+Maps extracted player and club names to canonical ids, replacing the offline market-value join.
+- Clubs: alias table in `data/entity_aliases.json` ("Man United" -> manchester-united)
+- Players: matched against a roster CSV (player_id, name, current_club_name,
+  market_value_eur, position — a Transfermarkt `players.csv` works as-is)
+- Exact lookups are dict hits; everything else goes through a token index and a character
+  trigram blocking index, so a name is only compared with the few roster entries that
+  share its rarest trigrams, never with the whole roster
+- `default_clubs()` gives every caller its own resolver (one per call of
+  `canonical_club_names`), so concurrent dashboard sessions never share learned clubs
+- A club only matches a spelling variant when every word has a counterpart: "Sporting KC"
+  is not Sporting CP, and reserve sides ("Barcelona B", "Bayern II", "Chelsea U21") are not
+  their first team; those need an alias
+- Only distinct (player, from, to) combinations are resolved, and resolutions are kept in
+  a cache file: a rerun only resolves names it has not seen (until the roster or aliases change)
+
+Usage:
+    python scripts/entity_resolution.py data/transfer_rumors_with_tags_and_bins.csv -o resolved.csv
+    python scripts/entity_resolution.py --build-roster data/transfer_rumors_with_tags_and_bins.csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+ALIASES_FILE = os.path.join(DATA_DIR, "entity_aliases.json")
+ROSTER_FILE = os.path.join(DATA_DIR, "player_roster.csv")
+RESOLUTION_CACHE_FILE = "entity_resolution_cache.json"
+# Bump when matching rules change, so cached resolutions are redone
+MATCHER_VERSION = 2
+
+ROSTER_COLUMNS = ["player_id", "name", "current_club_name", "market_value_eur", "position"]
+# (player, from club, to club) in dashboard and structurer outputs
+COLUMN_SETS = [("player", "origin_club", "destination_club"), ("Player", "From_Club", "To_Club")]
+
+CLUB_MATCH_THRESHOLD = 0.8
+# Words of a fuzzy club match that differ must be this close to a word of the other name
+CLUB_WORD_THRESHOLD = 0.6
+PLAYER_MATCH_THRESHOLD = 0.8
+
+TRANSLITERATE = str.maketrans({"ø": "o", "ß": "ss", "æ": "ae", "œ": "oe", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i"})
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+# Words that don't tell clubs apart ("Southampton FC", "Real Madrid Club de Fútbol")
+CLUB_FILLER = {"fc", "cf", "afc", "sc", "sk", "club", "football", "futbol", "futebol", "fussball", "de", "do", "the", "and"}
+# A closing single letter that names a reserve side ("Barcelona B", "Real Madrid C")
+RESERVE_LETTERS = {"b", "c"}
+
+
+def normalize_name(text) -> str:
+    text = str(text).lower().translate(TRANSLITERATE)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(NON_ALNUM_RE.sub(" ", text).split())
+
+
+def club_key(text) -> str:
+    normalized = normalize_name(text)
+    words = normalized.split()
+    # Single letters are left over from "S.A.D.", "S.p.A." and the like, except a reserve
+    # side's last word
+    last = len(words) - 1
+    tokens = [
+        t for i, t in enumerate(words)
+        if t not in CLUB_FILLER and (len(t) > 1 or (i == last > 0 and t in RESERVE_LETTERS))
+    ]
+    return " ".join(tokens) or normalized
+
+
+def clean_name(text):
+    # Lowercased display form, as in the `player_clean` / `name_clean` columns
+    return " ".join(str(text).lower().split()) if pd.notna(text) else None
+
+
+def slugify(key: str) -> str:
+    return key.replace(" ", "-")
+
+
+def trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 1.0
+
+
+def same_words(key: str, other: str) -> bool:
+    """Every word only one of the two club keys has is a near-spelling of a word of the other."""
+    words, other_words = set(key.split()), set(other.split())
+    only, other_only = words - other_words, other_words - words
+
+    def close(word, candidates):
+        return any(dice(trigrams(word), trigrams(c)) >= CLUB_WORD_THRESHOLD for c in candidates)
+
+    return all(close(w, other_only) for w in only) and all(close(w, only) for w in other_only)
+
+
+def load_aliases(path: str = ALIASES_FILE) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class NgramIndex:
+    """Character trigram blocking index over normalized keys."""
+
+    def __init__(self, probes: int = 6, max_block: int = 2000, max_candidates: int = 50):
+        self.probes = probes
+        self.max_block = max_block
+        self.max_candidates = max_candidates
+        self.grams = {}
+        self.postings = defaultdict(list)
+
+    def add(self, key: str):
+        if key in self.grams:
+            return
+        grams = trigrams(key)
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings[gram].append(key)
+
+    def search(self, key: str, threshold: float) -> list:
+        """[(dice score, key)] at or above `threshold`, best first."""
+        grams = trigrams(key)
+        # Probe only the rarest grams; very common ones ("an ", " ma") would pull in half the roster
+        known = sorted((g for g in grams if g in self.postings), key=lambda g: len(self.postings[g]))
+        hits = Counter()
+        for gram in known[:self.probes]:
+            if len(self.postings[gram]) <= self.max_block:
+                hits.update(self.postings[gram])
+
+        matches = []
+        for candidate, _ in hits.most_common(self.max_candidates):
+            score = dice(grams, self.grams[candidate])
+            if score >= threshold:
+                matches.append((score, candidate))
+        return sorted(matches, reverse=True)
+
+
+class ClubResolver:
+    """Club name -> canonical club id (a slug of the canonical name)."""
+
+    def __init__(self, aliases: dict = None):
+        self.names = {}
+        self.by_key = {}
+        self.grams = NgramIndex()
+        aliases = load_aliases()["clubs"] if aliases is None else aliases
+        for name, others in aliases.items():
+            club_id = slugify(club_key(name))
+            self.names[club_id] = name
+            for alias in [name, *others]:
+                self.add(club_key(alias), club_id)
+
+    def add(self, key: str, club_id: str):
+        self.by_key[key] = club_id
+        self.grams.add(key)
+
+    def resolve(self, raw):
+        if pd.isna(raw) or not str(raw).strip():
+            return None
+        key = club_key(raw)
+        club_id = self.by_key.get(key)
+        if club_id is not None:
+            return club_id
+
+        # Close spellings only: a word with no counterpart ("KC" vs "CP", a reserve "B") is
+        # another club, however similar the rest of the name
+        matches = [(score, k) for score, k in self.grams.search(key, CLUB_MATCH_THRESHOLD) if same_words(key, k)]
+        ids = {self.by_key[k] for score, k in matches if score == matches[0][0]} if matches else set()
+        if len(ids) == 1:
+            club_id = ids.pop()
+        else:
+            # An unknown club becomes its own entry, so its later spellings resolve to it too
+            club_id = slugify(key)
+            self.names.setdefault(club_id, str(raw).strip())
+        self.add(key, club_id)
+        return club_id
+
+    def name(self, club_id):
+        return self.names.get(club_id) if club_id is not None else None
+
+
+class PlayerResolver:
+    """Player name (+ the clubs in the rumor) -> roster player_id."""
+
+    def __init__(self, roster: pd.DataFrame, clubs: ClubResolver, aliases: dict = None):
+        self.clubs = clubs
+        self.key_of = {}
+        self.club_of = {}
+        self.value_of = {}
+        self.by_key = defaultdict(list)
+        self.by_token = defaultdict(list)
+        self.grams = NgramIndex()
+        aliases = load_aliases()["players"] if aliases is None else aliases
+        self.aliases = {normalize_name(k): normalize_name(v) for k, v in aliases.items()}
+        for row in roster.itertuples(index=False):
+            self.add(row.player_id, row.name, row.current_club_name, row.market_value_eur)
+
+    def add(self, player_id, name, club=None, market_value=None):
+        key = normalize_name(name)
+        if not key or player_id in self.key_of:
+            return
+        self.key_of[player_id] = key
+        self.club_of[player_id] = self.clubs.resolve(club)
+        self.value_of[player_id] = market_value if pd.notna(market_value) else 0
+        self.by_key[key].append(player_id)
+        for token in set(key.split()):
+            self.by_token[token].append(player_id)
+        self.grams.add(key)
+
+    def candidates(self, key: str):
+        """(player ids, exact?) for a normalized name."""
+        key = self.aliases.get(key, key)
+        if key in self.by_key:
+            return self.by_key[key], True
+
+        # Partial names ("Højlund", "Kana Biyik"): every given word appears in the roster name
+        tokens = key.split()
+        rarest = min(tokens, key=lambda t: len(self.by_token.get(t, ())))
+        partial = [pid for pid in self.by_token.get(rarest, ()) if set(tokens) <= set(self.key_of[pid].split())]
+        if partial:
+            return partial, False
+
+        # Spelling variants ("Dusan Vlahović" / "Dušan Vlahović" already match after normalizing)
+        matches = self.grams.search(key, PLAYER_MATCH_THRESHOLD)
+        best = [k for score, k in matches if score == matches[0][0]] if matches else []
+        return [pid for k in best for pid in self.by_key[k]], False
+
+    def resolve(self, raw, club_ids=()):
+        if pd.isna(raw) or not normalize_name(raw):
+            return None
+        ids, exact = self.candidates(normalize_name(raw))
+        if len(ids) > 1:
+            # Namesakes / partial names: prefer whoever plays for a club in the rumor
+            at_club = [pid for pid in ids if self.club_of[pid] is not None and self.club_of[pid] in club_ids]
+            if at_club:
+                ids = at_club
+        if len(ids) == 1:
+            return ids[0]
+        if ids and exact:
+            # Same full name, no club evidence: the better-known player
+            return max(ids, key=lambda pid: self.value_of[pid])
+        return None
+
+
+def load_roster(path: str = ROSTER_FILE) -> pd.DataFrame:
+    roster = pd.read_csv(path).rename(columns={"market_value_in_eur": "market_value_eur"})
+    for col in ROSTER_COLUMNS:
+        if col not in roster.columns:
+            roster[col] = None
+    roster = roster.dropna(subset=["player_id", "name"]).drop_duplicates("player_id")
+    roster["player_id"] = roster["player_id"].astype("int64")
+    return roster[ROSTER_COLUMNS]
+
+
+def build_roster(joined_csv: str, path: str = ROSTER_FILE) -> int:
+    """Seed a roster from a file that already carries the joined player columns."""
+    df = pd.read_csv(joined_csv)
+    roster = df.dropna(subset=["player_id", "name"])[ROSTER_COLUMNS].drop_duplicates("player_id")
+    roster["player_id"] = roster["player_id"].astype("int64")
+    roster.sort_values("player_id").to_csv(path, index=False)
+    return len(roster)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EntityResolver:
+    """Club and player resolution for whole rumor tables, with a persistent resolution cache."""
+
+    def __init__(self, roster_path: str = ROSTER_FILE, aliases_path: str = ALIASES_FILE,
+                 cache_path: str = RESOLUTION_CACHE_FILE):
+        aliases = load_aliases(aliases_path)
+        roster = load_roster(roster_path)
+        self.clubs = ClubResolver(aliases["clubs"])
+        self.players = PlayerResolver(roster, self.clubs, aliases["players"])
+        self.roster = roster.set_index("player_id")
+        self.cache_path = cache_path
+        self.signature = f"{MATCHER_VERSION}:{_file_digest(roster_path)}:{_file_digest(aliases_path)}"
+        self.resolved = {}
+        self.new = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            # A changed roster or alias table invalidates every cached answer
+            if cached.get("signature") == self.signature:
+                self.resolved = cached["players"]
+                for key, (club_id, name) in cached["clubs"].items():
+                    self.clubs.names.setdefault(club_id, name)
+                    self.clubs.add(key, club_id)
+
+    def resolve_player(self, raw, club_ids) -> int:
+        memo_key = "|".join([normalize_name(raw), *sorted(c for c in club_ids if isinstance(c, str))])
+        if memo_key not in self.resolved:
+            self.resolved[memo_key] = self.players.resolve(raw, club_ids)
+            self.new += 1
+        return self.resolved[memo_key]
+
+    def resolve_table(self, df: pd.DataFrame) -> pd.DataFrame:
+        player_col, from_col, to_col = next(
+            cols for cols in COLUMN_SETS if all(c in df.columns for c in cols)
+        )
+        out = df.copy()
+        for col in (from_col, to_col):
+            raw = out[col].astype(object)
+            ids = raw.map({value: self.clubs.resolve(value) for value in raw.dropna().unique()})
+            out[col + "_raw"] = raw
+            out[col + "_id"] = ids
+            out[col] = ids.map(self.clubs.names)
+
+        # One resolution per distinct (player, from, to)
+        keys = pd.MultiIndex.from_arrays([out[player_col].astype(object), out[from_col + "_id"], out[to_col + "_id"]])
+        codes, uniques = keys.factorize()
+        player_ids = [
+            self.resolve_player(player, (from_id, to_id)) if pd.notna(player) else None
+            for player, from_id, to_id in uniques
+        ]
+        out["player_clean"] = out[player_col].map(clean_name)
+        out["player_id"] = pd.array([player_ids[c] if c >= 0 else None for c in codes], dtype="Int64")
+
+        matched = self.roster.reindex(out["player_id"].astype("float64"))
+        for col in ["name", "market_value_eur", "current_club_name", "position"]:
+            out[col] = matched[col].to_numpy()
+        out["name_clean"] = out["name"].map(clean_name)
+        return out
+
+    def save(self):
+        if not self.cache_path:
+            return
+        clubs = {key: [club_id, self.clubs.names.get(club_id)] for key, club_id in self.clubs.by_key.items()}
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": self.signature, "clubs": clubs, "players": self.resolved}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+
+@lru_cache(maxsize=1)
+def default_club_aliases() -> dict:
+    # Read once per process; never modified
+    return load_aliases()["clubs"]
+
+
+def default_clubs() -> ClubResolver:
+    """A new resolver over the alias table (~5 ms). Unknown clubs it learns stay with its
+    owner, so results never depend on what another caller or thread resolved first."""
+    return ClubResolver(default_club_aliases())
+
+
+def canonical_club_names(values: pd.Series) -> pd.Series:
+    """Canonical club names for a column of raw club strings (one lookup per distinct value)."""
+    clubs = default_clubs()
+    raw = values.astype(object)
+    names = {value: clubs.name(clubs.resolve(value)) for value in raw.dropna().unique()}
+    return raw.map(names).astype("category")
+
+
+def resolve_file(input_csv: str, output_csv: str, roster_path: str = ROSTER_FILE,
+                 cache_path: str = RESOLUTION_CACHE_FILE):
+    resolver = EntityResolver(roster_path, cache_path=cache_path)
+    out = resolver.resolve_table(pd.read_csv(input_csv))
+    out.to_csv(output_csv, index=False)
+    resolver.save()
+    named = out["player_clean"].notna()
+    print(f"✅ {output_csv}: {out.loc[named, 'player_id'].notna().sum()}/{named.sum()} players matched, "
+          f"{resolver.new} new names resolved ({len(resolver.resolved) - resolver.new} from cache)")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve player and club names to canonical ids")
+    parser.add_argument("input", help="structured rumor CSV")
+    parser.add_argument("-o", "--output", help="output CSV (default: <input>_resolved.csv)")
+    parser.add_argument("--roster", default=ROSTER_FILE)
+    parser.add_argument("--cache", default=RESOLUTION_CACHE_FILE)
+    parser.add_argument("--build-roster", action="store_true",
+                        help="seed --roster from the joined player columns of INPUT instead")
+    args = parser.parse_args()
+
+    if args.build_roster:
+        print(f"✅ {build_roster(args.input, args.roster)} players written to {args.roster}")
+    else:
+        resolve_file(args.input, args.output or os.path.splitext(args.input)[0] + "_resolved.csv",
+                     args.roster, args.cache)
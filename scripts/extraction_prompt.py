@@ -0,0 +1,303 @@
+"""
+extraction_prompt.py
+
+Calibration prompt and output schema shared by the structurer scripts.
+- `build_messages`: one tweet per request (the original prompt)
+- `build_batch_messages`: N tweets per request, answered as a JSON array keyed by Tweet_ID
+- `plan_batches`: packs tweets into batches that fit a token budget
+- `estimate_tokens`: rough token count, also used by async_extraction.py for the TPM budget
+
+Bump PROMPT_VERSION whenever RULES or the field list change.
+"""
+
+import json
+import re
+
+PROMPT_VERSION = "v1.5"
+
+SYSTEM_MESSAGE = "You extract structured football transfer info from tweets."
+
+INTRO = "You're a football transfer analyst. Your job is to extract structured data from a tweet and assess whether a specific player transfer is likely to happen."
+
+RULES = """1. If the tweet is about a **coach or manager** appointment (e.g. "X joins Sevilla as new head coach"), do NOT extract any data. Return all fields as null or false. Set LooksLikeMove_LLM to false.
+
+2. Use the following examples as calibration:
+
+[
+  {
+    "Tweet": "Manchester City have contacted Benfica for João Neves.",
+    "Status": "Contact",
+    "Certainty_Score": 0.5
+  },
+  {
+    "Tweet": "Chelsea are in advanced talks with Brighton for Caicedo.",
+    "Status": "Agreement",
+    "Certainty_Score": 0.7
+  },
+  {
+    "Tweet": "Here we go! Declan Rice joins Arsenal — £105m deal agreed.",
+    "Status": "Here we go",
+    "Certainty_Score": 1.0
+  },
+  {
+    "Tweet": "Tottenham appreciate Conor Gallagher but no talks yet.",
+    "Status": "Link",
+    "Certainty_Score": 0.3
+  },
+  {
+    "Tweet": "Liverpool want João Palhinha, deal depends on outgoings.",
+    "Status": "Link",
+    "Certainty_Score": 0.4
+  },
+  {
+    "Tweet": "PSG have submitted a bid for Kvaratskhelia.",
+    "Status": "Bid",
+    "Certainty_Score": 0.6
+  },
+  {
+    "Tweet": "Barça president Laporta: 'We want Ansu Fati back but it’s up to the coach.'",
+    "Status": "Link",
+    "Certainty_Score": 0.3
+  }
+]
+
+3. Calibrate scores carefully:
+- Certainty_Score should reflect the **likelihood that the specific transfer will happen**, based on this tweet alone.
+- Only ~15–25% of all transfer rumors lead to completed moves. Use this prior when assigning scores.
+- Do not base scores solely on tweet phrasing or tone. Focus on substance.
+
+4. Club guessing guidance:
+- If the tweet does not name a From_Club or To_Club but one can be **reasonably inferred**, you must guess it.
+- Always fill From_Club_Guess and To_Club_Guess using public football knowledge, even if unsure.
+- If truly impossible to guess, return "Unknown" (not null), but this should be rare.
+
+Examples of guessing behavior:
+
+{
+  "Tweet": "Pep Guardiola on Mohamed Salah: 'He’s a top player, and of course he’d improve any team.'",
+  "Status": "Link",
+  "From_Club": "Liverpool",
+  "To_Club": null,
+  "From_Club_Guess": "Liverpool",
+  "To_Club_Guess": "Manchester City",
+  "Certainty_Score": 0.3
+},
+{
+  "Tweet": "Barcelona have made contact with João Cancelo, but no talks yet with Man City.",
+  "Status": "Contact",
+  "From_Club": "Manchester City",
+  "To_Club": "Barcelona",
+  "From_Club_Guess": "Manchester City",
+  "To_Club_Guess": "Barcelona",
+  "Certainty_Score": 0.5
+}
+"""
+
+FIELDS = """- Player: Full name of the player, or null
+- From_Club: Exact club stated in the tweet, or null
+- To_Club: Exact club stated in the tweet, or null
+- Status: One of ["Link", "Contact", "Bid", "Agreement", "Here we go", "Deal off", null]
+- Certainty_Score: float from 0.0 to 1.0 based on calibrated judgment
+- LooksLikeMove_LLM: true if this tweet is plausibly about a player transfer, false otherwise
+- From_Club_Guess: best guess at origin club, or "Unknown"
+- To_Club_Guess: best guess at destination club, or "Unknown"
+"""
+
+STATUSES = ["Link", "Contact", "Bid", "Agreement", "Here we go", "Deal off"]
+STATUS_NAMES = {status.casefold(): status for status in STATUSES}
+
+# Rough completion size of one JSON record, used to size batches
+RECORD_TOKENS = 90
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; good enough for budgeting
+    return len(text) // 4 + 1
+
+
+def default_record() -> dict:
+    return {
+        "Player": None,
+        "From_Club": None,
+        "To_Club": None,
+        "Status": None,
+        "Certainty_Score": 0.0,
+        "LooksLikeMove_LLM": False,
+        "From_Club_Guess": "Unknown",
+        "To_Club_Guess": "Unknown"
+    }
+
+
+def build_messages(tweet_text: str) -> list:
+    prompt = f"""
+{INTRO}
+
+Tweet:
+'''{tweet_text}'''
+
+Follow these rules carefully:
+
+{RULES}
+Return ONLY valid JSON with these fields:
+{FIELDS}
+Only respond with the JSON object. No explanation or commentary.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def build_batch_messages(tweets: list) -> list:
+    """`tweets` is a list of (tweet_id, tweet_text) pairs."""
+    listing = "\n\n".join(f"Tweet_ID: {tweet_id}\n'''{text}'''" for tweet_id, text in tweets)
+    prompt = f"""
+{INTRO}
+
+Each of the following {len(tweets)} tweets is independent. Apply the rules to each one separately.
+
+{listing}
+
+Follow these rules carefully:
+
+{RULES}
+Return ONLY a valid JSON array with exactly one object per tweet, in any order. Each object must have "Tweet_ID" (copied exactly as given above) plus these fields:
+{FIELDS}
+Only respond with the JSON array. No explanation or commentary.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_llm_content(content: str, metrics=None):
+    """The validated record in a single-tweet reply, or None if there isn't one.
+
+    JSON that isn't a record of the output schema (an array, a scalar, wrong field types)
+    is rejected like unparseable text, so callers fall back instead of storing it.
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group())
+        except json.JSONDecodeError:
+            return None
+        # Prose around the JSON object; counted so prompt regressions show up
+        if metrics is not None:
+            metrics.inc("llm_json_repairs_total", kind="single")
+    record = validate_record(data)
+    if record is None and metrics is not None:
+        metrics.inc("llm_invalid_records_total", kind="single")
+    return record
+
+
+def validate_record(obj):
+    """Return a clean copy of `obj` if it matches the output schema, else None."""
+    if not isinstance(obj, dict):
+        return None
+    record = default_record()
+    if any(field not in obj for field in record):
+        return None
+
+    for field in ("Player", "From_Club", "To_Club"):
+        if obj[field] is not None and not isinstance(obj[field], str):
+            return None
+        record[field] = obj[field]
+    # Rule 1 asks for all-null records on coach news, so null guesses/scores are allowed
+    for field in ("From_Club_Guess", "To_Club_Guess"):
+        if obj[field] is not None and not isinstance(obj[field], str):
+            return None
+        record[field] = obj[field] or "Unknown"
+
+    # Models vary the case and spacing ("Here We Go", "deal off "); keep the canonical spelling
+    status = obj["Status"]
+    if status is not None:
+        if not isinstance(status, str):
+            return None
+        status = STATUS_NAMES.get(" ".join(status.split()).casefold())
+        if status is None:
+            return None
+    record["Status"] = status
+
+    score = obj["Certainty_Score"] if obj["Certainty_Score"] is not None else 0.0
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0.0 <= score <= 1.0:
+        return None
+    record["Certainty_Score"] = float(score)
+
+    if obj["LooksLikeMove_LLM"] is not None and not isinstance(obj["LooksLikeMove_LLM"], bool):
+        return None
+    record["LooksLikeMove_LLM"] = bool(obj["LooksLikeMove_LLM"])
+    return record
+
+
+def parse_batch_content(content: str, tweet_ids: list, metrics=None) -> dict:
+    """Map Tweet_ID -> validated record for every element that parsed cleanly.
+
+    IDs that are missing, duplicated or fail validation are left out so the caller
+    can retry just those tweets one at a time.
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        match = re.search(r"\[.*\]", content, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group())
+        except json.JSONDecodeError:
+            return {}
+        if metrics is not None:
+            metrics.inc("llm_json_repairs_total", kind="batch")
+    if not isinstance(data, list):
+        return {}
+
+    # IDs are compared as strings: the model may echo numeric IDs either way
+    wanted = {str(tweet_id): tweet_id for tweet_id in tweet_ids}
+    parsed, seen = {}, set()
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        key = str(item.get("Tweet_ID"))
+        if key not in wanted:
+            continue
+        if key in seen:
+            parsed.pop(wanted[key], None)
+            continue
+        seen.add(key)
+        record = validate_record(item)
+        if record is not None:
+            parsed[wanted[key]] = record
+    return parsed
+
+
+def batch_overhead_tokens() -> int:
+    return estimate_tokens(SYSTEM_MESSAGE) + estimate_tokens(INTRO + RULES + FIELDS) + 100
+
+
+def plan_batches(tweets, token_budget: int = 12000, max_batch_size: int = 25):
+    """Greedily pack (item, tweet_text) pairs into batches, yielding lists of pairs.
+
+    Each batch's prompt + expected completion stays under `token_budget`, so long
+    tweets produce smaller batches and short ones larger batches. `tweets` can be a
+    lazy iterator; batches are yielded as soon as they fill up.
+    """
+    overhead = batch_overhead_tokens()
+    current, used = [], overhead
+    for item, text in tweets:
+        cost = estimate_tokens(str(text)) + 15 + RECORD_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_batch_size):
+            yield current
+            current, used = [], overhead
+        current.append((item, text))
+        used += cost
+    if current:
+        yield current
+
+
+def batch_completion_tokens(batch: list) -> int:
+    return RECORD_TOKENS * len(batch) + 20
@@ -0,0 +1,128 @@
+"""
+fake_openai_server.py
+
+Local stand-in for the OpenAI ChatCompletion endpoint, for exercising the structurer
+without spending API credit.
+
+Usage:
+    python scripts/fake_openai_server.py --port 8787 --latency 0.2 --error-rate 0.05
+    export OPENAI_API_BASE=http://127.0.0.1:8787/v1 OPENAI_API_KEY=sk-fake
+
+Every request gets a canned extraction record back. With --error-rate > 0 a share of
+requests fail with 429 or 500 so retry/backoff paths get exercised too.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+from aiohttp import web
+
+NULL_RECORD = {
+    "Player": None,
+    "From_Club": None,
+    "To_Club": None,
+    "Status": None,
+    "Certainty_Score": 0.0,
+    "LooksLikeMove_LLM": False,
+    "From_Club_Guess": "Unknown",
+    "To_Club_Guess": "Unknown"
+}
+
+
+def canned_reply(messages: list) -> str:
+    # Batch prompts list their tweets as "Tweet_ID: <id>" and expect a JSON array back
+    prompt = messages[-1].get("content", "") if messages else ""
+    tweet_ids = re.findall(r"^Tweet_ID: (\S+)$", prompt, flags=re.MULTILINE)
+    if tweet_ids:
+        return json.dumps([{"Tweet_ID": tweet_id, **NULL_RECORD} for tweet_id in tweet_ids])
+    return json.dumps(NULL_RECORD)
+
+
+def fake_completion(content: str, model: str, prompt_chars: int) -> dict:
+    prompt_tokens = prompt_chars // 4 + 1
+    completion_tokens = len(content) // 4 + 1
+    return {
+        "id": f"chatcmpl-fake-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def make_app(latency: float = 0.0, error_rate: float = 0.0, responder=None) -> web.Application:
+    """Build the fake API. `responder(messages) -> str` overrides the canned reply."""
+    stats = {"requests": 0, "errors": 0}
+
+    async def chat_completions(request):
+        stats["requests"] += 1
+        body = await request.json()
+        if latency:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * latency)
+
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            status = random.choice([429, 500])
+            error = {"error": {"message": "Injected failure", "type": "fake_error", "code": status}}
+            headers = {"Retry-After": "0.1"} if status == 429 else {}
+            return web.json_response(error, status=status, headers=headers)
+
+        messages = body.get("messages", [])
+        content = (responder or canned_reply)(messages)
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        return web.json_response(fake_completion(content, body.get("model", "gpt-3.5-turbo"), prompt_chars))
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def serve_in_thread(latency: float = 0.0, error_rate: float = 0.0, responder=None,
+                    host: str = "127.0.0.1", port: int = 0):
+    """Run the fake API on a daemon thread (port 0 picks a free one); returns (api_base, stats)."""
+    app = make_app(latency, error_rate, responder)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    address = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        address["port"] = runner.addresses[0][1]
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return f"http://{host}:{address['port']}/v1", app["stats"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI ChatCompletion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail with 429/500")
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency, args.error_rate), host=args.host, port=args.port)
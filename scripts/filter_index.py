@@ -0,0 +1,136 @@
+"""
+filter_index.py
+
+Precomputed indexes for the dashboard filters, built once per loaded table.
+- Inverted indexes (value -> sorted row ids) for status_bin, certainty bin,
+  speculation_flag and is_transfer_rumor
+- A club index covering origin *or* destination club, by canonical name
+- certainty_score sorted once, so a range is two binary searches
+
+`RumorIndex.query` answers a filter by intersecting these row-id sets, smallest first,
+and returns sorted row positions for `df.take`, preserving the table's original order.
+"""
+
+import numpy as np
+import pandas as pd
+
+FACET_COLUMNS = ["status_bin", "certainty_bin_label", "certainty_bin", "speculation_flag", "is_transfer_rumor"]
+# Canonical club names (rumor_views.prepare_rumors), so every spelling of a club matches
+CLUB_COLUMNS = ["origin_club_canonical", "destination_club_canonical"]
+
+
+def _postings(values: pd.Series):
+    """Return (codes, distinct values, value -> sorted row ids) for one column."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    codes = codes.astype(np.int32)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    # Missing values (code -1) sort first; skip past them
+    bounds = np.concatenate([[0], np.cumsum(counts)]) + int((codes < 0).sum())
+    uniques = list(uniques)
+    postings = {uniques[i]: order[bounds[i]:bounds[i + 1]] for i in range(len(uniques))}
+    return codes, uniques, postings
+
+
+class Facet:
+    """Inverted index over one categorical column."""
+
+    def __init__(self, values: pd.Series):
+        self.codes, self.values, self.postings = _postings(values)
+        self.has_missing = bool((self.codes < 0).any())
+
+    def covers(self, selected) -> bool:
+        # Selecting every value of a column with no gaps filters nothing
+        return not self.has_missing and set(self.postings) <= set(selected)
+
+    def rows(self, selected) -> np.ndarray:
+        # Each row has one value, so the union of postings is a plain concatenation
+        # (unsorted; `RumorIndex.query` only sorts the smallest set)
+        parts = [self.postings[v] for v in selected if v in self.postings]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def values_in(self, rows: np.ndarray) -> list:
+        codes = np.unique(self.codes[rows])
+        return sorted(self.values[c] for c in codes if c >= 0)
+
+
+def filter_frame(df: pd.DataFrame, score_range=None, club=None, **facets) -> pd.DataFrame:
+    """`RumorIndex.query` conditions as plain masks, for frames too small to index (live deltas)."""
+    mask = pd.Series(True, index=df.index)
+    if score_range is not None:
+        mask &= df["certainty_score"].between(*score_range)
+    if club is not None:
+        mask &= (df[CLUB_COLUMNS[0]] == club) | (df[CLUB_COLUMNS[1]] == club)
+    for column, selected in facets.items():
+        if selected is not None:
+            mask &= df[column].isin(selected)
+    return df[mask.fillna(False).astype(bool)]
+
+
+class RumorIndex:
+    """Read-only filter indexes over a rumor table; safe to share between sessions."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        self.facets = {col: Facet(df[col]) for col in FACET_COLUMNS if col in df.columns}
+
+        self.clubs = {}
+        for col in CLUB_COLUMNS:
+            for club, rows in _postings(df[col])[2].items():
+                self.clubs[club] = np.union1d(self.clubs[club], rows) if club in self.clubs else rows
+
+        scores = pd.to_numeric(df["certainty_score"], errors="coerce")
+        scores = scores.to_numpy(dtype=np.float32 if scores.dtype == np.float32 else float)
+        # NaN sorts last and never falls inside a range
+        self.score_order = np.argsort(scores, kind="stable")
+        self.sorted_scores = scores[self.score_order]
+
+    def score_rows(self, low: float, high: float):
+        """Unsorted row ids with low <= score <= high, or None if that is every row."""
+        # Compare at the scores' own precision, so 0.7 still matches a float32-stored 0.7
+        low, high = self.sorted_scores.dtype.type(low), self.sorted_scores.dtype.type(high)
+        lo = np.searchsorted(self.sorted_scores, low, side="left")
+        hi = np.searchsorted(self.sorted_scores, high, side="right")
+        if lo == 0 and hi == self.size:
+            return None
+        return self.score_order[lo:hi]
+
+    def club_rows(self, club) -> np.ndarray:
+        return self.clubs.get(club, np.empty(0, dtype=np.intp))
+
+    def values_in(self, column: str, rows: np.ndarray) -> list:
+        return self.facets[column].values_in(rows)
+
+    def query(self, within: np.ndarray = None, score_range=None, club=None, **facets) -> np.ndarray:
+        """Sorted row positions matching every given condition.
+
+        `facets` maps a facet column to the allowed values (like `isin`); `club` matches
+        origin or destination; `score_range` is an inclusive (low, high) pair.
+        """
+        candidates = [] if within is None else [within]
+        if score_range is not None:
+            rows = self.score_rows(*score_range)
+            if rows is not None:
+                candidates.append(rows)
+        if club is not None:
+            candidates.append(self.club_rows(club))
+        for column, selected in facets.items():
+            facet = self.facets[column]
+            if selected is not None and not facet.covers(selected):
+                candidates.append(facet.rows(selected))
+
+        if not candidates:
+            return np.arange(self.size)
+        # Sort only the smallest set, then keep its rows that are flagged in each other set
+        candidates.sort(key=len)
+        result = np.sort(candidates[0])
+        mask = np.zeros(self.size, dtype=bool)
+        for other in candidates[1:]:
+            if not len(result):
+                break
+            mask[other] = True
+            result = result[mask[result]]
+            mask[other] = False
+        return result
@@ -0,0 +1,213 @@
+"""
+live_tail.py
+
+Long-running structurer for deadline day. Watches a drop directory for raw tweet exports,
+structures only Tweet_IDs that aren't in the checkpoint log yet, and publishes new
+transfer rumors as small delta parts that open dashboards pick up within seconds.
+- Inputs: CSVs (Tweet_ID, Posted_Time, Tweet_Content) dropped into DROP_DIR; a file is
+  taken once it has stopped changing, then moved to DROP_DIR/processed/
+- Same pipeline and checkpoint log as the batch structurer (structurer/pipeline.py)
+  (prefilter → cache → batched async LLM), so batch and live runs never redo a tweet
+- Output: DELTA_DIR/part-<seq>.parquet in the v1.5 dashboard schema, flushed at least
+  every FLUSH_SECONDS while a drop is being worked through
+- Each published part is folded into the materialized views of VIEW_SOURCE (rumor_views.py),
+  so the dashboards' rollups only recompute the players and clubs it touches
+- Telemetry as in the batch structurer: METRICS_FILE snapshots, /metrics on METRICS_PORT
+- `--replay FILE` stands in for a live feed by dropping a few tweets at a time
+
+Usage:
+    python scripts/live_tail.py
+    python scripts/live_tail.py --replay "data/Fabrizio winter 2025.csv" --replay-batch 5 --replay-interval 2
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+import pandas as pd
+
+from async_extraction import AsyncExtractor
+from checkpoint_log import CheckpointLog
+from extraction_prompt import PROMPT_VERSION
+from local_classifier import LocalGate, ensure_model
+from pipeline_metrics import MetricsLog, PipelineMetrics, serve_metrics
+from prefilter import PrefilterStats
+from response_cache import ResponseCache
+from rumor_store import write_delta
+from rumor_views import ViewMaterializer
+from structurer.config import (
+    CHECKPOINT_FILE, ENTITIES_REQUIRED, MAX_CONCURRENCY, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT, MODEL,
+    PREFILTER_MODE, REQUESTS_PER_MINUTE, RESPONSE_CACHE_FILE, TEMPERATURE, TOKENS_PER_MINUTE, USE_LOCAL_MODEL
+)
+from structurer.pipeline import checkpoint_record, load_checkpoint, structure_rows
+from tweet_ingest import iter_tweets
+
+DROP_DIR = "incoming"
+DELTA_DIR = "data/live_rumors"
+POLL_SECONDS = 1.0
+# A dropped file must be this old (unchanged) before it is read
+SETTLE_SECONDS = 1.0
+FLUSH_SECONDS = 2.0
+# Dashboard table the delta parts extend; its views are kept current as parts are published
+VIEW_SOURCE = "data/fabrizio_may_to_june_structured_v1_5.csv"
+
+
+def dashboard_row(row: dict, record: dict) -> dict:
+    """One structured tweet in the v1.5 dashboard schema."""
+    def club(exact, guess):
+        return exact if exact else (guess if guess and guess != "Unknown" else None)
+
+    return {
+        "Tweet_ID": row["Tweet_ID"],
+        "Posted_Time": row.get("Posted_Time"),
+        "player": record.get("Player"),
+        "origin_club": club(record.get("From_Club"), record.get("From_Club_Guess")),
+        "destination_club": club(record.get("To_Club"), record.get("To_Club_Guess")),
+        "status": record.get("Status"),
+        "certainty_score": record.get("Certainty_Score"),
+        "is_transfer_rumor": bool(record.get("LooksLikeMove_LLM")) and bool(record.get("Player")),
+        "reason": None,
+        "tweet_text": row["Tweet_Content"],
+    }
+
+
+def ready_files(drop_dir: str) -> list:
+    if not os.path.isdir(drop_dir):
+        return []
+    cutoff = time.time() - SETTLE_SECONDS
+    paths = [os.path.join(drop_dir, name) for name in sorted(os.listdir(drop_dir)) if name.endswith(".csv")]
+    return [path for path in paths if os.path.getmtime(path) <= cutoff]
+
+
+class DeltaWriter:
+    """Buffers new dashboard rows and publishes them as delta parts."""
+
+    def __init__(self, delta_dir: str, flush_seconds: float = FLUSH_SECONDS, views: ViewMaterializer = None):
+        self.delta_dir = delta_dir
+        self.flush_seconds = flush_seconds
+        self.views = views
+        self.rows = []
+        self.flushed_at = time.monotonic()
+
+    def add(self, row: dict):
+        self.rows.append(row)
+        if time.monotonic() - self.flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        if self.rows:
+            seq = write_delta(pd.DataFrame(self.rows), self.delta_dir)
+            print(f"📡 Published {len(self.rows)} new rumors (part {seq})")
+            self.rows = []
+            if self.views is not None:
+                recomputed = self.views.refresh()
+                print(f"🧮 Views updated ({', '.join(f'{n} {name}' for name, n in recomputed.items())} keys)")
+
+
+async def tail(drop_dir: str = DROP_DIR, delta_dir: str = DELTA_DIR, poll_seconds: float = POLL_SECONDS,
+               prefilter_mode: str = PREFILTER_MODE, cache_file: str = RESPONSE_CACHE_FILE, once: bool = False):
+    """Structure files as they land in `drop_dir` until interrupted (or, with `once`, until it is empty)."""
+    done_ids = load_checkpoint()
+    processed_dir = os.path.join(drop_dir, "processed")
+    os.makedirs(processed_dir, exist_ok=True)
+
+    gate = PrefilterStats(prefilter_mode)
+    local_gate = LocalGate(ensure_model(), ENTITIES_REQUIRED) if USE_LOCAL_MODEL else None
+    cache = ResponseCache(cache_file, PROMPT_VERSION, MODEL, TEMPERATURE) if cache_file else None
+    metrics = PipelineMetrics(MODEL)
+    metrics_log = MetricsLog(metrics, METRICS_FILE, METRICS_INTERVAL)
+    metrics_server = serve_metrics(metrics, METRICS_PORT) if METRICS_PORT else None
+    # One extractor (and one event loop) for the whole run, so rate limits carry across drops
+    extractor = AsyncExtractor(
+        model=MODEL,
+        temperature=TEMPERATURE,
+        max_concurrency=MAX_CONCURRENCY,
+        requests_per_minute=REQUESTS_PER_MINUTE,
+        tokens_per_minute=TOKENS_PER_MINUTE,
+        metrics=metrics
+    )
+    views = ViewMaterializer(VIEW_SOURCE, delta_dir) if os.path.exists(VIEW_SOURCE) else None
+    writer = DeltaWriter(delta_dir, views=views)
+    print(f"👀 Watching {drop_dir}/ → {delta_dir}/ ({len(done_ids)} tweets already structured)")
+
+    with CheckpointLog(CHECKPOINT_FILE) as log:
+        def on_results(results):
+            started = time.perf_counter()
+            log.append_many([checkpoint_record(*result) for result in results])
+            metrics.observe_share("stage_seconds", time.perf_counter() - started, len(results), stage="checkpoint")
+            for row, extracted, _, _ in results:
+                done_ids.add(row["Tweet_ID"])
+                out = dashboard_row(row, extracted)
+                if out["is_transfer_rumor"]:
+                    writer.add(out)
+
+        try:
+            while True:
+                files = ready_files(drop_dir)
+                if files:
+                    await structure_rows(
+                        iter_tweets(files, skip_ids=done_ids), extractor, gate, cache, on_results,
+                        local_gate=local_gate
+                    )
+                    writer.flush()
+                    for path in files:
+                        os.replace(path, os.path.join(processed_dir, os.path.basename(path)))
+                elif once:
+                    break
+                await asyncio.sleep(poll_seconds)
+        finally:
+            writer.flush()
+            metrics_log.close()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+            print(gate.report())
+            if local_gate is not None:
+                print(local_gate.report())
+            if cache is not None:
+                print(cache.report())
+                cache.close()
+            print(metrics.report())
+
+
+def replay(source: str, drop_dir: str = DROP_DIR, batch_size: int = 5, interval: float = 2.0):
+    """Stand-in feed: drop `batch_size` tweets from `source` into `drop_dir` every `interval` seconds."""
+    os.makedirs(drop_dir, exist_ok=True)
+    batch, part = [], 0
+    for tweet in iter_tweets(source):
+        batch.append(tweet)
+        if len(batch) == batch_size:
+            part += 1
+            _drop(batch, os.path.join(drop_dir, f"replay-{part:06d}.csv"))
+            batch = []
+            time.sleep(interval)
+    if batch:
+        _drop(batch, os.path.join(drop_dir, f"replay-{part + 1:06d}.csv"))
+
+
+def _drop(tweets: list, path: str):
+    # Write then rename, so the watcher never reads half a file
+    pd.DataFrame(tweets).to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Structure new tweets continuously and publish dashboard deltas")
+    parser.add_argument("--drop-dir", default=DROP_DIR)
+    parser.add_argument("--delta-dir", default=DELTA_DIR)
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS)
+    parser.add_argument("--replay", help="raw export to feed into the drop directory a little at a time")
+    parser.add_argument("--replay-batch", type=int, default=5)
+    parser.add_argument("--replay-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.replay:
+        threading.Thread(
+            target=replay, args=(args.replay, args.drop_dir, args.replay_batch, args.replay_interval), daemon=True
+        ).start()
+    try:
+        asyncio.run(tail(args.drop_dir, args.delta_dir, args.poll))
+    except KeyboardInterrupt:
+        print("🛑 Stopped")
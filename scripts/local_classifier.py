@@ -0,0 +1,365 @@
+"""
+local_classifier.py
+
+CPU-only rumor classifier trained on the structured (LLM-labelled) data files, so confident
+tweets don't need an API call.
+- Features: hashed word unigrams and bigrams (accent-folded, see text_search.py) plus emoji
+  and currency symbols, HASH_BITS bits wide
+- Two linear softmax models: rumor vs not (`is_transfer_rumor`) and, for rumors, the status
+  bin (status_bins.py). About 0.1 ms per tweet, no dependencies beyond numpy
+- `LocalGate`: sits after the prefilter in the structurer. Tweets the model is sure are not
+  rumors get the null record locally; sure rumors still go to the LLM for player and clubs,
+  unless entities aren't needed (then they get a local record with the predicted status)
+- `evaluate`: k-fold agreement with the LLM labels and API calls saved per threshold
+
+Usage:
+    python scripts/local_classifier.py                 # train, save MODEL_FILE
+    python scripts/local_classifier.py --report benchmarks/local_classifier_eval.md
+"""
+
+import argparse
+import math
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from extraction_prompt import default_record
+from prefilter import tag_looks_like_move
+from status_bins import BIN_LABELS, bin_statuses
+from text_search import TOKEN_RE, fold
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+TRAINING_FILES = [
+    os.path.join(DATA_DIR, "fabrizio_may_to_june_structured_v1_5.csv"),
+    os.path.join(DATA_DIR, "transfer_rumors_with_tags_and_bins.csv"),
+]
+MODEL_FILE = os.path.join(DATA_DIR, "local_classifier.npz")
+
+HASH_BITS = 18
+SYMBOL_RE = re.compile(r"[^\w\s!-~]")
+EPOCHS = 300
+LEARNING_RATE = 0.05
+L2 = 1e-3
+
+# Routing thresholds on P(rumor), and the status confidence a local rumor record needs
+NOT_RUMOR_BELOW = 0.05
+RUMOR_ABOVE = 0.95
+STATUS_ABOVE = 0.8
+
+FOLDS = 5
+REPORT_THRESHOLDS = [0.01, 0.02, 0.05, 0.1, 0.2]
+
+
+def features(text) -> np.ndarray:
+    """Hashed feature ids of one tweet (a bias feature, words, word pairs, symbols)."""
+    folded = fold(text) if isinstance(text, str) else ""
+    # Same words as text_search.tokenize, without folding twice
+    words = TOKEN_RE.findall(folded)
+    grams = ["<bias>"] + words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    grams += ["sym:" + s for s in set(SYMBOL_RE.findall(folded))]
+    mask = (1 << HASH_BITS) - 1
+    ids = {zlib.crc32(g.encode("utf-8")) & mask for g in grams}
+    return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+
+def _sparse(feature_rows: list):
+    """(row starts, concatenated feature ids) for `np.add.reduceat`; every row has the bias."""
+    lengths = np.fromiter((len(f) for f in feature_rows), dtype=np.int64, count=len(feature_rows))
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    return starts, np.concatenate(feature_rows), np.repeat(np.arange(len(feature_rows)), lengths)
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    e = np.exp(scores)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class LinearModel:
+    """Multinomial logistic regression over hashed binary features."""
+
+    def __init__(self, classes: list, weights: np.ndarray):
+        self.classes = list(classes)
+        self.weights = weights
+
+    @classmethod
+    def fit(cls, feature_rows: list, labels: list, classes: list, epochs: int = EPOCHS,
+            learning_rate: float = LEARNING_RATE, l2: float = L2) -> "LinearModel":
+        """Full-batch Adam on the mean cross-entropy (plus L2) over every row."""
+        index = {c: i for i, c in enumerate(classes)}
+        y = np.array([index[label] for label in labels])
+        starts, cols, rows = _sparse(feature_rows)
+        n, k = len(feature_rows), len(classes)
+        # Train over the hashed ids that occur in training only, then scatter into the full table
+        used, cols = np.unique(cols, return_inverse=True)
+        w = np.zeros((len(used), k))
+        m, v = np.zeros_like(w), np.zeros_like(w)
+        for step in range(1, epochs + 1):
+            error = _softmax(np.add.reduceat(w[cols], starts, axis=0))
+            error[np.arange(n), y] -= 1
+            grad = np.zeros_like(w)
+            np.add.at(grad, cols, error[rows] / n)
+            grad += l2 * w
+            m = 0.9 * m + 0.1 * grad
+            v = 0.999 * v + 0.001 * grad ** 2
+            w -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        weights = np.zeros((1 << HASH_BITS, k), dtype=np.float32)
+        weights[used] = w
+        return cls(classes, weights)
+
+
+class LocalClassifier:
+    """Rumor and status-bin models plus what a local rumor record is filled with."""
+
+    def __init__(self, rumor: LinearModel, status: LinearModel, bin_defaults: dict):
+        self.rumor = rumor
+        self.status = status
+        # status bin -> (most common raw status, mean certainty) in the training data
+        self.bin_defaults = bin_defaults
+        # Both models side by side, so a prediction is one gather and one sum
+        self._table = np.hstack([rumor.weights, status.weights])
+        self._rumor_col = rumor.classes.index(True)
+
+    def predict(self, text) -> tuple:
+        """(P(rumor), most likely status bin, its probability)."""
+        scores = self._table[features(text)].sum(axis=0)
+        p_rumor = 1 / (1 + math.exp(scores[1 - self._rumor_col] - scores[self._rumor_col]))
+        status = scores[2:]
+        best = int(status.argmax())
+        return p_rumor, self.status.classes[best], float(1 / np.exp(status - status[best]).sum())
+
+    def rumor_record(self, status_bin: str) -> dict:
+        status, certainty = self.bin_defaults[status_bin]
+        return {**default_record(), "Status": status, "Certainty_Score": certainty, "LooksLikeMove_LLM": True}
+
+    @classmethod
+    def train(cls, data: pd.DataFrame, **fit_options) -> "LocalClassifier":
+        rows = [features(t) for t in data["tweet_text"]]
+        is_rumor = data["is_transfer_rumor"].tolist()
+        rumor = LinearModel.fit(rows, is_rumor, [False, True], **fit_options)
+
+        rumors = data[data["is_transfer_rumor"]]
+        bins = rumors["status_bin"].astype(str).tolist()
+        classes = [b for b in BIN_LABELS if b in set(bins)]
+        status = LinearModel.fit([rows[i] for i in np.flatnonzero(is_rumor)], bins, classes, **fit_options)
+
+        bin_defaults = {
+            b: (group["status"].mode().iloc[0] if group["status"].notna().any() else None,
+                round(float(group["certainty_score"].mean()), 2))
+            for b, group in rumors.groupby("status_bin", observed=True)
+        }
+        return cls(rumor, status, {str(b): v for b, v in bin_defaults.items()})
+
+    def save(self, path: str = MODEL_FILE):
+        # Only the weight rows that were trained are stored; the rest are zero
+        arrays = {}
+        for name, model in (("rumor", self.rumor), ("status", self.status)):
+            used = np.flatnonzero(np.any(model.weights != 0, axis=1))
+            arrays[f"{name}_ids"], arrays[f"{name}_weights"] = used, model.weights[used]
+            arrays[f"{name}_classes"] = np.array([str(c) for c in model.classes])
+        arrays["bins"] = np.array(list(self.bin_defaults))
+        arrays["bin_status"] = np.array([str(s) for s, _ in self.bin_defaults.values()])
+        arrays["bin_certainty"] = np.array([c for _, c in self.bin_defaults.values()])
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, hash_bits=HASH_BITS, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> "LocalClassifier":
+        with np.load(path) as f:
+            if int(f["hash_bits"]) != HASH_BITS:
+                raise ValueError(f"{path} was trained with {int(f['hash_bits'])} hash bits, expected {HASH_BITS}")
+            models = {}
+            for name in ("rumor", "status"):
+                classes = f[f"{name}_classes"].tolist()
+                weights = np.zeros((1 << HASH_BITS, len(classes)), dtype=np.float32)
+                weights[f[f"{name}_ids"]] = f[f"{name}_weights"]
+                models[name] = LinearModel(classes, weights)
+            models["rumor"].classes = [c == "True" for c in models["rumor"].classes]
+            bin_defaults = {
+                b: (None if s == "None" else s, float(c))
+                for b, s, c in zip(f["bins"].tolist(), f["bin_status"].tolist(), f["bin_certainty"].tolist())
+            }
+        return cls(models["rumor"], models["status"], bin_defaults)
+
+
+def load_training_data(paths: list = TRAINING_FILES) -> pd.DataFrame:
+    """Labelled tweets from the structured files, one row per distinct tweet text (last file wins)."""
+    frames = [pd.read_csv(p, usecols=["tweet_text", "status", "certainty_score", "is_transfer_rumor"])
+              for p in paths if os.path.exists(p)]
+    data = pd.concat(frames, ignore_index=True).dropna(subset=["tweet_text"])
+    data = data.drop_duplicates("tweet_text", keep="last").reset_index(drop=True)
+    data["is_transfer_rumor"] = data["is_transfer_rumor"].astype(str).eq("True")
+    data["certainty_score"] = pd.to_numeric(data["certainty_score"], errors="coerce").fillna(0.0)
+    data["status_bin"] = bin_statuses(data["status"]).astype(str)
+    return data
+
+
+def ensure_model(path: str = MODEL_FILE, training_files: list = TRAINING_FILES) -> LocalClassifier:
+    """Load the model, training it first if missing or older than a training file."""
+    newest = max((os.path.getmtime(p) for p in training_files if os.path.exists(p)), default=0)
+    if not os.path.exists(path) or os.path.getmtime(path) < newest:
+        print("🧠 Training the local classifier...")
+        LocalClassifier.train(load_training_data(training_files)).save(path)
+    return LocalClassifier.load(path)
+
+
+class LocalGate:
+    """Answers confident tweets locally; counts what it answered and the API calls saved."""
+
+    def __init__(self, classifier: LocalClassifier, entities_required: bool = True,
+                 not_rumor_below: float = NOT_RUMOR_BELOW, rumor_above: float = RUMOR_ABOVE,
+                 status_above: float = STATUS_ABOVE):
+        self.classifier = classifier
+        self.entities_required = entities_required
+        self.not_rumor_below = not_rumor_below
+        self.rumor_above = rumor_above
+        self.status_above = status_above
+        self.checked = 0
+        self.not_rumors = 0
+        self.rumors = 0
+
+    def record(self, tweet_text: str):
+        """The record for `tweet_text` if the model is confident enough, else None (ask the LLM)."""
+        self.checked += 1
+        p_rumor, status_bin, p_status = self.classifier.predict(tweet_text)
+        if p_rumor < self.not_rumor_below:
+            self.not_rumors += 1
+            return default_record()
+        if not self.entities_required and p_rumor > self.rumor_above and p_status > self.status_above:
+            self.rumors += 1
+            return self.classifier.rumor_record(status_bin)
+        return None
+
+    def report(self) -> str:
+        answered = self.not_rumors + self.rumors
+        share = answered / self.checked if self.checked else 0.0
+        return (
+            f"🧠 Local model: {self.checked} tweets checked, {self.not_rumors} answered as non-rumors, "
+            f"{self.rumors} as rumors → {answered} API calls saved ({share:.0%})"
+        )
+
+
+def _folds(n: int, k: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).permutation(n) % k
+
+
+def evaluate(data: pd.DataFrame, k: int = FOLDS, thresholds: list = REPORT_THRESHOLDS) -> dict:
+    """Out-of-fold predictions for every row, scored against the LLM labels."""
+    fold_of = _folds(len(data), k)
+    p_rumor = np.zeros(len(data))
+    status_pred = np.empty(len(data), dtype=object)
+    p_status = np.zeros(len(data))
+    for f in range(k):
+        train, test = np.flatnonzero(fold_of != f), np.flatnonzero(fold_of == f)
+        model = LocalClassifier.train(data.iloc[train])
+        for i in test:
+            p_rumor[i], status_pred[i], p_status[i] = model.predict(data["tweet_text"].iloc[i])
+
+    is_rumor = data["is_transfer_rumor"].to_numpy()
+    bins = data["status_bin"].to_numpy()
+    passed = data["tweet_text"].map(lambda t: tag_looks_like_move(t, "recall")).to_numpy()
+    n, rumors = len(data), int(is_rumor.sum())
+
+    routing = []
+    for t in thresholds:
+        local = p_rumor < t
+        routing.append({
+            "threshold": t,
+            "local_share": float(local.mean()),
+            "agreement": float((~is_rumor[local]).mean()) if local.any() else 1.0,
+            "rumors_lost": int((local & is_rumor).sum()),
+            # Calls saved among tweets the recall prefilter would have sent to the LLM
+            "after_prefilter_share": float((local & passed).sum() / passed.sum()),
+        })
+    confident = (p_rumor > RUMOR_ABOVE) & (p_status > STATUS_ABOVE)
+
+    model = LocalClassifier.train(data)
+    texts = data["tweet_text"].tolist()
+    start = time.perf_counter()
+    for text in texts:
+        model.predict(text)
+    micros = (time.perf_counter() - start) / len(texts) * 1e6
+
+    return {
+        "tweets": n,
+        "rumors": rumors,
+        "folds": k,
+        "rumor_accuracy": float(((p_rumor >= 0.5) == is_rumor).mean()),
+        "status_accuracy": float((status_pred[is_rumor] == bins[is_rumor]).mean()),
+        "prefilter_recall_share": float(passed.mean()),
+        "routing": routing,
+        "confident_rumors": {
+            "share_of_rumors": float(confident[is_rumor].mean()),
+            "rumor_agreement": float(is_rumor[confident].mean()) if confident.any() else 1.0,
+            "status_agreement": float((status_pred[confident & is_rumor] == bins[confident & is_rumor]).mean())
+            if (confident & is_rumor).any() else 1.0,
+        },
+        "predict_us_per_tweet": round(micros, 1),
+    }
+
+
+def format_report(results: dict) -> str:
+    r = results
+    lines = [
+        "# Local classifier vs LLM labels",
+        "",
+        f"Out-of-fold ({r['folds']}-fold) predictions on {r['tweets']} distinct labelled tweets "
+        f"({r['rumors']} rumors) from the structured data files, compared with the LLM's labels. "
+        f"Generated by `python scripts/local_classifier.py --report`.",
+        "",
+        f"- Rumor / not rumor agreement (P ≥ 0.5): **{r['rumor_accuracy']:.1%}**",
+        f"- Status bin agreement on rumors: **{r['status_accuracy']:.1%}**",
+        f"- Prediction time: ~{r['predict_us_per_tweet']} µs per tweet (one CPU core)",
+        "",
+        "## Non-rumors answered locally",
+        "",
+        "Tweets with P(rumor) below the threshold get the null record without an API call.",
+        "",
+        "| P(rumor) below | API calls saved | agreement with LLM | LLM rumors lost | calls saved after recall prefilter |",
+        "|---|---|---|---|---|",
+    ]
+    for row in r["routing"]:
+        marker = " (default)" if row["threshold"] == NOT_RUMOR_BELOW else ""
+        lines.append(
+            f"| {row['threshold']}{marker} | {row['local_share']:.1%} | {row['agreement']:.1%} | "
+            f"{row['rumors_lost']} of {r['rumors']} | {row['after_prefilter_share']:.1%} |"
+        )
+    c = r["confident_rumors"]
+    lines += [
+        "",
+        f"The recall prefilter alone sends {r['prefilter_recall_share']:.1%} of these tweets to the LLM; "
+        "the last column is the share of *those* the model answers instead.",
+        "",
+        "## Rumors answered locally (only when entities are not required)",
+        "",
+        f"P(rumor) > {RUMOR_ABOVE} and status confidence > {STATUS_ABOVE}: "
+        f"{c['share_of_rumors']:.1%} of rumors, {c['rumor_agreement']:.1%} of them rumors per the LLM, "
+        f"status bin agreement {c['status_agreement']:.1%}. Player and clubs still need the LLM.",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and evaluate the local rumor classifier")
+    parser.add_argument("--model", default=MODEL_FILE, help="where to save the trained model")
+    parser.add_argument("--report", nargs="?", const="-", help="also write the evaluation report (markdown) here")
+    args = parser.parse_args()
+
+    data = load_training_data()
+    LocalClassifier.train(data).save(args.model)
+    print(f"✅ Trained on {len(data)} tweets → {args.model}")
+    if args.report:
+        report = format_report(evaluate(data))
+        if args.report == "-":
+            print(report)
+        else:
+            os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+            with open(args.report, "w", encoding="utf-8") as f:
+                f.write(report)
+            print(f"✅ Evaluation report → {args.report}")
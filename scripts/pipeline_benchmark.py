@@ -0,0 +1,514 @@
+"""
+pipeline_benchmark.py
+
+End-to-end benchmark for the structurer and the dashboards, with no API spend and no clicking.
+- Pipeline: synthetic export (synthetic_tweets.py) → ingest → prefilter → cache → LLM → checkpoint,
+  against an in-process fake_openai_server.py with configurable latency and error rate
+- Dashboards: load + index build, then random sidebar states (filter, Top 10, table rows), and
+  full script reruns of both dashboards through Streamlit's AppTest
+- Ranking check: the dashboard table ranked as live parts would arrive (RumorRanking.add) must
+  give the same Top 10 as a ranking built from the whole table at once
+- Export check: each dashboard is also run on the committed data files and its CSV export built
+  once; the header must be what the dashboards always exported: every column of the data file
+  (status_bin included), then Label
+- Reports tweets/sec, p50/p99 per stage and peak RSS, and appends every run to RESULTS_FILE
+  (with the git commit) so a change can be compared with the previous run of the same setup
+
+Per-stage latencies are per call: one tweet for ingest/prefilter, one request (rate-limit wait
+and retries included) for extraction. The cache is looked up, and the checkpoint written, a
+chunk or batch at a time; each tweet is charged its share of the call. Peak RSS is the process high-water mark
+at the end of each phase; use --skip-pipeline to see the dashboards on their own.
+
+Usage:
+    python scripts/pipeline_benchmark.py --tweets 10000
+    python scripts/pipeline_benchmark.py --tweets 1000000 --latency 0.2 --error-rate 0.02 --no-render
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+import openai
+
+from async_extraction import AsyncExtractor
+from checkpoint_log import CheckpointLog
+from extraction_prompt import PROMPT_VERSION
+from fake_openai_server import serve_in_thread
+from local_classifier import LocalGate, ensure_model
+from prefilter import PrefilterStats
+from response_cache import ResponseCache
+from rumor_ranking import RumorRanking
+from rumor_store import store_path, write_store
+from structurer.config import BATCH_MODE, MAX_CONCURRENCY, MODEL, PREFILTER_MODE, TEMPERATURE
+from structurer.pipeline import checkpoint_record, structure_rows
+from synthetic_tweets import player_pool_size, responder, rumor_table, write_tweets
+from tweet_ingest import iter_tweets
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(SCRIPTS_DIR, "..")
+RESULTS_FILE = os.path.join(SCRIPTS_DIR, "..", "benchmarks", "results.jsonl")
+
+# Dashboards rendered by AppTest, and the data file each one reads (relative to the working dir)
+DASHBOARDS = {
+    "rumor_dashboard_v2.py": "data/transfer_rumors_with_tags_and_bins.csv",
+    "rumor_dashboard_v1_5.py": "data/fabrizio_may_to_june_structured_v1_5.csv",
+}
+# Key of each dashboard's csv_export widgets
+EXPORT_KEYS = {"rumor_dashboard_v2.py": "v2", "rumor_dashboard_v1_5.py": "v1_5"}
+
+# The account quota isn't what's being measured; raise it so it never throttles
+UNTHROTTLED_RPM = 10**7
+UNTHROTTLED_TPM = 10**10
+
+# Changes larger than this (either way) are called out against the previous run
+REGRESSION_TOLERANCE = 0.15
+
+
+class StageTimes:
+    """Wall-clock samples per pipeline stage."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def record(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def timed_iter(self, stage: str, items):
+        items = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            self.record(stage, time.perf_counter() - start)
+            yield item
+
+    def wrap(self, stage: str, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def wrap_many(self, stage: str, fn):
+        # fn(items) handles a list in one call: each item is charged an equal share
+        def timed(items, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(items, *args, **kwargs)
+            finally:
+                share = (time.perf_counter() - start) / max(len(items), 1)
+                for _ in items:
+                    self.record(stage, share)
+        return timed
+
+    def wrap_async(self, stage: str, fn):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def summary(self) -> dict:
+        return {stage: latency_summary(samples) for stage, samples in self.samples.items()}
+
+
+def latency_summary(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    p50, p99 = np.percentile(samples, [50, 99])
+    return {
+        "count": len(samples),
+        "p50_ms": round(p50 * 1000, 4),
+        "p99_ms": round(p99 * 1000, 4),
+        "total_s": round(float(np.sum(samples)), 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def bench_pipeline(n: int, workdir: str, seed: int = 0, latency: float = 0.05, error_rate: float = 0.01,
+                   concurrency: int = MAX_CONCURRENCY, rpm: int = UNTHROTTLED_RPM, tpm: int = UNTHROTTLED_TPM,
+                   prefilter_mode: str = PREFILTER_MODE, batch_mode: bool = BATCH_MODE,
+                   use_cache: bool = True, local_model: bool = False) -> dict:
+    """Structure `n` synthetic tweets against the fake backend, timing each stage."""
+    print(f"🧪 Writing {n} synthetic tweets...")
+    tweets_path = write_tweets(os.path.join(workdir, "tweets.csv"), n, seed)
+    api_base, server_stats = serve_in_thread(latency, error_rate, responder(seed, player_pool_size(n)))
+    openai.api_base, openai.api_key = api_base, "sk-fake"
+
+    times = StageTimes()
+    gate = PrefilterStats(prefilter_mode)
+    gate.check = times.wrap("prefilter", gate.check)
+    local_gate = None
+    if local_model:
+        local_gate = LocalGate(ensure_model())
+        local_gate.record = times.wrap("local_model", local_gate.record)
+    cache = None
+    if use_cache:
+        cache = ResponseCache(os.path.join(workdir, "cache.sqlite"), PROMPT_VERSION, MODEL, TEMPERATURE)
+        cache.get_many = times.wrap_many("cache", cache.get_many)
+    extractor = AsyncExtractor(
+        model=MODEL,
+        temperature=TEMPERATURE,
+        max_concurrency=concurrency,
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm
+    )
+    extractor.chat = times.wrap_async("extraction", extractor.chat)
+    structured = 0
+
+    with CheckpointLog(os.path.join(workdir, "checkpoint.jsonl")) as log:
+        def on_results(results):
+            nonlocal structured
+            start = time.perf_counter()
+            log.append_many([checkpoint_record(*result) for result in results])
+            share = (time.perf_counter() - start) / len(results)
+            for _ in results:
+                times.record("checkpoint", share)
+            structured += len(results)
+
+        print(f"🏃 Structuring against {api_base} (latency {latency}s, error rate {error_rate:.0%})...")
+        rows = times.timed_iter("ingest", iter_tweets(tweets_path))
+        start = time.perf_counter()
+        asyncio.run(structure_rows(rows, extractor, gate, cache, on_results, batch_mode, local_gate=local_gate))
+        elapsed = time.perf_counter() - start
+    if cache is not None:
+        cache.close()
+
+    return {
+        "tweets": structured,
+        "seconds": round(elapsed, 3),
+        "tweets_per_sec": round(structured / elapsed, 1) if elapsed else None,
+        "requests": server_stats["requests"],
+        "injected_errors": server_stats["errors"],
+        "prefilter_skipped": gate.skipped,
+        "local_answered": local_gate.not_rumors + local_gate.rumors if local_gate else 0,
+        "retries": extractor.metrics.total("llm_retries_total"),
+        "prompt_tokens": extractor.metrics.total("llm_prompt_tokens_total"),
+        "completion_tokens": extractor.metrics.total("llm_completion_tokens_total"),
+        "cost_usd": round(extractor.metrics.cost_usd(), 4),
+        "stages": times.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def random_filters(data, rng: random.Random) -> dict:
+    """A sidebar state like one a user would click into."""
+    bins = rng.sample(data.status_bins, rng.randint(1, len(data.status_bins)))
+    club = rng.choice(data.clubs) if data.clubs and rng.random() < 0.5 else None
+    return {
+        "status_bin": bins,
+        "score_range": (rng.choice([0.0, 0.2, 0.4]), rng.choice([0.6, 0.8, 1.0])),
+        "club": club,
+    }
+
+
+def bench_dashboards(n: int, workdir: str, seed: int = 0, queries: int = 200, render: bool = True,
+                     reruns: int = 10) -> dict:
+    """Time the dashboards' data path on an `n`-row synthetic table, then full script reruns."""
+    # Imported here: rumor_data pulls in Streamlit, which the pipeline phase doesn't need
+    from rumor_data import load_rumor_data
+    from rumor_table import DEFAULT_PAGE_SIZE, sorted_rows
+    from text_search import PAIR_MARK
+
+    print(f"🧪 Building a {n}-row dashboard table...")
+    df = rumor_table(n, seed)
+    for csv_path in DASHBOARDS.values():
+        csv_path = os.path.join(workdir, csv_path)
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        # Header-only CSV: the dashboards read the (newer) Parquet sidecar written next to it
+        df.head(0).to_csv(csv_path, index=False)
+        write_store(df, store_path(csv_path))
+    parquet_path = store_path(os.path.join(workdir, next(iter(DASHBOARDS.values()))))
+
+    times = StageTimes()
+    start = time.perf_counter()
+    data = load_rumor_data(parquet_path)
+    load_seconds = time.perf_counter() - start
+    memory = data.memory_usage()
+
+    rng = random.Random(seed)
+    # Search words drawn separately, so the filter sequence matches runs without search
+    search_rng = random.Random(seed + 1)
+    words = [token for token in data.search_index.vocab if not token.startswith(PAIR_MARK)]
+    for _ in range(queries):
+        filters = random_filters(data, rng)
+        start = time.perf_counter()
+        rows = data.index.query(is_transfer_rumor=[True], **filters)
+        times.record("filter", time.perf_counter() - start)
+        start = time.perf_counter()
+        data.ranking.top(rows, k=10, by="market_value_eur")
+        times.record("top10", time.perf_counter() - start)
+        start = time.perf_counter()
+        # First table page, text decoded for those rows only
+        rumors = data.take(sorted_rows(data.df, rows, "certainty_score")[:DEFAULT_PAGE_SIZE]).copy()
+        rumors["Label"] = rumors["player"].astype(object).fillna("Unknown") + " → " + rumors["destination_club"].astype(object).fillna("???")
+        times.record("table", time.perf_counter() - start)
+        start = time.perf_counter()
+        data.index.query(within=data.search(search_rng.choice(words)), is_transfer_rumor=[True], **filters)
+        times.record("search", time.perf_counter() - start)
+
+    ranking_ok = check_ranking(data, random.Random(seed + 2), queries)
+
+    metrics = {
+        "rows": len(df),
+        "load_s": round(load_seconds, 3),
+        "ranking_add_ok": ranking_ok,
+        "frame_mb": round(memory["frame"] / 2 ** 20, 2),
+        "text_blobs_mb": round(memory["text_blobs"] / 2 ** 20, 2),
+        "queries": times.summary(),
+    }
+    if render:
+        metrics["render"] = render_dashboards(workdir, rng, reruns)
+        metrics["export_header_ok"] = check_exports()
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def check_ranking(data, rng: random.Random, queries: int, parts: int = 16) -> bool:
+    """Top 10s of a ranking added to part by part, as LiveFeed builds it, match a full rebuild."""
+    df = data.df
+    cuts = sorted(rng.sample(range(1, len(df)), min(parts - 1, len(df) - 1)))
+    incremental = RumorRanking(df.iloc[:cuts[0]])
+    for lo, hi in zip(cuts, cuts[1:] + [len(df)]):
+        incremental.add(df.iloc[lo:hi])
+    rebuilt = data.ranking
+    for _ in range(queries):
+        rows = data.index.query(is_transfer_rumor=[True], **random_filters(data, rng))
+        for by in rebuilt.metrics:
+            if not np.array_equal(incremental.top(rows, k=10, by=by), rebuilt.top(rows, k=10, by=by)):
+                print(f"❌ RumorRanking.add: Top 10 by {by} differs from a full rebuild")
+                return False
+    return True
+
+
+def expected_export_header(csv_path: str) -> list:
+    """Columns of the dashboards' CSV export: the data file's, status_bin, then Label."""
+    with open(csv_path, encoding="utf-8") as f:
+        columns = next(csv.reader(f))
+    return columns + (["status_bin"] if "status_bin" not in columns else []) + ["Label"]
+
+
+def export_header(app, key: str) -> list:
+    """Build `app`'s CSV export (the "Prepare" button) and return the header it wrote."""
+    import rumor_table
+
+    exports = []
+    build = rumor_table.csv_bytes
+
+    def recording(*args, **kwargs):
+        exports.append(build(*args, **kwargs))
+        return exports[-1]
+
+    # The dashboards reach csv_bytes through the module, so the export passes through here
+    rumor_table.csv_bytes = recording
+    try:
+        app.button(key=f"{key}_prepare").click().run()
+    finally:
+        rumor_table.csv_bytes = build
+    if not exports:
+        return None
+    return next(csv.reader(io.StringIO(exports[-1].decode("utf-8"))))
+
+
+def check_exports(root: str = REPO_DIR) -> dict:
+    """{dashboard: export header as expected}, each dashboard run on the data files under `root`."""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for script, csv_path in DASHBOARDS.items():
+            app = AppTest.from_file(os.path.join(SCRIPTS_DIR, script), default_timeout=600).run()
+            header, expected = export_header(app, EXPORT_KEYS[script]), expected_export_header(csv_path)
+            if header != expected:
+                missing = [c for c in expected if c not in (header or [])]
+                print(f"❌ {script}: CSV export header differs from {csv_path} (missing: {missing or 'none, order differs'})")
+            results[script] = header == expected
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def render_dashboards(workdir: str, rng: random.Random, reruns: int) -> dict:
+    """Cold run plus `reruns` club changes of each dashboard script, as Streamlit would run them."""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for script in DASHBOARDS:
+            app = AppTest.from_file(os.path.join(SCRIPTS_DIR, script), default_timeout=600)
+            start = time.perf_counter()
+            app.run()
+            cold = time.perf_counter() - start
+            samples = []
+            for _ in range(reruns):
+                club = app.sidebar.selectbox[0]
+                club.select(rng.choice(club.options))
+                start = time.perf_counter()
+                app.run()
+                samples.append(time.perf_counter() - start)
+            errors = [e.value for e in app.exception]
+            if errors:
+                print(f"❌ {script}: {errors[0]}")
+            results[script] = {"cold_s": round(cold, 3), "rerun": latency_summary(samples), "errors": len(errors)}
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=SCRIPTS_DIR, capture_output=True, text=True).stdout.strip()
+        except OSError:
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def flatten(metrics: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def load_results(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(run: dict, previous: dict) -> list:
+    """Lines for every timing/throughput/memory metric that moved more than REGRESSION_TOLERANCE."""
+    lines = []
+    before, after = flatten(previous["metrics"]), flatten(run["metrics"])
+    for key, new in after.items():
+        old = before.get(key)
+        if not old or not key.endswith(("_ms", "_s", "_mb", "per_sec")):
+            continue
+        change = (new - old) / old
+        if abs(change) <= REGRESSION_TOLERANCE:
+            continue
+        better = change > 0 if key.endswith("per_sec") else change < 0
+        lines.append(f"{'✅' if better else '⚠️'} {key}: {old} → {new} ({change:+.0%})")
+    return lines
+
+
+def print_report(metrics: dict):
+    pipeline = metrics.get("pipeline")
+    if pipeline:
+        print(f"\n🏁 Pipeline: {pipeline['tweets']} tweets in {pipeline['seconds']}s "
+              f"→ {pipeline['tweets_per_sec']} tweets/sec ({pipeline['requests']} requests, "
+              f"{pipeline['injected_errors']} injected errors, {pipeline.get('local_answered', 0)} answered locally), "
+              f"peak RSS {pipeline['peak_rss_mb']} MB")
+        for stage, s in pipeline["stages"].items():
+            if s["count"]:
+                print(f"   {stage:<11} n={s['count']:<8} p50 {s['p50_ms']:.3f} ms   p99 {s['p99_ms']:.3f} ms")
+    dashboards = metrics.get("dashboards")
+    if dashboards:
+        print(f"\n🏁 Dashboards: {dashboards['rows']} rows, load + index {dashboards['load_s']}s, "
+              f"frame {dashboards.get('frame_mb')} MB + text blobs {dashboards.get('text_blobs_mb')} MB (mapped), "
+              f"peak RSS {dashboards['peak_rss_mb']} MB")
+        for step, s in dashboards["queries"].items():
+            print(f"   {step:<11} p50 {s['p50_ms']:.3f} ms   p99 {s['p99_ms']:.3f} ms")
+        if "ranking_add_ok" in dashboards:
+            print(f"   ranking added part by part = full rebuild {'✅' if dashboards['ranking_add_ok'] else '❌'}")
+        exports = dashboards.get("export_header_ok", {})
+        for script, r in dashboards.get("render", {}).items():
+            rerun = r["rerun"]
+            reruns = f"rerun p50 {rerun['p50_ms']:.0f} ms   p99 {rerun['p99_ms']:.0f} ms" if rerun["count"] else ""
+            header = f"   export header {'✅' if exports.get(script) else '❌'}" if script in exports else ""
+            print(f"   {script:<24} cold {r['cold_s']}s   {reruns}{header}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the structurer pipeline and dashboards on synthetic data")
+    parser.add_argument("--tweets", type=int, default=10000, help="synthetic tweets (and dashboard rows)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean fake API response time in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of fake API requests that fail")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=UNTHROTTLED_RPM)
+    parser.add_argument("--tpm", type=int, default=UNTHROTTLED_TPM)
+    parser.add_argument("--prefilter", default=PREFILTER_MODE)
+    parser.add_argument("--no-batch", action="store_true", help="one tweet per request")
+    parser.add_argument("--no-cache", action="store_true", help="skip the response cache")
+    parser.add_argument("--local-model", action="store_true", help="answer confident non-rumors with local_classifier.py")
+    parser.add_argument("--queries", type=int, default=200, help="random sidebar states to time")
+    parser.add_argument("--reruns", type=int, default=10, help="AppTest reruns per dashboard")
+    parser.add_argument("--no-render", action="store_true", help="skip the AppTest dashboard runs")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--skip-dashboard", action="store_true")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSONL file runs are appended to")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary working directory")
+    args = parser.parse_args()
+
+    params = {
+        "tweets": args.tweets, "seed": args.seed, "latency": args.latency, "error_rate": args.error_rate,
+        "concurrency": args.concurrency, "rpm": args.rpm, "tpm": args.tpm, "prefilter": args.prefilter,
+        "batch": not args.no_batch, "cache": not args.no_cache, "queries": args.queries,
+        "reruns": args.reruns, "render": not args.no_render,
+        "pipeline": not args.skip_pipeline, "dashboard": not args.skip_dashboard,
+    }
+    # Only recorded when on, so earlier runs still compare against default ones
+    if args.local_model:
+        params["local_model"] = True
+    workdir = tempfile.mkdtemp(prefix="rumor_bench_")
+    metrics = {}
+    try:
+        if not args.skip_pipeline:
+            metrics["pipeline"] = bench_pipeline(
+                args.tweets, workdir, args.seed, args.latency, args.error_rate, args.concurrency,
+                args.rpm, args.tpm, args.prefilter, not args.no_batch, not args.no_cache, args.local_model
+            )
+        if not args.skip_dashboard:
+            metrics["dashboards"] = bench_dashboards(
+                args.tweets, workdir, args.seed, args.queries, not args.no_render, args.reruns
+            )
+    finally:
+        if args.keep:
+            print(f"📁 Working files kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    run = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **git_revision(), "params": params, "metrics": metrics}
+    print_report(metrics)
+
+    previous = [r for r in load_results(args.results) if r.get("params") == params]
+    if previous:
+        print(f"\n📈 Compared with {previous[-1].get('commit')} ({previous[-1]['time']}):")
+        print("\n".join(compare(run, previous[-1])) or f"   no change beyond ±{REGRESSION_TOLERANCE:.0%}")
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"💾 Saved to {os.path.relpath(args.results)}")
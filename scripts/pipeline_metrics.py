@@ -0,0 +1,278 @@
+"""
+pipeline_metrics.py
+
+Counters, latency histograms and cost accounting for structurer runs.
+- `PipelineMetrics`: what the extractor and the pipeline record (requests, retries, tokens,
+  JSON repairs, default-record fallbacks, cache hits, per-stage latency) and the estimated cost
+- `MetricsLog`: appends a snapshot to a JSONL file every few seconds and once at the end
+- `serve_metrics`: the same numbers at http://127.0.0.1:<port>/metrics in Prometheus text format
+
+`report()` is the end-of-run summary, with hints for MAX_CONCURRENCY and MAX_BATCH_SIZE.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (LLM calls and per-tweet stages share them)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per 1K tokens: (prompt, completion). Unknown models are costed as gpt-3.5-turbo.
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+}
+
+# report() hints: share of LLM time spent waiting on the RPM/TPM buckets, share of requests
+# answered 429, share of batched tweets that had to be redone one at a time
+THROTTLED_HINT = 0.25
+RATE_LIMITED_HINT = 0.02
+BATCH_RETRY_HINT = 0.05
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus exposes it."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float):
+        """Estimate from the buckets (linear within a bucket); None when empty."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _series(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class PipelineMetrics:
+    """Everything one structurer run counts. Safe to read from another thread."""
+
+    def __init__(self, model: str = "gpt-3.5-turbo"):
+        self.model = model
+        self.prices = MODEL_PRICES.get(model, MODEL_PRICES["gpt-3.5-turbo"])
+        self.started = time.time()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        with self._lock:
+            self.counters[name, _labels(labels)] += amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = name, _labels(labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_share(self, name: str, seconds: float, count: int, **labels):
+        """One call that handled `count` tweets: observe its time split evenly between them."""
+        for _ in range(count):
+            self.observe(name, seconds / count, **labels)
+
+    def time(self, name: str, **labels):
+        """Context manager that observes its duration."""
+        return _Timer(self, name, labels)
+
+    def tokens(self, prompt_tokens: int, completion_tokens: int):
+        self.inc("llm_prompt_tokens_total", prompt_tokens)
+        self.inc("llm_completion_tokens_total", completion_tokens)
+
+    def total(self, name: str, **labels) -> float:
+        """Sum of counter `name` over every series matching `labels`."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(v for (n, l), v in self.counters.items() if n == name and wanted <= set(l))
+
+    def cost_usd(self) -> float:
+        prompt_price, completion_price = self.prices
+        return (self.total("llm_prompt_tokens_total") * prompt_price
+                + self.total("llm_completion_tokens_total") * completion_price) / 1000
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {_series(name, labels): value for (name, labels), value in self.counters.items()}
+            histograms = {
+                _series(name, labels): {
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+                for (name, labels), h in self.histograms.items()
+            }
+        return {
+            "time": time.time(),
+            "elapsed_s": round(time.time() - self.started, 3),
+            "model": self.model,
+            "cost_usd": round(self.cost_usd(), 6),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            seen = set()
+            for (name, labels), value in counters:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{_series(name, labels)} {value:g}")
+            for (name, labels), h in histograms:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f"{_series(name + '_bucket', labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{_series(name + '_sum', labels)} {h.sum:g}")
+                lines.append(f"{_series(name + '_count', labels)} {h.count}")
+        lines.append("# TYPE llm_cost_usd_total counter")
+        lines.append(f"llm_cost_usd_total {self.cost_usd():g}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        requests = self.total("llm_requests_total")
+        batches = self.total("llm_requests_total", kind="batch")
+        rate_limited = self.total("llm_request_errors_total", reason="RateLimitError")
+        errors = self.total("llm_request_errors_total")
+        retries = self.total("llm_retries_total")
+        throttled = self.total("llm_throttle_seconds_total")
+        batch_items = self.total("llm_batch_items_total")
+        batch_retried = self.total("llm_batch_items_retried_total")
+        cache_hits = self.total("cache_lookups_total", result="hit")
+        cache_lookups = self.total("cache_lookups_total")
+        with self._lock:
+            latency = [h for (name, _), h in self.histograms.items() if name == "llm_request_seconds"]
+        llm_seconds = sum(h.sum for h in latency)
+        combined = Histogram()
+        for h in latency:
+            combined.counts = [a + b for a, b in zip(combined.counts, h.counts)]
+            combined.count += h.count
+        p50, p99 = combined.quantile(0.5), combined.quantile(0.99)
+
+        lines = [
+            f"📊 LLM: {requests:.0f} requests ({batches:.0f} batched, "
+            f"{batch_items / batches if batches else 0:.1f} tweets per batch), "
+            + (f"latency p50 {p50:.2f}s / p99 {p99:.2f}s, " if p50 is not None else "")
+            + f"{errors:.0f} errors, {retries:.0f} retries, {throttled:.1f}s waiting on rate limits",
+            f"💰 Tokens: {self.total('llm_prompt_tokens_total'):.0f} prompt + "
+            f"{self.total('llm_completion_tokens_total'):.0f} completion → ~${self.cost_usd():.4f} ({self.model})",
+            f"🩹 Fallbacks: {self.total('llm_json_repairs_total'):.0f} JSON repairs, "
+            f"{self.total('llm_invalid_records_total'):.0f} off-schema replies, "
+            f"{batch_retried:.0f} batched tweets redone alone, "
+            f"{self.total('llm_default_records_total'):.0f} default records; "
+            f"cache {cache_hits:.0f}/{cache_lookups:.0f} hits",
+        ]
+        if llm_seconds and throttled / (throttled + llm_seconds) > THROTTLED_HINT:
+            lines.append("💡 Mostly waiting on the RPM/TPM quota: more concurrency won't help, bigger batches might")
+        if requests and rate_limited / requests > RATE_LIMITED_HINT:
+            lines.append("💡 Many 429s: lower MAX_CONCURRENCY or the configured RPM/TPM")
+        if batch_items and batch_retried / batch_items > BATCH_RETRY_HINT:
+            lines.append("💡 Many batched tweets came back unusable: lower MAX_BATCH_SIZE")
+        return "\n".join(lines)
+
+
+class _Timer:
+    def __init__(self, metrics: PipelineMetrics, name: str, labels: dict):
+        self.metrics, self.name, self.labels = metrics, name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class MetricsLog:
+    """Appends `metrics.snapshot()` to a JSONL file every `interval` seconds and on close."""
+
+    def __init__(self, metrics: PipelineMetrics, path: str, interval: float = 10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.metrics.snapshot(), ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve_metrics(metrics: PipelineMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text format) on a daemon thread; call .shutdown() to stop."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
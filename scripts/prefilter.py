@@ -0,0 +1,117 @@
+"""
+prefilter.py
+
+Regex gate in front of the LLM: tweets with no transfer vocabulary at all are written
+as the default null record instead of being sent to OpenAI.
+
+Modes:
+- "off" (default): everything goes to the LLM; tweets are still tagged LooksLikeMove
+- "recall": broad vocabulary, only skips tweets with no move-related words at all.
+  On the labelled v1.5 file it skips 28.8% of tweets and 6.2% of the rumors (49 of 788:
+  farewells, quotes and teasers with no transfer word in them), which then get the null
+  record; opt in when API spend counts more than those rumors
+- "precision": the original `LooksLikeMove` keyword list; skips 58.5% of tweets and 40.0%
+  of the rumors
+
+Each mode compiles to a single pattern once, at import time. `scan` (and
+`PrefilterStats.check`) answers both LooksLikeMove and the gate from one search, reading
+on past its match only when that was a recall-only word.
+"""
+
+import re
+
+# Original LooksLikeMove vocabulary (both structurer scripts)
+MOVE_KEYWORDS = [
+    r"deal", r"contacted", r"in talks", r"offer", r"agreement", r"here we go",
+    r"medical", r"linked", r"set to join", r"close to", r"advanced talks",
+    r"rejected", r"negotiations", r"proposal", r"release clause"
+]
+
+# Extra vocabulary for recall mode, picked from rumors the original list misses
+RECALL_EXTRA_KEYWORDS = [
+    r"contacts?", r"talks", r"agreed", r"negotiation", r"sign(?:s|ed|ing)?",
+    r"join(?:s|ed|ing)?", r"leav(?:e|es|ing)", r"loan", r"transfer", r"bids?", r"fee",
+    r"clauses?", r"contract", r"targets?", r"interest(?:ed)?", r"move", r"exit",
+    r"part ways", r"shortlist", r"approach(?:ed)?", r"race", r"free agent",
+    r"renew(?:al|ing)?", r"extension", r"sealed", r"permanent", r"buy", r"sale",
+    r"departure", r"farewell", r"candidate", r"option", r"plan", r"keen",
+    r"want(?:s|ed)?", r"decid(?:e|ed)", r"replace(?:ment)?", r"successor",
+    r"new (?:club|coach|manager|head coach)", r"appointed", r"announce(?:d|ment)?",
+    r"official(?:ly)?", r"confirm(?:s|ed)?", r"excl", r"exclusive", r"valued",
+    r"\d+\s?m", r"until june"
+]
+RECALL_KEYWORDS = MOVE_KEYWORDS + RECALL_EXTRA_KEYWORDS
+
+
+def _compile(keywords, extra=""):
+    return re.compile(r"\b(?:" + "|".join(keywords) + r")\b" + extra, flags=re.IGNORECASE)
+
+
+PATTERNS = {
+    "precision": _compile(MOVE_KEYWORDS),
+    # Any fee in € or £ is a strong hint on its own
+    "recall": _compile(RECALL_KEYWORDS, extra="|[€£]"),
+}
+MODES = ("off", "recall", "precision")
+
+# Both vocabularies in one pattern: a match in the `move` group is a LooksLikeMove keyword,
+# any match passes the recall gate
+SCAN_PATTERN = re.compile(
+    r"\b(?:(?P<move>" + "|".join(MOVE_KEYWORDS) + r")|" + "|".join(RECALL_EXTRA_KEYWORDS) + r")\b|[€£]",
+    flags=re.IGNORECASE
+)
+
+
+def tag_looks_like_move(tweet_text: str, mode: str = "precision") -> bool:
+    if mode == "off":
+        return True
+    if not isinstance(tweet_text, str):
+        return False
+    return PATTERNS[mode].search(tweet_text) is not None
+
+
+def scan(tweet_text: str, mode: str = "off") -> tuple:
+    """(LooksLikeMove, passes the `mode` gate), from one pass over the tweet."""
+    if not isinstance(tweet_text, str):
+        return False, mode == "off"
+    match = SCAN_PATTERN.search(tweet_text)
+    if match is None:
+        return False, mode == "off"
+    if match.group("move"):
+        return True, True
+    # A recall-only word came first: only the rest of the tweet can still hold a move keyword
+    looks_like_move = PATTERNS["precision"].search(tweet_text, match.start() + 1) is not None
+    return looks_like_move, mode != "precision" or looks_like_move
+
+
+class PrefilterStats:
+    """Counts tweets checked by the gate and those it kept from the LLM."""
+
+    def __init__(self, mode: str = "off"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown prefilter mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.checked = 0
+        self.passed = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.checked - self.passed
+
+    def allow(self, tweet_text: str) -> bool:
+        return self.check(tweet_text)[1]
+
+    def check(self, tweet_text: str) -> tuple:
+        """(LooksLikeMove, allowed through), counting the tweet."""
+        looks_like_move, passed = scan(tweet_text, self.mode)
+        self.checked += 1
+        self.passed += passed
+        return looks_like_move, passed
+
+    def report(self) -> str:
+        # Tweets, not requests: in batch mode several tweets share one request
+        share = self.skipped / self.checked if self.checked else 0.0
+        return (
+            f"🔎 Prefilter ({self.mode}): {self.checked} tweets checked, "
+            f"{self.passed} sent on to the LLM, {self.skipped} tweets skipped ({share:.0%})"
+        )
@@ -0,0 +1,207 @@
+"""
+response_cache.py
+
+On-disk cache of LLM extraction records, so reruns and reposts don't pay twice.
+
+Entries are keyed by a hash of the normalized tweet text plus prompt version, model and
+temperature. A 64-bit SimHash of the text (split into four 16-bit bands, so any
+fingerprint within 3 bits shares at least one band) finds trivially edited reposts:
+different link, emoji, punctuation or spacing. A near-duplicate only counts if it names
+the same players, clubs and figures, so "X joins Y" never answers for "X joins Z".
+
+Old entries are dropped by age and, past `max_entries`, least recently used first.
+
+Lookups never write: the hits' `last_used` times are kept in memory and saved with the next
+`put_many` (one transaction per call) or at `close`. The connection may be used from any
+thread, one call at a time, so the pipeline runs both off its event loop.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+URL_RE = re.compile(r"https?://\S+")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Capitalised words and numbers: the names, clubs and fees a repost must keep
+SALIENT_RE = re.compile(r"\b(?:[A-ZÀ-Ý][\w'’-]+|\d[\d.,]*)")
+
+SIMHASH_BITS = 64
+BANDS = 4
+NEAR_DUPLICATE_DISTANCE = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    salient TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_band0 ON responses (scope, band0);
+CREATE INDEX IF NOT EXISTS idx_band1 ON responses (scope, band1);
+CREATE INDEX IF NOT EXISTS idx_band2 ON responses (scope, band2);
+CREATE INDEX IF NOT EXISTS idx_band3 ON responses (scope, band3);
+CREATE INDEX IF NOT EXISTS idx_last_used ON responses (last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    text = URL_RE.sub(" ", str(text))
+    return " ".join(WORD_RE.findall(text.lower()))
+
+
+def salient_signature(text: str) -> str:
+    tokens = sorted(set(SALIENT_RE.findall(URL_RE.sub(" ", str(text)))))
+    return hashlib.sha1("\x1f".join(tokens).encode("utf-8")).hexdigest()
+
+
+def simhash(normalized: str) -> int:
+    words = normalized.split()
+    # Word bigrams keep some ordering information
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    # Bit strings, most significant bit first; a bit is set when most features have it set
+    rows = [
+        format(int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for f in features
+    ]
+    return int("".join("1" if 2 * column.count("1") > len(rows) else "0" for column in zip(*rows)), 2)
+
+
+def to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def bands(fingerprint: int) -> list:
+    width = SIMHASH_BITS // BANDS
+    return [(fingerprint >> (i * width)) & ((1 << width) - 1) for i in range(BANDS)]
+
+
+class ResponseCache:
+    """SQLite-backed cache of extraction records for one prompt/model/temperature."""
+
+    def __init__(self, path: str, prompt_version: str, model: str, temperature: float,
+                 max_entries: int = 200000, max_age_days: float = 90.0, near_duplicates: bool = True):
+        # WAL + a generous busy timeout: shard workers share one cache file
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.scope = f"{prompt_version}|{model}|{float(temperature)}"
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.near_duplicates = near_duplicates
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        # key -> last_used of hits not yet written back
+        self.touched = {}
+        self._lock = threading.Lock()
+        self.evict()
+
+    def key(self, normalized: str) -> str:
+        return hashlib.sha256(f"{self.scope}\x1f{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, tweet_text: str):
+        return self.get_many([tweet_text])[0]
+
+    def get_many(self, tweet_texts: list) -> list:
+        """Cached record (or None) for each text, in order."""
+        with self._lock:
+            return [self._get(text) for text in tweet_texts]
+
+    def _get(self, tweet_text: str):
+        normalized = normalize_text(tweet_text)
+        key = self.key(normalized)
+        row = self.conn.execute("SELECT record FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.hits += 1
+            self.touched[key] = time.time()
+            return json.loads(row[0])
+
+        if self.near_duplicates:
+            match = self._near_duplicate(tweet_text, normalized)
+            if match is not None:
+                self.near_hits += 1
+                self.touched[match[0]] = time.time()
+                return json.loads(match[1])
+
+        self.misses += 1
+        return None
+
+    def _near_duplicate(self, tweet_text: str, normalized: str):
+        fingerprint = simhash(normalized)
+        b = bands(fingerprint)
+        candidates = self.conn.execute(
+            """SELECT key, record, simhash FROM responses
+               WHERE scope = ? AND salient = ?
+               AND (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?)""",
+            (self.scope, salient_signature(tweet_text), *b)
+        ).fetchall()
+        best = None
+        for key, record, other in candidates:
+            distance = bin(fingerprint ^ (other & ((1 << 64) - 1))).count("1")
+            if distance <= NEAR_DUPLICATE_DISTANCE and (best is None or distance < best[2]):
+                best = (key, record, distance)
+        return best
+
+    def put(self, tweet_text: str, record: dict):
+        self.put_many([(tweet_text, record)])
+
+    def put_many(self, items: list):
+        """Store (tweet_text, record) pairs, with the pending `last_used` times, in one commit."""
+        now = time.time()
+        values = []
+        for tweet_text, record in items:
+            normalized = normalize_text(tweet_text)
+            fingerprint = simhash(normalized)
+            values.append((self.key(normalized), self.scope, salient_signature(tweet_text),
+                           to_signed(fingerprint), *bands(fingerprint), json.dumps(record), now, now))
+        with self._lock, self.conn:
+            self._save_touched()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values
+            )
+
+    def _save_touched(self):
+        self.conn.executemany(
+            "UPDATE responses SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self.touched.items()]
+        )
+        self.touched = {}
+
+    def evict(self):
+        with self._lock:
+            # Hits first, so entries read this run aren't evicted as least recently used
+            self._save_touched()
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,))
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self.conn.commit()
+
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+    def report(self) -> str:
+        lookups = self.hits + self.near_hits + self.misses
+        rate = (self.hits + self.near_hits) / lookups if lookups else 0.0
+        return (
+            f"🗄️ Response cache: {self.hits} exact hits, {self.near_hits} near-duplicate hits, "
+            f"{self.misses} misses ({rate:.0%} hit rate)"
+        )
@@ -2,48 +2,86 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
-# Load data
-df = pd.read_csv("data/fabrizio_may_to_june_structured_v1_5.csv")
+from filter_index import filter_frame
+from rumor_data import get_live_feed, get_rumor_data, get_views
+from rumor_table import csv_export, filter_signature, paginated_table, sorted_rows
+
+# Delta parts written by live_tail.py
+LIVE_DIR = "data/live_rumors"
+LIVE_REFRESH_SECONDS = 2
 
 st.set_page_config(page_title="Transfer Credibility Dashboard (v1.5+)", layout="wide")
 st.title("🎯 Transfer Credibility Dashboard (Powered by MITCHARD v1.5)")
 
-# Bin statuses
-def bin_status(status):
-    s = str(status).lower()
-    if any(kw in s for kw in ["here we go", "confirmed", "official"]): return "Confirmed"
-    if any(kw in s for kw in ["deal agreed", "agreement", "contract signed"]): return "Deal Agreed"
-    if any(kw in s for kw in ["advanced", "closing in", "personal terms"]): return "Advanced Talks"
-    if any(kw in s for kw in ["interest", "targeted", "monitoring", "keen", "approached"]): return "Linked / Interest"
-    if any(kw in s for kw in ["rejected", "deal off", "collapsed"]): return "Rejected / Off"
-    if any(kw in s for kw in ["appointment", "manager", "not staying"]): return "Manager Related"
-    if "confirmed exit" in s: return "Confirmed Exit"
-    return "Other / Ambiguous"
-
-df["status_bin"] = df["status"].apply(bin_status)
+# Load data once per process (Parquet sidecar of the CSV), shared read-only by all sessions
+DATA_FILE = "data/fabrizio_may_to_june_structured_v1_5.csv"
+data = get_rumor_data(DATA_FILE)
+df = data.df
+# Status and club options from the precomputed rollups (rumor_views.py), live parts included
+views = get_views(DATA_FILE, LIVE_DIR)
+status_bins = sorted(views["status_rumor_summary"]["status_bin"].dropna())
 
 # Sidebar
 st.sidebar.header("Filters")
-status_bins = sorted(df["status_bin"].dropna().unique())
+search = st.sidebar.text_input("🔎 Search tweets and reasons", placeholder='release clause, "here we go", mbap*').strip()
 selected_bins = st.sidebar.multiselect("Status Category", options=status_bins, default=status_bins)
-clubs = sorted(set(df["destination_club"].dropna()) | set(df["origin_club"].dropna()))
-club_choice = st.sidebar.selectbox("Club (To or From)", ["All"] + clubs)
-min_cert, max_cert = df["certainty_score"].min(), df["certainty_score"].max()
+club_choice = st.sidebar.selectbox("Club (To or From)", ["All"] + sorted(views["club_rumor_activity"]["club"].dropna()))
+min_cert, max_cert = data.min_certainty, data.max_certainty
 score_range = st.sidebar.slider("Certainty Score Range", 0.0, 1.0, (min_cert, max_cert), step=0.05)
 
-# Filter data
-filtered = df[df["status_bin"].isin(selected_bins)]
-filtered = filtered[filtered["certainty_score"].between(score_range[0], score_range[1])]
-if club_choice != "All":
-    filtered = filtered[(filtered["destination_club"] == club_choice) | (filtered["origin_club"] == club_choice)]
+# Filter data by intersecting the precomputed indexes
+rows = data.index.query(
+    within=data.search(search) if search else None,
+    status_bin=selected_bins,
+    score_range=score_range,
+    club=None if club_choice == "All" else club_choice,
+    is_transfer_rumor=[True]
+)
+by_certainty = sorted_rows(df, rows, "certainty_score")
+
+# Display columns are added to the rows actually shown or exported, not every match
+def prepare(rumors):
+    rumors["Label"] = rumors["player"].astype(object).fillna("Unknown") + " → " + rumors["destination_club"].astype(object).fillna("???")
+    return rumors
+
+# Live mode: rumors structured by live_tail.py since the data file was built. Only the
+# fragment below reruns on the timer, and it fetches just the parts this session hasn't seen.
+live_mode = st.sidebar.checkbox("🔴 Live updates (live_tail.py)", value=False)
+if live_mode:
+    feed = get_live_feed(LIVE_DIR)
+    if "live_seq" not in st.session_state:
+        st.session_state.live_seq, st.session_state.live_rows = 0, None
+
+    @st.fragment(run_every=LIVE_REFRESH_SECONDS)
+    def live_panel():
+        new_rows, st.session_state.live_seq = feed.since(st.session_state.live_seq)
+        if new_rows is not None:
+            st.session_state.live_rows = pd.concat([st.session_state.live_rows, new_rows], ignore_index=True)
+        if st.session_state.live_rows is None:
+            st.caption("🔴 Waiting for live_tail.py to publish new rumors…")
+            return
+        live_rows = st.session_state.live_rows
+        if search:
+            # Feed positions count every part since the start, as this session's rows do
+            matches = feed.search(search)
+            live_rows = live_rows.take(matches[matches < len(live_rows)])
+        live = filter_frame(
+            live_rows,
+            status_bin=selected_bins,
+            score_range=score_range,
+            club=None if club_choice == "All" else club_choice,
+            is_transfer_rumor=[True]
+        )
+        st.subheader(f"🔴 {len(live)} Live Rumors")
+        st.dataframe(live[
+            ["Posted_Time", "player", "origin_club", "destination_club", "status", "status_bin", "certainty_score", "tweet_text"]
+        ].iloc[::-1], use_container_width=True)
 
-rumors = filtered[filtered["is_transfer_rumor"] == True].copy()
-rumors["Label"] = rumors["player"].fillna("Unknown") + " → " + rumors["destination_club"].fillna("???")
-rumors["certainty_score"] = pd.to_numeric(rumors["certainty_score"], errors="coerce")
+    live_panel()
 
 # Top 10 Chart
 st.subheader("🔝 Top 10 Credible Transfer Rumors")
-top10 = rumors.sort_values("certainty_score", ascending=False).head(10)
+top10 = prepare(data.take(by_certainty[:10]).copy())
 if not top10.empty:
     chart = alt.Chart(top10).mark_bar().encode(
         x=alt.X("certainty_score", title="Certainty Score"),
@@ -54,12 +92,14 @@ if not top10.empty:
 else:
     st.info("No rumors match your filters.")
 
-# Full table
-st.subheader(f"📋 {len(rumors)} Matching Transfer Rumors")
-st.dataframe(rumors[
-    ["player", "origin_club", "destination_club", "status", "status_bin", "certainty_score", "reason", "tweet_text"]
-].sort_values("certainty_score", ascending=False), use_container_width=True)
+# Full table, one page at a time
+st.subheader(f"📋 {len(rows)} Matching Transfer Rumors")
+signature = filter_signature(data.key, rows)
+paginated_table(
+    data, by_certainty,
+    ["player", "origin_club", "destination_club", "status", "status_bin", "certainty_score", "reason", "tweet_text"],
+    key="v1_5_table", signature=signature
+)
 
-# Download button
-csv = rumors.to_csv(index=False).encode("utf-8")
-st.download_button("📥 Download filtered rumors as CSV", csv, "filtered_rumors_v1_5.csv", "text/csv")
+# Download button (the CSV is only built when asked for)
+csv_export(data, rows, signature, "📥 Download filtered rumors as CSV", "filtered_rumors_v1_5.csv", key="v1_5", prepare=prepare)
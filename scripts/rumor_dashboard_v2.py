@@ -2,105 +2,90 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
+from rumor_data import get_rumor_data, get_views
+from rumor_table import csv_export, filter_signature, paginated_table, sorted_rows
+
 # Load structured file (you can update the path to the new dataset)
-df = pd.read_csv("data/transfer_rumors_with_tags_and_bins.csv")
+# Read from a Parquet sidecar of the CSV. Every column is loaded: the CSV export carries the
+# whole table (tweet_text / reason stay in their text blobs until a row is shown or exported)
+DATA_FILE = "data/transfer_rumors_with_tags_and_bins.csv"
 
 st.set_page_config(page_title="Transfer Credibility Dashboard (v2)", layout="wide")
 st.title("🎯 Transfer Credibility Dashboard (Powered by MITCHARD v2)")
 
-# 🧠 Helper: Bin messy statuses into categories
-def bin_status(status):
-    s = str(status).lower()
-
-    if any(kw in s for kw in ["here we go", "confirmed", "official"]):
-        return "Confirmed"
-    if any(kw in s for kw in ["deal agreed", "agreement", "contract signed"]):
-        return "Deal Agreed"
-    if any(kw in s for kw in ["advanced", "closing in", "personal terms"]):
-        return "Advanced Talks"
-    if any(kw in s for kw in ["interest", "targeted", "monitoring", "keen", "approached"]):
-        return "Linked / Interest"
-    if any(kw in s for kw in ["rejected", "deal off", "collapsed"]):
-        return "Rejected / Off"
-    if any(kw in s for kw in ["appointment", "manager", "not staying"]):
-        return "Manager Related"
-    if "confirmed exit" in s:
-        return "Confirmed Exit"
-    return "Other / Ambiguous"
-
-df["status_bin"] = df["status"].apply(bin_status)
+# Loaded, binned and coerced once per process and shared by every session (read-only)
+data = get_rumor_data(DATA_FILE)
+df = data.df
+# Status and club options come from the precomputed rollups (rumor_views.py), not the archive
+views = get_views(DATA_FILE)
 
 # Sidebar filters
 st.sidebar.header("Filters")
 
+# Free-text search (prebuilt inverted index over tweet text and reason)
+search = st.sidebar.text_input("🔎 Search tweets and reasons", placeholder='release clause, "here we go", mbap*').strip()
+
 # Status bin filter
-status_bins = sorted(df["status_bin"].dropna().unique())
+status_bins = sorted(views["status_rumor_summary"]["status_bin"].dropna())
 selected_bins = st.sidebar.multiselect("Status Category", options=status_bins, default=status_bins)
 
 # Club filter
-clubs = sorted(set(df["destination_club"].dropna().unique()) | set(df["origin_club"].dropna().unique()))
-club_choice = st.sidebar.selectbox("Club (To or From)", options=["All"] + clubs)
+club_choice = st.sidebar.selectbox("Club (To or From)", options=["All"] + sorted(views["club_rumor_activity"]["club"].dropna()))
 
 # Certainty score filter
-min_cert, max_cert = float(df["certainty_score"].min()), float(df["certainty_score"].max())
+min_cert, max_cert = data.min_certainty, data.max_certainty
 score_range = st.sidebar.slider("Certainty Score Range", min_value=0.0, max_value=1.0, value=(min_cert, max_cert), step=0.05)
 
-# Apply filters with proper logic
-filtered = df[
-    (df["status_bin"].isin(selected_bins)) &
-    (df["certainty_score"].between(score_range[0], score_range[1]))
-]
-
-if club_choice != "All":
-    filtered = filtered[
-        (filtered["destination_club"] == club_choice) | (filtered["origin_club"] == club_choice)
-    ]
-
 # Hide completed transfers toggle
 hide_completed = st.sidebar.checkbox("Hide completed transfers (Confirmed / Deal Agreed / Exit)", value=False)
 if hide_completed:
-    filtered = filtered[~filtered["status_bin"].isin(["Confirmed", "Deal Agreed", "Confirmed Exit"])]
+    selected_bins = [b for b in selected_bins if b not in ["Confirmed", "Deal Agreed", "Confirmed Exit"]]
+
+# Apply filters by intersecting precomputed indexes (row positions, original order)
+index = data.index
+rows = index.query(
+    within=data.search(search) if search else None,
+    status_bin=selected_bins,
+    score_range=score_range,
+    club=None if club_choice == "All" else club_choice
+)
 
 # Certainty bin toggle
-if "certainty_bin_label" in filtered.columns:
+if "certainty_bin_label" in index.facets:
     show_certainty_bins = st.sidebar.checkbox("Show MITCHARD bins (e.g. 'Ghosted', 'No Shot')", value=False)
     if show_certainty_bins:
-        available_bins = sorted(filtered["certainty_bin_label"].dropna().unique())
+        available_bins = index.values_in("certainty_bin_label", rows)
         selected_certainty_bins = st.sidebar.multiselect("Certainty Category (MITCHARD)", options=available_bins, default=available_bins)
-        filtered = filtered[filtered["certainty_bin_label"].isin(selected_certainty_bins)]
+        rows = index.query(within=rows, certainty_bin_label=selected_certainty_bins)
 
 # Speculation flag toggle
 show_speculation_filter = st.sidebar.checkbox("Show narrative speculation filters (Laporta, Galactico, etc.)", value=False)
-if show_speculation_filter and "speculation_flag" in filtered.columns:
-    available_flags = sorted(filtered["speculation_flag"].dropna().unique())
+if show_speculation_filter and "speculation_flag" in index.facets:
+    available_flags = index.values_in("speculation_flag", rows)
     selected_flags = st.sidebar.multiselect("Speculation Tags", options=available_flags, default=available_flags)
-    filtered = filtered[filtered["speculation_flag"].isin(selected_flags)]
+    rows = index.query(within=rows, speculation_flag=selected_flags)
 
 # Filter only rumors
-rumors = filtered[filtered["is_transfer_rumor"] == True].copy()
+rows = index.query(within=rows, is_transfer_rumor=[True])
 
-# Prepare for display
-rumors["Label"] = rumors["player"].fillna("Unknown") + " → " + rumors["destination_club"].fillna("???")
-rumors["certainty_score"] = pd.to_numeric(rumors["certainty_score"], errors="coerce").clip(upper=1.0)
+# Prepare for display (applied to the visible page or an export chunk, not every match)
+def prepare(rumors):
+    rumors["Label"] = rumors["player"].astype(object).fillna("Unknown") + " → " + rumors["destination_club"].astype(object).fillna("???")
+    rumors["certainty_score"] = rumors["certainty_score"].clip(upper=1.0)
+    return rumors
 
 # Highest-value rumors (deduplicated) by probability
 st.subheader("💸 Top 10 Highest-Value Rumors (by Transfer Probability)")
 
-# Deduplicate: keep highest-probability rumor per player → destination
-deduped = (
-    rumors
-    .sort_values("certainty_score", ascending=False)
-    .drop_duplicates(subset=["player", "destination_club"])
-    .copy()
-)
+# Highest-probability rumor per player → destination, top 10 by player value
+# (ranked from the shared index instead of sorting every matching rumor)
+top10_prob = data.take(data.ranking.top(rows, k=10, by="market_value_eur")).copy()
 
 # Fill missing values
-deduped["player"] = deduped["player"].fillna("Unknown")
-deduped["destination_club"] = deduped["destination_club"].fillna("???")
-deduped["Label"] = deduped["player"] + " → " + deduped["destination_club"]
-
-# Sort by player value to highlight high-value targets
-top10_prob = deduped.sort_values("market_value_eur", ascending=False).head(10)
+top10_prob["certainty_score"] = top10_prob["certainty_score"].clip(upper=1.0)
+top10_prob["player"] = top10_prob["player"].astype(object).fillna("Unknown")
+top10_prob["destination_club"] = top10_prob["destination_club"].astype(object).fillna("???")
+top10_prob["Label"] = top10_prob["player"] + " → " + top10_prob["destination_club"]
 
 if top10_prob.empty:
     st.info("No rumors match your filters.")
@@ -113,12 +98,14 @@ else:
 
     st.altair_chart(chart, use_container_width=True)
 
-# Full table
-st.subheader(f"📋 {len(rumors)} Matching Transfer Rumors")
-st.dataframe(rumors[
-    ["player", "origin_club", "destination_club", "status", "status_bin", "certainty_score", "market_value_eur", "reason", "tweet_text"]
-].sort_values("certainty_score", ascending=False), use_container_width=True)
+# Full table, one page at a time
+st.subheader(f"📋 {len(rows)} Matching Transfer Rumors")
+signature = filter_signature(data.key, rows)
+paginated_table(
+    data, sorted_rows(df, rows, "certainty_score"),
+    ["player", "origin_club", "destination_club", "status", "status_bin", "certainty_score", "market_value_eur", "reason", "tweet_text"],
+    key="v2_table", prepare=prepare, signature=signature
+)
 
-# Download
-csv = rumors.to_csv(index=False).encode("utf-8")
-st.download_button("📅 Download filtered rumors as CSV", csv, "filtered_rumors_v2.csv", "text/csv")
+# Download (the CSV is only built when asked for)
+csv_export(data, rows, signature, "📅 Download filtered rumors as CSV", "filtered_rumors_v2.csv", key="v2", prepare=prepare)
@@ -0,0 +1,208 @@
+"""
+rumor_data.py
+
+Shared, cached data access for the Streamlit dashboards.
+
+Streamlit reruns the whole dashboard script on every widget change. Loading, status
+binning, canonical club-name columns, numeric coercion and the club list are done once
+per process instead, under `st.cache_resource`, so every session shares a single
+in-memory copy. The cache key includes the Parquet store's mtime, so a rebuilt data file
+is picked up on the next rerun.
+
+The shared frame must be treated as read-only; filter into new frames or `.copy()`.
+
+It is kept compact: player, club, status and bin columns are dictionary-encoded, the
+certainty score is float32, and tweet_text / reason stay out of the frame in memory-mapped
+text blobs (text_blob.py). `RumorData.take(rows)` returns rows with that text filled in,
+so only displayed or exported rows are ever decoded.
+
+`RumorData.search(query)` answers the search box from a prebuilt full-text index over
+the store's text columns (text_search.py); its row positions go into `index.query(within=...)`.
+
+`get_views` serves the materialized rollups of rumor_views.py (latest rumor per player and
+destination, per-club and per-status activity): a few hundred rows that were built
+incrementally, so the dashboards' filter options never aggregate the archive on load. Missing views are
+built first. Stale ones are brought up to date only if no other process or session is
+writing them (usually live_tail.py folding in the part it just published); otherwise the
+stored views are shown until then. The cache key is the views' state file mtime.
+
+`get_live_feed` serves rows published by live_tail.py: each part file is read once per
+process (and added to the feed's search index), and each session only asks for the parts
+after the last one it has.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+from filter_index import CLUB_COLUMNS, RumorIndex
+from rumor_ranking import BEST_BY, KEY_COLUMNS, RumorRanking
+from rumor_store import ensure_store, read_deltas, read_rumors
+from rumor_views import (
+    CANONICAL_CLUB_COLUMNS, STATE_FILE, ViewMaterializer, prepare_rumors, read_views, view_dir, views_current,
+    views_lock
+)
+from text_blob import TEXT_COLUMNS, ensure_text_blobs
+from text_search import TextIndex, ensure_search_index, search_columns
+
+# Few distinct values, repeated on every row: stored as codes into one copy of each string
+DICTIONARY_COLUMNS = [
+    "player", "origin_club", "destination_club", "origin_club_canonical", "destination_club_canonical",
+    "current_club_name", "status", "status_bin",
+    "certainty_bin", "certainty_bin_label", "speculation_flag", "position"
+]
+FLOAT32_COLUMNS = ["certainty_score"]
+LIVE_TEXT_COLUMNS = ["tweet_text", "reason"]
+
+
+class RumorData:
+    """A loaded rumor table, its filter indexes, ranking and the values the sidebar widgets need."""
+
+    def __init__(self, df: pd.DataFrame, key=None, text: dict = None, columns: list = None,
+                 search_index: TextIndex = None):
+        self.df = df
+        # (path, mtime, columns): identifies this copy of the data, e.g. in export cache keys
+        self.key = key
+        # Out-of-line text columns ({column: TextBlob}) and the table's full column order, which
+        # leaves out the canonical club columns: they match and group, the raw names are shown
+        self.text = text or {}
+        self.columns = [
+            c for c in columns or list(df.columns) + [c for c in self.text if c not in df.columns]
+            if c not in CANONICAL_CLUB_COLUMNS.values()
+        ]
+        # Full-text index over every text column of the store
+        self.search_index = search_index
+        self.status_bins = sorted(df["status_bin"].dropna().unique())
+        self.clubs = sorted(set().union(*(df[col].dropna().unique() for col in CLUB_COLUMNS)))
+        # Rounded so float32 scores give the slider its usual 0.85 rather than 0.8500000238
+        self.min_certainty = round(float(df["certainty_score"].min()), 6)
+        self.max_certainty = round(float(df["certainty_score"].max()), 6)
+        self.index = RumorIndex(df)
+        has_ranking_columns = all(col in df.columns for col in KEY_COLUMNS + [BEST_BY])
+        self.ranking = RumorRanking(df) if has_ranking_columns else None
+
+    def take(self, rows) -> pd.DataFrame:
+        """Rows at positions `rows`, with the out-of-line text columns decoded for just those rows."""
+        frame = self.df.take(rows)
+        if not self.text:
+            return frame[self.columns]
+        rows = np.asarray(rows, dtype=np.intp)
+        frame = frame.assign(**{col: pd.Series(blob.get(rows), index=frame.index, dtype=object)
+                                for col, blob in self.text.items()})
+        return frame[self.columns]
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted row positions whose text matches `query` (every row if it has no words)."""
+        if self.search_index is None:
+            return np.arange(len(self.df))
+        return self.search_index.search(query)
+
+    def memory_usage(self) -> dict:
+        """Bytes held per session-shared copy: the frame (heap) and the text blobs (page cache)."""
+        return {
+            "frame": int(self.df.memory_usage(index=True, deep=True).sum()),
+            "text_blobs": sum(blob.nbytes() for blob in self.text.values()),
+        }
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    for col in DICTIONARY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def load_rumor_data(path: str, columns: list = None, key=None) -> RumorData:
+    """Compact RumorData for `columns` (default: all) of a Parquet store, text kept in blobs."""
+    names = pq.read_schema(path).names
+    wanted = [c for c in (columns or names) if c in names]
+    text_columns = [c for c in wanted if c in TEXT_COLUMNS]
+    df = _compact(prepare_rumors(read_rumors(path, [c for c in wanted if c not in text_columns])))
+    return RumorData(
+        df, key, ensure_text_blobs(path, text_columns),
+        wanted + [c for c in df.columns if c not in wanted],
+        ensure_search_index(path) if search_columns(path) else None
+    )
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load(path: str, mtime: float, columns: tuple) -> RumorData:
+    return load_rumor_data(path, list(columns) if columns else None, (path, mtime, columns))
+
+
+def get_rumor_data(csv_path: str, columns: list = None) -> RumorData:
+    """Load `columns` of `csv_path` (via its Parquet store), cached across reruns and sessions."""
+    path = ensure_store(csv_path)
+    return _load(path, os.path.getmtime(path), tuple(columns) if columns else None)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_views(directory: str, mtime: float) -> dict:
+    return read_views(directory)
+
+
+def get_views(csv_path: str, delta_dir: str = None) -> dict:
+    """{view name: frame} for `csv_path` (plus `delta_dir` parts), updated first if stale."""
+    directory = view_dir(csv_path)
+    state_path = os.path.join(directory, STATE_FILE)
+    if not views_current(csv_path, delta_dir):
+        # Whoever holds the lock is already updating them: wait only if there is nothing to show
+        with views_lock(directory, blocking=not os.path.exists(state_path)) as locked:
+            if locked and not views_current(csv_path, delta_dir):
+                ViewMaterializer(csv_path, delta_dir).sync()
+    return _load_views(directory, os.path.getmtime(state_path))
+
+
+class LiveFeed:
+    """Rows published by live_tail.py, read once per process and shared by every session."""
+
+    def __init__(self, delta_dir: str):
+        self.delta_dir = delta_dir
+        self.seq = 0
+        self.parts = []
+        # Grows with each part, so live rows are searchable as soon as they arrive
+        self.search_index = TextIndex()
+        # Best rumor per (player, destination) over every part, added to as parts land
+        self.ranking = None
+        self._lock = threading.Lock()
+
+    def since(self, seq: int):
+        """(rows from parts newer than `seq` or None, latest part seq)."""
+        with self._lock:
+            for part_seq, rows in read_deltas(self.delta_dir, self.seq):
+                rows = prepare_rumors(rows)
+                self.parts.append((part_seq, rows))
+                self.seq = part_seq
+                if self.ranking is not None:
+                    self.ranking.add(rows)
+                elif all(col in rows.columns for col in KEY_COLUMNS + [BEST_BY]):
+                    self.ranking = RumorRanking(rows)
+                self.search_index.append(*(
+                    rows[col].tolist() if col in rows else [None] * len(rows) for col in LIVE_TEXT_COLUMNS
+                ))
+            new = [rows for part_seq, rows in self.parts if part_seq > seq]
+            return (pd.concat(new, ignore_index=True) if new else None), self.seq
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted positions, across every part so far, of live rows matching `query`."""
+        with self._lock:
+            return self.search_index.search(query)
+
+    def top(self, rows, k: int = 10, by: str = "certainty_score") -> np.ndarray:
+        """Positions, across every part so far, of the top `k` best-per-key live rumors among `rows`."""
+        with self._lock:
+            if self.ranking is None:
+                return np.empty(0, dtype=np.intp)
+            return self.ranking.top(rows, k=k, by=by)
+
+
+@st.cache_resource(show_spinner=False)
+def get_live_feed(delta_dir: str) -> LiveFeed:
+    return LiveFeed(delta_dir)
@@ -0,0 +1,146 @@
+"""
+rumor_ranking.py
+
+Top-K rumor ranking for the dashboard panels, without re-sorting the archive per rerun.
+- Best rumor per (player, canonical destination club): highest certainty_score, earliest row on ties
+- Top K of those best rumors by any numeric column (e.g. market_value_eur), NaN last
+
+Two orders are built once per table and kept sorted as rumors are added (binary-search
+inserts, no re-sort): rows by (key, certainty) and rows by (metric, certainty) per metric.
+rumor_data.py adds each live part as it lands, and rebuilds the archive's ranking with the
+rest of the table when the store's mtime changes.
+A query for a large filtered set walks the metric order with a small heap and stops after
+K winners; a small filtered set is ranked directly. Either way a click costs far less than
+sorting every matching rumor twice.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["player", "destination_club_canonical"]
+BEST_BY = "certainty_score"
+METRICS = ["market_value_eur", "certainty_score"]
+# Below this share of the table, rank the filtered rows directly instead of walking the metric order
+SCAN_MIN_FRACTION = 1 / 64
+SCAN_CHUNK = 1024
+
+
+def _descending(values) -> np.ndarray:
+    # Ascending sort key for a descending order with NaN last
+    keys = -pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    keys[np.isnan(keys)] = np.inf
+    return keys
+
+
+class _SortedRows:
+    """Row ids kept sorted by a tuple of ascending keys (ties: lower row first)."""
+
+    def __init__(self, keys: list):
+        self.order = np.lexsort(keys[::-1])
+        self.keys = [k[self.order] for k in keys]
+
+    def insert(self, rows: np.ndarray, keys: list):
+        # New rows come after every existing row, so they go after existing ties
+        batch = np.lexsort(keys[::-1])
+        rows, keys = rows[batch], [k[batch] for k in keys]
+        positions = np.empty(len(rows), dtype=np.intp)
+        for i in range(len(rows)):
+            lo, hi = 0, len(self.order)
+            for sorted_key, key in zip(self.keys, keys):
+                block = sorted_key[lo:hi]
+                lo, hi = lo + np.searchsorted(block, key[i], "left"), lo + np.searchsorted(block, key[i], "right")
+            positions[i] = hi
+        self.order = np.insert(self.order, positions, rows)
+        self.keys = [np.insert(s, positions, k) for s, k in zip(self.keys, keys)]
+
+    def block(self, first_key) -> np.ndarray:
+        """Rows whose primary key equals `first_key`, in order."""
+        lo = np.searchsorted(self.keys[0], first_key, "left")
+        hi = np.searchsorted(self.keys[0], first_key, "right")
+        return self.order[lo:hi]
+
+
+class RumorRanking:
+    """Best rumor per (player, destination) and the top K of them, for any filtered row set."""
+
+    def __init__(self, df: pd.DataFrame, key_columns: list = KEY_COLUMNS, best_by: str = BEST_BY,
+                 metrics: list = METRICS):
+        self.key_columns = key_columns
+        self.best_by = best_by
+        self.size = 0
+        self.group_ids = {}
+        self.groups = np.empty(0, dtype=float)
+        self.best_keys = np.empty(0, dtype=float)
+        self.metrics = {col: np.empty(0, dtype=float) for col in metrics if col in df.columns}
+        self.by_group = None
+        self.by_metric = {}
+        self.add(df)
+
+    def _group_codes(self, df: pd.DataFrame) -> np.ndarray:
+        # Missing player/club is a key value of its own, as in drop_duplicates
+        keys = zip(*(df[col].astype(object).where(df[col].notna(), None) for col in self.key_columns))
+        return np.array([self.group_ids.setdefault(key, len(self.group_ids)) for key in keys], dtype=float)
+
+    def add(self, df: pd.DataFrame):
+        """Add rumors (rows `size`, `size` + 1, ...) to the ranking."""
+        rows = np.arange(self.size, self.size + len(df))
+        groups, best_keys = self._group_codes(df), _descending(df[self.best_by])
+        self.groups = np.concatenate([self.groups, groups])
+        self.best_keys = np.concatenate([self.best_keys, best_keys])
+        if self.by_group is None:
+            self.by_group = _SortedRows([self.groups, self.best_keys])
+        else:
+            self.by_group.insert(rows, [groups, best_keys])
+
+        for column in self.metrics:
+            metric = _descending(df[column])
+            self.metrics[column] = np.concatenate([self.metrics[column], metric])
+            if column in self.by_metric:
+                self.by_metric[column].insert(rows, [metric, best_keys])
+            else:
+                self.by_metric[column] = _SortedRows([self.metrics[column], self.best_keys])
+        self.size += len(df)
+
+    def best_rows(self, rows: np.ndarray) -> np.ndarray:
+        """The best row per key among `rows`, in key order."""
+        ordered = rows[np.lexsort((rows, self.best_keys[rows], self.groups[rows]))]
+        first = np.ones(len(ordered), dtype=bool)
+        first[1:] = self.groups[ordered[1:]] != self.groups[ordered[:-1]]
+        return ordered[first]
+
+    def top(self, rows: np.ndarray, k: int = 10, by: str = "market_value_eur") -> np.ndarray:
+        """Row positions of the top `k` best-per-key rumors among `rows`, by `by` descending."""
+        rows = np.asarray(rows, dtype=np.intp)
+        order, metric = self.by_metric[by].order, self.metrics[by]
+        if len(rows) < self.size * SCAN_MIN_FRACTION:
+            winners = self.best_rows(rows)
+            ranked = winners[np.lexsort((winners, self.best_keys[winners], metric[winners]))]
+            return ranked[:k]
+
+        selected = np.zeros(self.size, dtype=bool)
+        selected[rows] = True
+        decided = set()
+        heap = []
+        top = []
+        # Walk selected rows by metric; a key not met yet can't rank above the current row,
+        # so any heap entry that sorts before it is final
+        for start in range(0, self.size, SCAN_CHUNK):
+            chunk = order[start:start + SCAN_CHUNK]
+            for row in chunk[selected[chunk]].tolist():
+                group = self.groups[row]
+                if group in decided:
+                    continue
+                bound = (metric[row], self.best_keys[row], row)
+                while heap and heap[0] < bound:
+                    top.append(heapq.heappop(heap)[2])
+                    if len(top) == k:
+                        return np.array(top, dtype=np.intp)
+                decided.add(group)
+                candidates = self.by_group.block(group)
+                best = int(candidates[selected[candidates]][0])
+                heapq.heappush(heap, (metric[best], self.best_keys[best], best))
+        while heap and len(top) < k:
+            top.append(heapq.heappop(heap)[2])
+        return np.array(top, dtype=np.intp)
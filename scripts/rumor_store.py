@@ -0,0 +1,117 @@
+"""
+rumor_store.py
+
+Typed, compressed Parquet copies of the structured rumor files for the dashboards.
+- Club, status and bin columns are stored as dictionary-encoded categoricals
+- `read_rumors` loads only the requested columns, memory-mapping the file
+- `ensure_store` (re)builds the Parquet sidecar when the source CSV is newer
+- `write_delta` / `read_deltas`: numbered Parquet parts for rows added while dashboards
+  are open (see live_tail.py); readers only open parts newer than the last one they saw
+
+Usage:
+    python scripts/rumor_store.py data/transfer_rumors_with_tags_and_bins.csv
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Dashboard (snake_case) and structurer (Title_Case) outputs share this file format
+CATEGORICAL_COLUMNS = [
+    "origin_club", "destination_club", "current_club_name", "status", "status_bin",
+    "certainty_bin", "speculation_flag", "position",
+    "From_Club", "To_Club", "Status", "From_Club_Guess", "To_Club_Guess",
+]
+FLOAT_COLUMNS = ["certainty_score", "market_value_eur", "Certainty_Score"]
+INT_COLUMNS = ["player_id", "Tweet_ID"]
+BOOL_COLUMNS = ["is_transfer_rumor", "zombie_rumor", "LooksLikeMove", "LooksLikeMove_LLM", "Prefiltered", "Local_Model"]
+DATE_COLUMNS = ["date", "last_tweet_date", "Posted_Time"]
+DELTA_PART = "part-{:08d}.parquet"
+
+
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif col in FLOAT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif col in INT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        elif col in BOOL_COLUMNS:
+            df[col] = df[col].map({True: True, False: False, "True": True, "False": False}).astype("boolean")
+        elif col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def write_store(df: pd.DataFrame, path: str):
+    table = pa.Table.from_pandas(coerce_types(df), preserve_index=False)
+    # Write to a temp file first so a running dashboard never maps a half-written file
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd", use_dictionary=True)
+    os.replace(tmp_path, path)
+
+
+def store_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def csv_to_store(csv_path: str, path: str = None) -> str:
+    path = path or store_path(csv_path)
+    write_store(pd.read_csv(csv_path), path)
+    return path
+
+
+def ensure_store(csv_path: str) -> str:
+    """Return the Parquet sidecar for `csv_path`, rebuilding it if missing or stale."""
+    path = store_path(csv_path)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+        csv_to_store(csv_path, path)
+    return path
+
+
+def read_rumors(path: str, columns: list = None) -> pd.DataFrame:
+    """Read `columns` (those that exist) from a Parquet store via a memory map."""
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def load_rumors(csv_path: str, columns: list = None) -> pd.DataFrame:
+    return read_rumors(ensure_store(csv_path), columns)
+
+
+def delta_seqs(delta_dir: str) -> list:
+    if not os.path.isdir(delta_dir):
+        return []
+    return sorted(
+        int(name[len("part-"):-len(".parquet")])
+        for name in os.listdir(delta_dir)
+        if name.startswith("part-") and name.endswith(".parquet")
+    )
+
+
+def write_delta(df: pd.DataFrame, delta_dir: str) -> int:
+    """Publish `df` as the next numbered part in `delta_dir`; returns its sequence number."""
+    os.makedirs(delta_dir, exist_ok=True)
+    seq = max(delta_seqs(delta_dir), default=0) + 1
+    write_store(df, os.path.join(delta_dir, DELTA_PART.format(seq)))
+    return seq
+
+
+def read_deltas(delta_dir: str, after_seq: int = 0):
+    """Yield (seq, rows) for each part newer than `after_seq`, oldest first."""
+    for seq in delta_seqs(delta_dir):
+        if seq > after_seq:
+            yield seq, read_rumors(os.path.join(delta_dir, DELTA_PART.format(seq)))
+
+
+if __name__ == "__main__":
+    for csv_path in sys.argv[1:]:
+        print(f"✅ {csv_path} → {csv_to_store(csv_path)}")
@@ -0,0 +1,94 @@
+"""
+rumor_table.py
+
+Table and export widgets shared by the dashboards.
+- `paginated_table`: orders the matching rows by position, then sends only the visible page
+  (rows and tweet text) to the browser
+- `csv_export`: the CSV is only built once someone asks for it, written chunk by chunk, and
+  cached per filter signature, so reruns and other sessions with the same filters reuse it
+
+Both take the shared table (a `RumorData`, or any frame: only `.take(rows)` is used) plus the
+matching row positions, e.g. from `RumorIndex.query`, and never copy more than a page or an
+export chunk of it. With `RumorData` that is also the only text decoded from its blobs.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+DEFAULT_PAGE_SIZE = 50
+EXPORT_CHUNK_ROWS = 50000
+
+
+def sorted_rows(df: pd.DataFrame, rows: np.ndarray, by: str, ascending: bool = False) -> np.ndarray:
+    """`rows` ordered by column `by` (stable, NaN last)."""
+    values = pd.to_numeric(df[by], errors="coerce").to_numpy(dtype=float)[rows]
+    keys = values if ascending else -values
+    return rows[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")]
+
+
+def filter_signature(data_key, rows: np.ndarray) -> tuple:
+    """Identifies a filtered view: the data file plus the exact set of matching rows."""
+    return data_key, hashlib.md5(np.ascontiguousarray(rows, dtype=np.int64).tobytes()).hexdigest()
+
+
+def paginated_table(table, rows: np.ndarray, columns: list, key: str, prepare=None,
+                    signature=None):
+    """Show `rows` of `table` (already in display order) one page at a time.
+
+    `prepare(frame)` is applied to the visible page only. The page resets to 1 when
+    `signature` changes.
+    """
+    size_key, page_key, seen_key = f"{key}_page_size", f"{key}_page", f"{key}_signature"
+    if signature is not None and st.session_state.get(seen_key) != signature:
+        st.session_state[seen_key] = signature
+        st.session_state[page_key] = 1
+
+    left, right, _ = st.columns([1, 1, 4])
+    page_size = left.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=size_key)
+    pages = max(1, -(-len(rows) // page_size))
+    # Fewer pages than before (e.g. a bigger page size): stay on the last one. Clamped here
+    # rather than with max_value, since a changing label or bound would reset the widget.
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = min(right.number_input("Page", min_value=1, step=1, key=page_key), pages)
+
+    start = (page - 1) * page_size
+    visible = table.take(rows[start:start + page_size])
+    if prepare is not None:
+        visible = prepare(visible.copy())
+    st.dataframe(visible[columns], use_container_width=True)
+    if len(rows):
+        st.caption(f"Page {page} of {pages} · rows {start + 1}–{start + len(visible)} of {len(rows)}")
+
+
+def csv_bytes(table, rows: np.ndarray, prepare=None, chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    """CSV of `rows` of `table`, taken and encoded `chunk_rows` at a time."""
+    out = io.BytesIO()
+    for start in range(0, max(len(rows), 1), chunk_rows):
+        chunk = table.take(rows[start:start + chunk_rows])
+        if prepare is not None:
+            chunk = prepare(chunk.copy())
+        out.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+    return out.getvalue()
+
+
+@st.cache_data(max_entries=8, show_spinner="Building CSV…")
+def _cached_csv(signature, _table, _rows, _prepare) -> bytes:
+    # Keyed on the signature alone; the table, rows and prepare function follow from it
+    return csv_bytes(_table, _rows, _prepare)
+
+
+def csv_export(table, rows: np.ndarray, signature, label: str, file_name: str, key: str,
+               prepare=None):
+    """A "prepare" button that turns into the download button for this filter signature."""
+    state_key = f"{key}_export"
+    if st.session_state.get(state_key) != signature:
+        if not st.button(f"📦 Prepare CSV export ({len(rows)} rows)", key=f"{key}_prepare"):
+            return
+        st.session_state[state_key] = signature
+    st.download_button(label, _cached_csv(signature, table, rows, prepare), file_name, "text/csv", key=f"{key}_download")
@@ -0,0 +1,254 @@
+"""
+rumor_timeline.py
+
+Event-stream engine for rumor threads: every tweet about the same player → destination
+club is one thread, followed in time order.
+- Rolling windows per thread: mentions and mean certainty in the last WINDOW_DAYS and in
+  the window before it, plus time since the last mention
+- Momentum: "Heating Up" / "Holding" / "Cooling Off" (as in Rumor_Feed_Data.csv)
+- Zombie: a thread that resurfaces after ZOMBIE_GAP_DAYS of silence without getting any
+  more certain than it already was
+
+Each event only touches its own thread, and every event enters and leaves each window
+once, so updates are O(1) amortized; nothing is recomputed over the history.
+
+Usage:
+    python scripts/rumor_timeline.py fabrizio_may_to_june_structured.csv -o rumor_threads.csv
+    python scripts/rumor_timeline.py structured.csv --tweets "data/Fabrizio winter 2025.csv"
+"""
+
+import argparse
+from collections import deque
+
+import pandas as pd
+
+from entity_resolution import default_clubs, normalize_name
+from tweet_ingest import iter_tweets
+
+WINDOW_DAYS = 7.0
+ZOMBIE_GAP_DAYS = 30.0
+# Mention-rate ratio and certainty change (current vs previous window) that count as movement
+HEAT_RATIO = 1.5
+TREND_THRESHOLD = 0.1
+# A single fresh mention isn't a trend yet
+MIN_HEAT_MENTIONS = 2
+
+# (player, destination club, time, certainty) in dashboard and structurer outputs
+COLUMN_SETS = [
+    ("player", "destination_club", "Posted_Time", "certainty_score"),
+    ("Player", "To_Club", "Posted_Time", "Certainty_Score"),
+]
+
+
+DAY_NS = 86400 * 10**9
+
+
+def to_days(time) -> float:
+    """Days since the epoch (UTC; naive times are taken as UTC). Threads keep time as floats."""
+    time = pd.Timestamp(time)
+    time = time.tz_localize("UTC") if time.tzinfo is None else time.tz_convert("UTC")
+    return time.value / DAY_NS
+
+
+def from_days(days: float) -> pd.Timestamp:
+    return pd.Timestamp(round(days * 86400), unit="s", tz="UTC")
+
+
+class _Window:
+    """Events in (start, end] of a sliding window, with a running certainty sum."""
+
+    def __init__(self):
+        self.events = deque()
+        self.total = 0.0
+
+    def push(self, time, certainty):
+        self.events.append((time, certainty))
+        self.total += certainty
+
+    def pop_before(self, cutoff):
+        while self.events and self.events[0][0] <= cutoff:
+            event = self.events.popleft()
+            self.total -= event[1]
+            yield event
+
+    def mean(self):
+        return self.total / len(self.events) if self.events else None
+
+
+class RumorThread:
+    """Rolling state of one player → destination thread."""
+
+    def __init__(self, player, destination):
+        self.player = player
+        self.destination = destination
+        self.current = _Window()
+        self.previous = _Window()
+        self.first_seen = None
+        self.last_seen = None
+        self.mentions = 0
+        self.max_certainty = 0.0
+        self.zombie = False
+
+    def advance(self, now):
+        # Events age out of the current window into the previous one, then out of that
+        for event in self.current.pop_before(now - WINDOW_DAYS):
+            self.previous.push(*event)
+        for _ in self.previous.pop_before(now - 2 * WINDOW_DAYS):
+            pass
+
+    def add(self, time: float, certainty):
+        # None, NaN or pd.NA: no certainty given
+        certainty = 0.0 if pd.isna(certainty) else float(certainty)
+        self.mentions += 1
+        if self.last_seen is not None and time < self.last_seen:
+            # Late event: counted, but the windows only move forward
+            self.max_certainty = max(self.max_certainty, certainty)
+            return
+        if self.last_seen is not None and time - self.last_seen >= ZOMBIE_GAP_DAYS:
+            self.zombie = certainty <= self.max_certainty
+        elif certainty > self.max_certainty:
+            self.zombie = False
+        self.advance(time)
+        self.current.push(time, certainty)
+        if self.first_seen is None:
+            self.first_seen = time
+        self.last_seen = time
+        self.max_certainty = max(self.max_certainty, certainty)
+
+    def momentum(self, now: float = None) -> str:
+        now = self.last_seen if now is None else now
+        self.advance(now)
+        if now - self.last_seen >= WINDOW_DAYS:
+            return "Cooling Off"
+        rate, previous_rate = len(self.current.events), len(self.previous.events)
+        trend = self.certainty_trend()
+        if rate >= MIN_HEAT_MENTIONS and (rate > previous_rate * HEAT_RATIO or trend > TREND_THRESHOLD):
+            return "Heating Up"
+        if rate * HEAT_RATIO < previous_rate or trend < -TREND_THRESHOLD:
+            return "Cooling Off"
+        return "Holding"
+
+    def certainty_trend(self) -> float:
+        current, previous = self.current.mean(), self.previous.mean()
+        return current - previous if current is not None and previous is not None else 0.0
+
+    def snapshot(self, now: float = None) -> dict:
+        now = self.last_seen if now is None else now
+        momentum = self.momentum(now)
+        return {
+            "player": self.player,
+            "destination_club": self.destination,
+            "first_seen": from_days(self.first_seen),
+            "last_seen": from_days(self.last_seen),
+            "mentions": self.mentions,
+            "mentions_in_window": len(self.current.events),
+            "mention_rate_per_day": len(self.current.events) / WINDOW_DAYS,
+            "certainty_mean": self.current.mean(),
+            "certainty_trend": self.certainty_trend(),
+            "days_since_last_mention": now - self.last_seen,
+            "max_certainty": self.max_certainty,
+            "momentum": momentum,
+            "zombie_rumor": self.zombie,
+        }
+
+
+class RumorTimeline:
+    """All rumor threads, updated one tweet at a time."""
+
+    def __init__(self):
+        self.threads = {}
+        self.clubs = default_clubs()
+        # Raw (player, club) spelling -> thread; normalizing is the slow part of an update
+        self._by_spelling = {}
+
+    def thread(self, player, destination) -> RumorThread:
+        spelling = (player, destination)
+        thread = self._by_spelling.get(spelling)
+        if thread is None:
+            key = normalize_name(player), self.clubs.resolve(destination)
+            if key not in self.threads:
+                self.threads[key] = RumorThread(player, self.clubs.name(key[1]))
+            thread = self._by_spelling[spelling] = self.threads[key]
+        return thread
+
+    def add(self, player, destination, time, certainty) -> RumorThread:
+        """Record one mention at `time` (a timestamp, or days from `to_days`); None without a player."""
+        if not isinstance(player, str) or not normalize_name(player):
+            return None
+        if isinstance(destination, float):
+            destination = None  # NaN
+        thread = self.thread(player, destination)
+        thread.add(time if isinstance(time, float) else to_days(time), certainty)
+        return thread
+
+    def snapshot(self, now=None) -> pd.DataFrame:
+        """State of every thread as of `now` (default: each thread's last mention)."""
+        if now is not None and not isinstance(now, float):
+            now = to_days(now)
+        return pd.DataFrame([thread.snapshot(now) for thread in self.threads.values()])
+
+
+def annotate(df: pd.DataFrame, timeline: RumorTimeline = None):
+    """Replay `df` through a timeline in time order and add per-tweet momentum/zombie columns."""
+    columns = next((cols for cols in COLUMN_SETS if all(c in df.columns for c in cols)), None)
+    if columns is None:
+        raise ValueError(f"No player / destination club / Posted_Time / certainty columns in {list(df.columns)}")
+    player_col, club_col, time_col, certainty_col = columns
+    timeline = timeline or RumorTimeline()
+    times = pd.to_datetime(df[time_col], errors="coerce", utc=True)
+    days = pd.Series(times.array.asi8 / DAY_NS, index=df.index)[times.notna()]
+    order = days.sort_values(kind="stable").index
+    positions = df.index.get_indexer(order)
+
+    n = len(df)
+    mentions, trend, momentum, zombie = [None] * n, [None] * n, [None] * n, [None] * n
+    players = df[player_col].astype(object).to_numpy()[positions].tolist()
+    clubs = df[club_col].astype(object).to_numpy()[positions].tolist()
+    certainties = pd.to_numeric(df[certainty_col], errors="coerce").to_numpy()[positions].tolist()
+    for pos, player, club, time, certainty in zip(positions.tolist(), players, clubs, days[order].tolist(), certainties):
+        thread = timeline.add(player, club, time, certainty)
+        if thread is not None:
+            # State right after this tweet
+            momentum[pos] = thread.momentum()
+            mentions[pos] = len(thread.current.events)
+            trend[pos] = thread.certainty_trend()
+            zombie[pos] = thread.zombie
+
+    out = df.copy()
+    out["mentions_in_window"], out["certainty_trend"] = mentions, trend
+    out["momentum"], out["zombie_rumor"] = momentum, zombie
+    return out, timeline
+
+
+def attach_posted_times(df: pd.DataFrame, tweet_paths) -> pd.DataFrame:
+    """Look up Posted_Time by Tweet_ID in raw exports (older outputs didn't keep it)."""
+    posted = {row["Tweet_ID"]: row["Posted_Time"] for row in iter_tweets(tweet_paths)}
+    df = df.copy()
+    df["Posted_Time"] = df["Tweet_ID"].map(posted)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Momentum and zombie flags per rumor thread")
+    parser.add_argument("input", help="structured rumor CSV with Posted_Time (or use --tweets)")
+    parser.add_argument("-o", "--output", default="rumor_threads.csv")
+    parser.add_argument("--tweets", nargs="+", help="raw exports to take Posted_Time from, by Tweet_ID")
+    parser.add_argument("--now", help="evaluate momentum as of this time (default: latest tweet)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    if args.tweets:
+        df = attach_posted_times(df, args.tweets)
+    hint = "" if args.tweets else " (use --tweets to look Posted_Time up in the raw exports)"
+    try:
+        _, timeline = annotate(df)
+    except ValueError as e:
+        parser.error(f"{e}{hint}")
+    if not timeline.threads:
+        parser.error(f"No row of {args.input} has both a player and a usable Posted_Time{hint}")
+    now = args.now or max(t.last_seen for t in timeline.threads.values())
+    threads = timeline.snapshot(now).sort_values("last_seen", ascending=False)
+    threads.to_csv(args.output, index=False)
+    print(f"✅ {len(threads)} rumor threads → {args.output}")
+    print(threads["momentum"].value_counts().to_string())
+    print(f"🧟 Zombie rumors: {int(threads['zombie_rumor'].sum())}")
@@ -0,0 +1,532 @@
+"""
+rumor_views.py
+
+Materialized rollups of a rumor table, kept up to date incrementally for the dashboards.
+- `top_recent_high_value_rumors`: latest rumor per player → destination club, with the
+  player's market value and the number of mentions, most valuable first
+- `club_rumor_activity`: per club, rumors in and out, players involved, mean certainty of
+  incoming rumors and the most valuable target
+- `status_rumor_summary`: per status bin, rumors, players and mean certainty
+
+Every row of the source (the Parquet store of a dashboard CSV, plus any live_tail.py delta
+parts) gets a content fingerprint, and each view records which keys every fingerprint feeds
+(its dependencies). When rows are added, edited or removed, only the keys they touch, old and
+new, are re-aggregated and patched into the stored view; nothing is recomputed over the
+whole archive. live_tail.py applies each part it publishes as it goes.
+
+`--csv` rewrites data/top_recent_high_value_rumors.csv from the same rows: every tweet with
+certainty 1.0 (not one per key), most valuable player first, newest first on ties, top 20.
+
+Writers (this CLI, live_tail.py, a dashboard bringing stale views up to date) hold an
+exclusive lock on the views directory (`views_lock`, a flock on its .lock file) while they
+read the stored state and write; readers take it shared, so nobody sees half a save.
+
+Layout for data/transfer_rumors_with_tags_and_bins.csv:
+    data/views/transfer_rumors_with_tags_and_bins/state.json         source mtime, delta part, version
+    data/views/transfer_rumors_with_tags_and_bins/<view>.parquet       the view, one row per key
+    data/views/transfer_rumors_with_tags_and_bins/<view>.deps.parquet  fingerprint -> key
+    data/views/transfer_rumors_with_tags_and_bins/.lock                 views_lock
+
+Usage:
+    python scripts/rumor_views.py data/transfer_rumors_with_tags_and_bins.csv --csv data/top_recent_high_value_rumors.csv
+    python scripts/rumor_views.py data/fabrizio_may_to_june_structured_v1_5.csv --deltas data/live_rumors
+"""
+
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, writers must not overlap
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from entity_resolution import canonical_club_names
+from rumor_store import delta_seqs, ensure_store, read_deltas, read_rumors
+from status_bins import bin_statuses
+
+VIEW_ROOT = "data/views"
+# Bump when a view's definition or columns change; stored views are then rebuilt
+VIEWS_VERSION = 2
+STATE_FILE = "state.json"
+LOCK_FILE = ".lock"
+
+NUMERIC_COLUMNS = ["certainty_score", "market_value_eur"]
+# "Man United" and "Manchester United" should be one club in the filters: matching and
+# grouping use a canonical copy of each club column; the raw spelling is what is shown
+CLUB_COLUMNS = ["origin_club", "destination_club"]
+CANONICAL_CLUB_COLUMNS = {col: col + "_canonical" for col in CLUB_COLUMNS}
+# Source columns the views read (those that exist); the newest of the two times orders rumors
+SOURCE_COLUMNS = [
+    "player", "origin_club", "destination_club", "status", "certainty_score", "is_transfer_rumor",
+    "market_value_eur", "certainty_bin", "speculation_flag", "tweet_text", "Posted_Time", "last_tweet_date"
+]
+TIME_COLUMNS = ["Posted_Time", "last_tweet_date"]
+# Every batch of rows is brought to these columns and types (anything else is object),
+# so archive and live rows hash alike and concatenate cleanly
+ROW_COLUMNS = (
+    [c for c in SOURCE_COLUMNS if c not in TIME_COLUMNS] + list(CANONICAL_CLUB_COLUMNS.values()) + ["status_bin", "_time"]
+)
+ROW_DTYPES = {"certainty_score": "float64", "market_value_eur": "float64", "_time": "datetime64[ns, UTC]"}
+TOP_RECENT_COLUMNS = [
+    "player", "destination_club", "market_value_eur", "certainty_score", "certainty_bin",
+    "speculation_flag", "status", "last_tweet_date", "tweet_text"
+]
+# data/top_recent_high_value_rumors.csv: confirmed tweets only, one row each
+TOP_RECENT_LIMIT = 20
+TOP_RECENT_MIN_CERTAINTY = 1.0
+
+
+def prepare_rumors(df: pd.DataFrame) -> pd.DataFrame:
+    """Numeric scores, `<club>_canonical` columns and `status_bin`, as the dashboards see them."""
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col, canonical in CANONICAL_CLUB_COLUMNS.items():
+        if col in df.columns:
+            df[canonical] = canonical_club_names(df[col])
+    df["status_bin"] = bin_statuses(df["status"])
+    return df
+
+
+def _column(rows: pd.DataFrame, col: str) -> pd.Series:
+    return rows[col] if col in rows.columns else pd.Series(None, index=rows.index, dtype=object)
+
+
+def _is_rumor(rows: pd.DataFrame) -> np.ndarray:
+    return _column(rows, "is_transfer_rumor").astype(str).eq("True").to_numpy()
+
+
+def _rumor_times(rows: pd.DataFrame) -> pd.Series:
+    # Live rows carry Posted_Time, archive rows only last_tweet_date; missing sorts first
+    times = pd.Series(pd.NaT, index=rows.index, dtype="datetime64[ns, UTC]")
+    for col in TIME_COLUMNS[::-1]:
+        if col in rows.columns:
+            parsed = pd.to_datetime(rows[col], errors="coerce", utc=True)
+            times = parsed.where(parsed.notna(), times)
+    return times
+
+
+def _fingerprint(rows: pd.DataFrame, earlier: np.ndarray = None) -> pd.DataFrame:
+    """Adds `_content` (hash of what the views read) and `_fp`, unique per row: identical rows
+    are told apart by occurrence, counting those in `earlier` (content hashes of rows before)."""
+    # status_bin is derived, but hashed too so a change of binning rules reaches the views
+    content = pd.util.hash_pandas_object(rows[ROW_COLUMNS].astype(object), index=False).to_numpy()
+    occurrence = pd.Series(content).groupby(content).cumcount().to_numpy(dtype=np.uint64)
+    if earlier is not None and len(earlier):
+        before = pd.Series(earlier[np.isin(earlier, content)]).value_counts()
+        occurrence += pd.Series(content).map(before).fillna(0).to_numpy(dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        rows["_fp"] = pd.util.hash_array(content + occurrence * np.uint64(0x9E3779B97F4A7C15))
+    rows["_content"] = content
+    return rows
+
+
+# Each view: `pairs(rows)` -> frame of key columns (+ anything `aggregate` needs) and `row`,
+# one line per (row, key) it feeds; `aggregate(rows, pairs)` -> one output row per key
+# present in `pairs` (only the dirty keys' pairs are passed in)
+
+def _top_recent_pairs(rows: pd.DataFrame) -> pd.DataFrame:
+    destination = rows["destination_club_canonical"]
+    keep = _is_rumor(rows) & rows["player"].notna().to_numpy() & destination.notna().to_numpy()
+    positions = np.flatnonzero(keep)
+    return pd.DataFrame({
+        "player": rows["player"].astype(object).to_numpy()[positions],
+        "destination_club_canonical": destination.astype(object).to_numpy()[positions],
+        "row": positions,
+    })
+
+
+def _top_recent(rows: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+    frame = rows.take(pairs["row"]).assign(_key=pairs["key_id"].to_numpy(), _row=pairs["row"].to_numpy())
+    frame["last_tweet_date"] = frame["_time"]
+    # Latest mention per key: by time, then by arrival
+    frame = frame.sort_values(["_key", "_time", "_row"], na_position="first", kind="stable")
+    latest = frame.drop_duplicates("_key", keep="last").set_index("_key")
+    grouped = frame.groupby("_key")
+    out = pd.DataFrame({col: _column(latest, col) for col in TOP_RECENT_COLUMNS}, index=latest.index)
+    # Clubs as the latest tweet spelled them; the key is the canonical destination
+    out["player"], out["destination_club"] = latest["player"].astype(object), latest["destination_club"].astype(object)
+    out["destination_club_canonical"] = latest["destination_club_canonical"].astype(object)
+    out["origin_club"] = latest["origin_club"].astype(object)
+    # The player's value can be missing on the latest tweet but known from an earlier one
+    out["market_value_eur"] = grouped["market_value_eur"].max() if "market_value_eur" in frame else np.nan
+    out["status_bin"] = latest["status_bin"].astype(object)
+    out["mentions"] = grouped.size()
+    return out
+
+
+def _club_pairs(rows: pd.DataFrame) -> pd.DataFrame:
+    rumors = np.flatnonzero(_is_rumor(rows))
+    parts = []
+    for col, direction in (("destination_club_canonical", "in"), ("origin_club_canonical", "out")):
+        clubs = rows[col].astype(object).to_numpy()[rumors]
+        known = pd.notna(clubs)
+        parts.append(pd.DataFrame({"club": clubs[known], "direction": direction, "row": rumors[known]}))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _club_activity(rows: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+    frame = rows.take(pairs["row"]).assign(
+        _key=pairs["key_id"].to_numpy(), _in=pairs["direction"].eq("in").to_numpy(), club=pairs["club"].to_numpy()
+    )
+    incoming = frame[frame["_in"]]
+    grouped = frame.groupby("_key")
+    counts = frame.groupby(["_key", "_in"]).size().unstack(fill_value=0).reindex(columns=[True, False], fill_value=0)
+    out = pd.DataFrame({
+        "club": grouped["club"].first(),
+        "rumors_in": counts[True],
+        "rumors_out": counts[False],
+        "players": grouped["player"].nunique(),
+        "avg_certainty_in": incoming.groupby("_key")["certainty_score"].mean(),
+        "last_tweet_date": grouped["_time"].max(),
+    })
+    out["top_target"], out["top_target_value_eur"] = None, np.nan
+    if "market_value_eur" in incoming and len(incoming):
+        valued = incoming[incoming["market_value_eur"].notna()].sort_values(["_key", "market_value_eur"], kind="stable")
+        top = valued.drop_duplicates("_key", keep="last").set_index("_key")
+        out.loc[top.index, "top_target"] = top["player"].astype(object)
+        out.loc[top.index, "top_target_value_eur"] = top["market_value_eur"]
+    return out
+
+
+def _status_pairs(rows: pd.DataFrame) -> pd.DataFrame:
+    rumors = np.flatnonzero(_is_rumor(rows))
+    return pd.DataFrame({"status_bin": rows["status_bin"].astype(object).to_numpy()[rumors], "row": rumors})
+
+
+def _status_summary(rows: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+    frame = rows.take(pairs["row"]).assign(_key=pairs["key_id"].to_numpy())
+    grouped = frame.groupby("_key")
+    return pd.DataFrame({
+        "status_bin": grouped["status_bin"].first().astype(object),
+        "rumors": grouped.size(),
+        "players": grouped["player"].nunique(),
+        "avg_certainty": grouped["certainty_score"].mean(),
+        "last_tweet_date": grouped["_time"].max(),
+    })
+
+
+class View:
+    """A rollup keyed on `key_columns` with `columns`, stored sorted by `sort_by` (descending, NaN last)."""
+
+    def __init__(self, name: str, key_columns: list, pairs, aggregate, sort_by: list, columns: list):
+        self.name = name
+        self.key_columns = key_columns
+        self.pairs = pairs
+        self.aggregate = aggregate
+        self.sort_by = sort_by
+        self.columns = columns
+
+
+VIEWS = [
+    View("top_recent_high_value_rumors", ["player", "destination_club_canonical"], _top_recent_pairs, _top_recent,
+         ["market_value_eur", "last_tweet_date", "certainty_score"],
+         TOP_RECENT_COLUMNS + ["destination_club_canonical", "origin_club", "status_bin", "mentions"]),
+    View("club_rumor_activity", ["club"], _club_pairs, _club_activity, ["rumors_in", "rumors_out"],
+         ["club", "rumors_in", "rumors_out", "players", "avg_certainty_in", "last_tweet_date", "top_target",
+          "top_target_value_eur"]),
+    View("status_rumor_summary", ["status_bin"], _status_pairs, _status_summary, ["rumors"],
+         ["status_bin", "rumors", "players", "avg_certainty", "last_tweet_date"]),
+]
+
+
+def view_dir(csv_path: str, root: str = VIEW_ROOT) -> str:
+    return os.path.join(root, os.path.splitext(os.path.basename(csv_path))[0])
+
+
+# Views directories this thread holds the lock on, so nested acquisitions don't deadlock
+_held = threading.local()
+
+
+@contextmanager
+def views_lock(directory: str, shared: bool = False, blocking: bool = True):
+    """Lock a views directory across processes and threads (re-entrant within a thread).
+
+    Yields True once held; with `blocking` off, yields False straight away if it is taken.
+    """
+    held = _held.__dict__.setdefault("directories", set())
+    if directory in held or fcntl is None:
+        yield True
+        return
+    os.makedirs(directory, exist_ok=True)
+    flags = (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB)
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            yield False
+            return
+        held.add(directory)
+        try:
+            yield True
+        finally:
+            held.discard(directory)
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def views_current(csv_path: str, delta_dir: str = None, root: str = VIEW_ROOT) -> bool:
+    """True if the stored views cover the current store and every delta part (reads no data)."""
+    state_path = os.path.join(view_dir(csv_path, root), STATE_FILE)
+    if not os.path.exists(state_path):
+        return False
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+    seqs = delta_seqs(delta_dir) if delta_dir else []
+    return (
+        state.get("version") == VIEWS_VERSION
+        and state.get("source_mtime") == os.path.getmtime(ensure_store(csv_path))
+        and state.get("delta_dir") == delta_dir
+        and state.get("delta_seq", 0) == (seqs[-1] if seqs else 0)
+    )
+
+
+def read_views(directory: str) -> dict:
+    """{view name: frame} as last materialized in `directory` (views not built yet are missing)."""
+    views = {}
+    # Shared lock: all views from the same save
+    with views_lock(directory, shared=True):
+        for view in VIEWS:
+            path = os.path.join(directory, view.name + ".parquet")
+            if os.path.exists(path):
+                views[view.name] = pd.read_parquet(path).drop(columns="_key")
+    return views
+
+
+class ViewMaterializer:
+    """The views of one source (a dashboard CSV plus, optionally, a live delta directory)."""
+
+    def __init__(self, csv_path: str, delta_dir: str = None, root: str = VIEW_ROOT, views: list = VIEWS):
+        self.csv_path = csv_path
+        self.delta_dir = delta_dir
+        self.directory = view_dir(csv_path, root)
+        self.views = views
+        self.rows = None
+        self.source_mtime = None
+        self.delta_seq = 0
+        # Per view: key tuple -> id, (fingerprint, key id, row, extras) pairs, the view itself
+        self.key_ids = {view.name: {} for view in views}
+        self.next_key = {view.name: 0 for view in views}
+        self.pairs = {}
+        self.frames = {}
+
+    # Loading
+
+    def _read_source(self) -> pd.DataFrame:
+        store = ensure_store(self.csv_path)
+        self.source_mtime = os.path.getmtime(store)
+        parts = [self._prepare(read_rumors(store, SOURCE_COLUMNS))]
+        self.delta_seq = 0
+        if self.delta_dir:
+            for seq, rows in read_deltas(self.delta_dir):
+                parts.append(self._prepare(rows))
+                self.delta_seq = seq
+        return pd.concat(parts, ignore_index=True)
+
+    def _prepare(self, rows: pd.DataFrame) -> pd.DataFrame:
+        rows = rows[[c for c in SOURCE_COLUMNS if c in rows.columns]].copy()
+        rows["_time"] = _rumor_times(rows)
+        rows = prepare_rumors(rows).reindex(columns=ROW_COLUMNS)
+        return rows.astype({c: ROW_DTYPES.get(c, object) for c in ROW_COLUMNS})
+
+    def _stored(self) -> tuple:
+        """(state, {view: deps frame}, {view: stored frame}), or empty ones if missing or outdated."""
+        state_path = os.path.join(self.directory, STATE_FILE)
+        if not os.path.exists(state_path):
+            return None, {}, {}
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != VIEWS_VERSION:
+            return None, {}, {}
+        deps, frames = {}, {}
+        for view in self.views:
+            view_path = os.path.join(self.directory, view.name + ".parquet")
+            deps_path = os.path.join(self.directory, view.name + ".deps.parquet")
+            if os.path.exists(view_path) and os.path.exists(deps_path):
+                deps[view.name] = pd.read_parquet(deps_path)
+                frames[view.name] = pd.read_parquet(view_path)
+        return state, deps, frames
+
+    # Maintenance
+
+    def _key_id(self, view: View, key: tuple) -> int:
+        ids = self.key_ids[view.name]
+        key_id = ids.get(key)
+        if key_id is None:
+            key_id = ids[key] = self.next_key[view.name]
+            self.next_key[view.name] += 1
+        return key_id
+
+    def _pairs(self, view: View, rows: pd.DataFrame, offset: int = 0) -> pd.DataFrame:
+        """The view's (row, key) pairs for `rows`, which start at position `offset`."""
+        pairs = view.pairs(rows)
+        pairs["fingerprint"] = rows["_fp"].to_numpy()[pairs["row"].to_numpy()]
+        pairs["row"] += offset
+        keys = zip(*(pairs[col].tolist() for col in view.key_columns))
+        pairs["key_id"] = np.array([self._key_id(view, key) for key in keys], dtype=np.int64)
+        return pairs
+
+    def _recompute(self, view: View, dirty: set) -> int:
+        """Re-aggregate the keys in `dirty` (ids) and patch them into the view; returns their count."""
+        if not dirty:
+            return 0
+        dirty_ids = np.fromiter(dirty, dtype=np.int64)
+        pairs = self.pairs[view.name]
+        affected = pairs[np.isin(pairs["key_id"].to_numpy(), dirty_ids)]
+        fresh = view.aggregate(self.rows, affected.reset_index(drop=True)) if len(affected) else None
+        frame = self.frames.get(view.name)
+        if frame is not None:
+            # Keys left without rows drop out of the view
+            frame = frame[~frame["_key"].isin(dirty_ids)]
+        if fresh is not None and len(fresh):
+            # Plain values: categories differ between batches and don't survive concat anyway
+            fresh = fresh.astype({c: object for c in fresh.columns if isinstance(fresh[c].dtype, pd.CategoricalDtype)})
+            fresh = fresh[view.columns].rename_axis("_key").reset_index()
+            frame = fresh if frame is None or not len(frame) else pd.concat([frame, fresh], ignore_index=True)
+        self.frames[view.name] = self._sorted(view, frame)
+        return len(dirty)
+
+    def _sorted(self, view: View, frame: pd.DataFrame) -> pd.DataFrame:
+        if frame is None:
+            return None
+        # Ties by key, so the order doesn't depend on when each key was first seen
+        return frame.sort_values(view.sort_by + view.key_columns,
+                                 ascending=[False] * len(view.sort_by) + [True] * len(view.key_columns),
+                                 na_position="last", kind="stable").reset_index(drop=True)
+
+    def sync(self) -> dict:
+        """Bring the stored views in line with the source; returns {view: keys recomputed}.
+
+        Keys fed by rows that appeared or disappeared since the last run are recomputed;
+        everything else is kept as stored.
+        """
+        with views_lock(self.directory):
+            return self._sync()
+
+    def _sync(self) -> dict:
+        self.rows = _fingerprint(self._read_source())
+        state, deps, frames = self._stored()
+        recomputed = {}
+        for view in self.views:
+            old_deps, old_frame = deps.get(view.name), frames.get(view.name)
+            self.key_ids[view.name], self.next_key[view.name] = {}, 0
+            if old_deps is not None:
+                # Stored key ids are kept, so the stored view's rows still match their keys
+                for stored in (old_deps.rename(columns={"key_id": "_key"}), old_frame):
+                    keys = zip(*(stored[col].tolist() for col in view.key_columns))
+                    self.key_ids[view.name].update(zip(keys, stored["_key"].tolist()))
+                self.next_key[view.name] = max(self.key_ids[view.name].values(), default=-1) + 1
+            pairs = self.pairs[view.name] = self._pairs(view, self.rows)
+            if old_deps is None:
+                self.frames[view.name] = None
+                dirty = set(pairs["key_id"].tolist())
+            else:
+                self.frames[view.name] = old_frame
+                old_fp, new_fp = old_deps["fingerprint"].to_numpy(), pairs["fingerprint"].to_numpy()
+                removed = old_deps["key_id"].to_numpy()[~np.isin(old_fp, new_fp)]
+                added = pairs["key_id"].to_numpy()[~np.isin(new_fp, old_fp)]
+                dirty = set(removed.tolist()) | set(added.tolist())
+            recomputed[view.name] = self._recompute(view, dirty)
+        self.save(recomputed)
+        return recomputed
+
+    def _append(self, rows: pd.DataFrame) -> dict:
+        rows = _fingerprint(self._prepare(rows), self.rows["_content"].to_numpy())
+        offset = len(self.rows)
+        self.rows = pd.concat([self.rows, rows], ignore_index=True)
+        recomputed = {}
+        for view in self.views:
+            pairs = self._pairs(view, rows, offset)
+            self.pairs[view.name] = pd.concat([self.pairs[view.name], pairs], ignore_index=True)
+            recomputed[view.name] = self._recompute(view, set(pairs["key_id"].tolist()))
+        return recomputed
+
+    def append(self, rows: pd.DataFrame) -> dict:
+        """Add new source rows; returns {view: keys recomputed}."""
+        with views_lock(self.directory):
+            if self.rows is None:
+                self._sync()
+            recomputed = self._append(rows)
+            self.save(recomputed)
+        return recomputed
+
+    def refresh(self) -> dict:
+        """Pick up new delta parts, or everything if the source itself was rebuilt."""
+        with views_lock(self.directory):
+            if self.rows is None or os.path.getmtime(ensure_store(self.csv_path)) != self.source_mtime:
+                return self._sync()
+            recomputed = {view.name: 0 for view in self.views}
+            for seq, rows in read_deltas(self.delta_dir, self.delta_seq) if self.delta_dir else []:
+                for name, count in self._append(rows).items():
+                    recomputed[name] += count
+                self.delta_seq = seq
+            if any(recomputed.values()):
+                self.save(recomputed)
+        return recomputed
+
+    # Storage
+
+    def save(self, recomputed: dict):
+        """Write the views that changed, their dependencies, then the state file (lock held)."""
+        os.makedirs(self.directory, exist_ok=True)
+        for view in self.views:
+            view_path = os.path.join(self.directory, view.name + ".parquet")
+            if not recomputed.get(view.name) and os.path.exists(view_path):
+                continue
+            frame = self.frames.get(view.name)
+            if frame is None:
+                frame = pd.DataFrame(columns=["_key"] + view.columns)
+            deps = self.pairs[view.name][["fingerprint", "key_id"] + view.key_columns]
+            _write_parquet(frame, view_path)
+            _write_parquet(deps, os.path.join(self.directory, view.name + ".deps.parquet"))
+        state = {
+            "version": VIEWS_VERSION, "source": self.csv_path, "source_mtime": self.source_mtime,
+            "delta_dir": self.delta_dir, "delta_seq": self.delta_seq, "rows": len(self.rows),
+        }
+        state_path = os.path.join(self.directory, STATE_FILE)
+        with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(state_path + ".tmp", state_path)
+
+
+def _write_parquet(frame: pd.DataFrame, path: str):
+    # Temp file first so a dashboard never reads a half-written view
+    frame.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def export_top_recent(rows: pd.DataFrame, path: str, limit: int = TOP_RECENT_LIMIT) -> int:
+    """Write the `limit` most valuable confirmed tweets of `rows` (a materializer's source rows)."""
+    confirmed = rows[rows["certainty_score"] >= TOP_RECENT_MIN_CERTAINTY]
+    # Most valuable first, then newest; ties keep source order
+    confirmed = confirmed.sort_values("_time", ascending=False, na_position="last", kind="stable")
+    confirmed = confirmed.sort_values("market_value_eur", ascending=False, na_position="last", kind="stable")
+    top = confirmed.head(limit).assign(last_tweet_date=lambda t: t["_time"].dt.strftime("%Y-%m-%d"))
+    top[TOP_RECENT_COLUMNS].to_csv(path, index=False)
+    return len(top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the materialized rumor views of a dashboard table")
+    parser.add_argument("input", help="dashboard CSV (its Parquet store is read)")
+    parser.add_argument("--deltas", help="live_tail.py delta directory whose parts belong to this table")
+    parser.add_argument("--root", default=VIEW_ROOT)
+    parser.add_argument("--csv", help="also export the most valuable confirmed tweets here "
+                                      "(the definition of data/top_recent_high_value_rumors.csv)")
+    parser.add_argument("--limit", type=int, default=TOP_RECENT_LIMIT)
+    args = parser.parse_args()
+
+    materializer = ViewMaterializer(args.input, args.deltas, args.root)
+    recomputed = materializer.sync()
+    for view in materializer.views:
+        keys = len(materializer.key_ids[view.name])
+        print(f"🧮 {view.name}: {recomputed[view.name]} of {keys} keys recomputed")
+    print(f"✅ {len(materializer.rows)} rows → {materializer.directory}/")
+    if args.csv:
+        print(f"✅ Top {export_top_recent(materializer.rows, args.csv, args.limit)} → {args.csv}")
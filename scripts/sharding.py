@@ -0,0 +1,115 @@
+"""
+sharding.py
+
+Split a structurer run into N independent shards and merge them back deterministically.
+- `shard_of`: stable shard number of a Tweet_ID (same on every machine and Python version)
+- `shard_path`: per-shard file name, e.g. checkpoint.jsonl → checkpoint.shard-03-of-08.jsonl
+- `merge_logs`: last record per Tweet_ID across checkpoint logs, written sorted by Tweet_ID
+
+Every shard keeps its own checkpoint log, so a killed shard resumes on its own. Merging
+compacts one log at a time into a sorted run and k-way merges the runs, so memory stays at
+one shard's worth and the output depends only on the logs' contents, not on completion order.
+"""
+
+import heapq
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from checkpoint_log import replay
+
+SHARD_RE = re.compile(r"^(\d+)/(\d+)$")
+
+
+def shard_of(tweet_ids, num_shards: int):
+    """Shard of each Tweet_ID (scalar or array): a splitmix64 mix of the ID, mod `num_shards`.
+
+    Snowflake IDs end in near-constant sequence bits, so the raw ID modulo N would be lopsided.
+    """
+    with np.errstate(over="ignore"):
+        x = np.asarray(tweet_ids, dtype=np.int64).astype(np.uint64)
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    shards = x % np.uint64(num_shards)
+    return int(shards) if shards.ndim == 0 else shards.astype(np.int64)
+
+
+def parse_shard(value: str) -> tuple:
+    """'3/8' -> (3, 8); shards are numbered from 0."""
+    match = SHARD_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"Expected a shard as INDEX/COUNT (e.g. 3/8), got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index {index} out of range for {count} shards")
+    return index, count
+
+
+def shard_path(path: str, index: int, count: int) -> str:
+    root, ext = os.path.splitext(path)
+    width = len(str(count - 1))
+    return f"{root}.shard-{index:0{width}d}-of-{count}{ext}"
+
+
+def _sorted_run(log_path: str, run_path: str, columns: dict) -> int:
+    # Last record per Tweet_ID in this log, sorted by ID, one JSON line each
+    latest = {}
+    for record in replay(log_path):
+        latest[record["Tweet_ID"]] = record
+        columns.update(dict.fromkeys(record))
+    with open(run_path, "w", encoding="utf-8") as f:
+        for tweet_id in sorted(latest):
+            f.write(json.dumps(latest[tweet_id], ensure_ascii=False) + "\n")
+    return len(latest)
+
+
+def _read_run(run_path: str, source: int):
+    with open(run_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            yield record["Tweet_ID"], source, record
+
+
+def merge_logs(log_paths: list, output_csv: str, chunk_size: int = 10000) -> int:
+    """Write the last record per Tweet_ID across `log_paths` to `output_csv`, sorted by Tweet_ID.
+
+    A Tweet_ID found in several logs (e.g. after changing the shard count) takes the record
+    from the log listed last.
+    """
+    log_paths = [path for path in log_paths if os.path.exists(path)]
+    columns = {}
+    written, chunk = 0, []
+
+    def flush():
+        pd.DataFrame(chunk, columns=list(columns)).to_csv(
+            output_csv, mode="a" if written else "w", header=not written, index=False
+        )
+
+    with tempfile.TemporaryDirectory(prefix="merge_", dir=os.path.dirname(os.path.abspath(output_csv))) as tmp:
+        runs = []
+        for source, log_path in enumerate(log_paths):
+            run_path = os.path.join(tmp, f"run-{source:04d}.jsonl")
+            _sorted_run(log_path, run_path, columns)
+            runs.append(_read_run(run_path, source))
+
+        pending = None
+        for tweet_id, _, record in heapq.merge(*runs, key=lambda item: (item[0], item[1])):
+            # Equal IDs arrive in log order, so the last one seen wins
+            if pending is not None and pending["Tweet_ID"] != tweet_id:
+                chunk.append(pending)
+                if len(chunk) >= chunk_size:
+                    flush()
+                    written, chunk = written + len(chunk), []
+            pending = record
+        if pending is not None:
+            chunk.append(pending)
+        if chunk or not written:
+            flush()
+            written += len(chunk)
+    return written
@@ -0,0 +1,64 @@
+"""
+status_bins.py
+
+Table-driven status binning shared by the dashboards and offline scripts.
+
+The rules live in `data/status_bins.json` (ordered; first matching keyword wins), so
+bins can be changed without code edits. `bin_statuses` classifies each *distinct*
+status string once and maps the result back through integer codes, returning a
+categorical column; it matches the old per-row `bin_status` helper exactly.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "status_bins.json")
+
+
+def load_rules(path: str = RULES_FILE):
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    rules = [(rule["bin"], tuple(kw.lower() for kw in rule["keywords"])) for rule in table["rules"]]
+    return rules, table["default"]
+
+
+RULES, DEFAULT_BIN = load_rules()
+# Category order: rule order, then the fallback bin
+BIN_LABELS = list(dict.fromkeys([label for label, _ in RULES] + [DEFAULT_BIN]))
+
+
+@lru_cache(maxsize=None)
+def _classify(s: str) -> str:
+    for label, keywords in RULES:
+        if any(kw in s for kw in keywords):
+            return label
+    return DEFAULT_BIN
+
+
+def bin_status(status) -> str:
+    return _classify(str(status).lower())
+
+
+def bin_statuses(statuses: pd.Series) -> pd.Series:
+    """Vectorised `bin_status` over a Series, returned as a categorical Series."""
+    if isinstance(statuses.dtype, pd.CategoricalDtype):
+        codes, uniques = statuses.cat.codes.to_numpy(), statuses.cat.categories
+    else:
+        codes, uniques = pd.factorize(statuses, use_na_sentinel=True)
+
+    # One classification per distinct status; the extra last slot is for missing values
+    # (str(NaN) == "nan", which the row-wise helper also bins by text)
+    lookup = np.array(
+        [BIN_LABELS.index(bin_status(u)) for u in uniques] + [BIN_LABELS.index(bin_status(np.nan))],
+        dtype=np.int8
+    )
+    bin_codes = lookup[np.where(codes < 0, len(uniques), codes)]
+    return pd.Series(
+        pd.Categorical.from_codes(bin_codes, categories=BIN_LABELS),
+        index=statuses.index,
+        name="status_bin"
+    )
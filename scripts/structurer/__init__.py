@@ -0,0 +1,37 @@
+"""
+structurer
+
+Turns raw tweet exports into structured rumor records with the LLM, as an importable package.
+- `config`: files, model and tuning knobs
+- `pipeline`: prefilter → local model → cache → LLM → checkpoint log, sharding, output CSV
+- `sample`: quick balanced test run
+- `status`: run manifest and progress report
+- `cli`: `run` / `resume` / `status` / `compact` / `sample` (`python scripts/structurer --help`)
+
+Importing the package loads nothing heavy; the names below are imported from their
+module (and pandas, numpy, ... with it) on first use.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "process_all_tweets": "pipeline",
+    "structure_tweets": "pipeline",
+    "structure_rows": "pipeline",
+    "checkpoint_record": "pipeline",
+    "load_checkpoint": "pipeline",
+    "compact_output": "pipeline",
+    "llm_extract_entities": "pipeline",
+    "process_sample": "sample",
+    "format_status": "status",
+    "main": "cli",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,12 @@
+import os
+import sys
+
+if not __package__:
+    # Run as `python scripts/structurer ...`: put scripts/ on the path so the package and the
+    # modules next to it (checkpoint_log, prefilter, ...) import as they do for the other scripts
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from structurer.cli import main
+else:
+    from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+cli.py
+
+Command line for the structurer:
+
+    python scripts/structurer run "data/Fabrizio winter 2025.csv" "data/Fabrizio summer *.csv"
+    python scripts/structurer run --shards 8              # shards in parallel, then merged
+    python scripts/structurer run --shard 3/8             # one shard (e.g. per machine), not merged
+    python scripts/structurer resume                      # the last run again, same inputs/options
+    python scripts/structurer status                      # progress, without touching the pipeline
+    python scripts/structurer compact [--shards 8]        # checkpoint log(s) → output CSV + Parquet
+    python scripts/structurer sample                      # quick balanced 10 + 10 test run
+
+(or `python -m structurer ...` from scripts/). Only this module, config.py and status.py are
+imported up front, so `--help` and `status` start in a few tens of milliseconds; pandas,
+the local model and the extraction engine are loaded by the commands that use them, and
+openai/aiohttp only once a tweet actually needs the API.
+"""
+
+import argparse
+
+from .config import DEFAULT_INPUTS, PREFILTER_MODES
+from .status import finish_run, format_status, read_run, start_run
+
+# Command-line flag -> `structure_tweets` keyword; only flags given are recorded for `resume`
+RUN_OPTIONS = {
+    "max_concurrency": "max_concurrency",
+    "prefilter": "prefilter_mode",
+    "batch": "batch_mode",
+    "local_model": "use_local_model",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="structurer", description="Structure raw tweet exports with the LLM")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="structure tweets (resumes from the checkpoint log) and write the output")
+    run.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS, help="files and/or globs")
+    layout = run.add_mutually_exclusive_group()
+    layout.add_argument("--shards", type=int, default=1, help="split the run into N shards, run here in parallel")
+    layout.add_argument("--shard", metavar="I/N", help="run only shard I of N (e.g. one per machine), without merging")
+    run.add_argument("--prefilter", choices=PREFILTER_MODES,
+                     help="prefilter mode (default off: nothing skipped; recall: skips ~29%% of tweets, and "
+                          "~6%% of labelled rumors with them; see prefilter.py)")
+    run.add_argument("--max-concurrency", type=int, help="requests in flight")
+    run.add_argument("--no-batch", dest="batch", action="store_false", default=None,
+                     help="one tweet per request")
+    run.add_argument("--no-local-model", dest="local_model", action="store_false", default=None,
+                     help="send everything past the prefilter to the cache/LLM")
+
+    commands.add_parser("resume", help="continue the last run with its inputs and options")
+    commands.add_parser("status", help="progress of the last run, checkpoint logs and output")
+
+    compact = commands.add_parser("compact", help="write the output CSV (and Parquet copy) from the checkpoint log(s)")
+    compact.add_argument("--shards", type=int, metavar="N",
+                         help="also merge N shard logs (copied next to the main log); default: the last run's")
+
+    sample = commands.add_parser("sample", help="quick test run on a balanced sample, no checkpointing")
+    sample.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS, help="files and/or globs")
+    sample.add_argument("--rumors", type=int, default=10, help="tweets that look like a move")
+    sample.add_argument("--others", type=int, default=10, help="tweets that don't")
+    return parser
+
+
+def run(command: dict):
+    """Run (or resume) `command`, recording it in the run manifest."""
+    from .pipeline import process_all_tweets, structure_tweets
+
+    manifest = start_run(command)
+    if command["shard"]:
+        structure_tweets(command["inputs"], tuple(command["shard"]), **command["options"])
+    else:
+        process_all_tweets(command["inputs"], command["shards"], **command["options"])
+    finish_run(manifest)
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.shards < 1:
+            parser.error("--shards must be at least 1")
+        shard = None
+        if args.shard:
+            from sharding import parse_shard
+
+            try:
+                shard = list(parse_shard(args.shard))
+            except ValueError as e:
+                parser.error(str(e))
+        options = {keyword: getattr(args, flag) for flag, keyword in RUN_OPTIONS.items()
+                   if getattr(args, flag) is not None}
+        run({"inputs": args.inputs, "shards": args.shards, "shard": shard, "options": options})
+    elif args.command == "resume":
+        last = read_run()
+        if last is None:
+            print("❌ No run to resume; start one with `run`")
+            return 1
+        print(f"🔁 Resuming: {', '.join(last['inputs'])}")
+        run({key: last[key] for key in ("inputs", "shards", "shard", "options")})
+    elif args.command == "status":
+        print(format_status())
+    elif args.command == "compact":
+        from .pipeline import compact_output
+
+        last = read_run()
+        compact_output(args.shards or (last or {}).get("shards", 1))
+    elif args.command == "sample":
+        from .sample import process_sample
+
+        process_sample(args.inputs, rumor_count=args.rumors, non_rumor_count=args.others)
+    return 0
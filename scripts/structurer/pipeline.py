@@ -0,0 +1,374 @@
+"""
+pipeline.py
+
+Structures raw tweet exports: prefilter → local model → cache → LLM → checkpoint log → CSV.
+
+Requests run concurrently through `async_extraction.AsyncExtractor`, throttled to the
+RPM/TPM quota in config.py. With BATCH_MODE several tweets share one prompt (see
+`extraction_prompt.py`). Inputs are streamed in chunks and may be several files or globs;
+each Tweet_ID is structured once. Reading, prefilter, local model and cache run a chunk at a
+time in a worker thread, and checkpoint writes (one fsync per chunk or batch) in a writer
+thread, so the event loop is left to the requests. Set OPENAI_API_BASE to a `fake_openai_server.py` URL to
+dry-run; the key is read from OPENAI_API_KEY.
+
+Large backfills can be split by Tweet_ID hash into shards (`run_shards` runs them in a
+process pool; `structure_tweets(..., shard=(i, n))` runs one, e.g. per machine). Each shard
+has its own checkpoint log and resumes on its own; `merge_shards` then writes one
+deduplicated output sorted by Tweet_ID (see `sharding.py`).
+
+After the prefilter, a local classifier trained on earlier LLM output answers tweets it is
+sure are not rumors (see `local_classifier.py`); with ENTITIES_REQUIRED = False it also
+answers confident rumors, without player or clubs.
+
+Latency, tokens, retries, fallbacks, cache hits and estimated cost are appended to
+METRICS_FILE while the run goes (and served for Prometheus if METRICS_PORT is set); a
+summary is printed at the end (see `pipeline_metrics.py`).
+"""
+
+import os
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from tqdm import tqdm
+
+from async_extraction import AsyncExtractor
+from checkpoint_log import CheckpointLog, compact, done_ids as logged_ids, import_csv_checkpoint
+from local_classifier import LocalGate, ensure_model
+from extraction_prompt import (
+    PROMPT_VERSION, batch_completion_tokens, build_batch_messages, build_messages,
+    default_record, parse_batch_content, parse_llm_content, plan_batches, validate_record
+)
+from pipeline_metrics import MetricsLog, PipelineMetrics, serve_metrics
+from prefilter import PrefilterStats
+from response_cache import ResponseCache
+from sharding import merge_logs, shard_path
+from tweet_ingest import iter_tweets
+
+from .config import (
+    BATCH_MODE, BATCH_TOKEN_BUDGET, CHECKPOINT_FILE, ENTITIES_REQUIRED, INGEST_CHUNK_SIZE,
+    LEGACY_CHECKPOINT_FILE, MAX_BATCH_SIZE, MAX_CONCURRENCY, METRICS_FILE, METRICS_INTERVAL,
+    METRICS_PORT, MODEL, OUTPUT_FILE, PREFILTER_MODE, REQUESTS_PER_MINUTE, RESOLVE_ENTITIES,
+    RESPONSE_CACHE_FILE, ROUTE_CHUNK_SIZE, TEMPERATURE, TOKENS_PER_MINUTE, USE_LOCAL_MODEL
+)
+
+# Deliveries to on_results allowed to queue behind the writer thread
+MAX_PENDING_WRITES = 8
+
+def cached_record(cache: ResponseCache, tweet_text: str):
+    # Entries written before replies were validated may not be records; those count as misses
+    cached = cache.get(tweet_text) if cache is not None else None
+    return validate_record(cached) if cached is not None else None
+
+def cached_records(cache: ResponseCache, tweet_texts: list, metrics: PipelineMetrics) -> list:
+    """`cached_record` for every text in one cache call."""
+    started = time.perf_counter()
+    records = [validate_record(c) if c is not None else None for c in cache.get_many(tweet_texts)]
+    metrics.observe_share("stage_seconds", time.perf_counter() - started, len(records), stage="cache")
+    for record in records:
+        metrics.inc("cache_lookups_total", result="miss" if record is None else "hit")
+    return records
+
+def llm_extract_entities(tweet_text: str, cache: ResponseCache = None) -> dict:
+    cached = cached_record(cache, tweet_text)
+    if cached is not None:
+        return cached
+
+    try:
+        import openai
+
+        response = openai.ChatCompletion.create(
+            model=MODEL,
+            messages=build_messages(tweet_text),
+            temperature=TEMPERATURE
+        )
+        content = response.choices[0].message["content"].strip()
+        parsed = parse_llm_content(content)
+        if parsed is not None:
+            if cache is not None:
+                cache.put(tweet_text, parsed)
+            return parsed
+    except Exception as e:
+        print("❌ LLM error:", e)
+
+    return default_record()
+
+async def llm_parse_async(extractor: AsyncExtractor, tweet_text: str):
+    """One tweet on its own: the validated record, or None (counted as a default-record fallback)."""
+    reason = "unparsed"
+    try:
+        content = await extractor.chat(build_messages(tweet_text))
+        parsed = parse_llm_content(content, extractor.metrics)
+        if parsed is not None:
+            return parsed
+    except Exception as e:
+        print("❌ LLM error:", e)
+        reason = type(e).__name__
+
+    extractor.metrics.inc("llm_default_records_total", reason=reason)
+    return None
+
+async def llm_extract_entities_async(extractor: AsyncExtractor, tweet_text: str,
+                                     cache: ResponseCache = None) -> dict:
+    parsed = await llm_parse_async(extractor, tweet_text)
+    if parsed is None:
+        return default_record()
+    if cache is not None:
+        await asyncio.to_thread(cache.put, tweet_text, parsed)
+    return parsed
+
+async def llm_extract_batch_async(extractor: AsyncExtractor, tweets: list,
+                                  cache: ResponseCache = None) -> dict:
+    """Extract a batch of (tweet_id, tweet_text) pairs, returning Tweet_ID -> record.
+
+    Elements that come back missing or malformed are retried one tweet at a time. Every
+    parsed record goes into the cache in one write, made off the event loop.
+    """
+    parsed = {}
+    if len(tweets) > 1:
+        metrics = extractor.metrics
+        metrics.inc("llm_batch_items_total", len(tweets))
+        try:
+            content = await extractor.chat(
+                build_batch_messages(tweets),
+                completion_tokens=batch_completion_tokens(tweets),
+                kind="batch"
+            )
+            parsed = parse_batch_content(content, [tweet_id for tweet_id, _ in tweets], metrics)
+        except Exception as e:
+            print("❌ LLM batch error:", e)
+        metrics.inc("llm_batch_items_retried_total", len(tweets) - len(parsed))
+
+    fresh = []
+    for tweet_id, text in tweets:
+        if tweet_id not in parsed:
+            record = await llm_parse_async(extractor, text)
+            if record is None:
+                # Fallbacks are never cached, so a rerun asks again
+                parsed[tweet_id] = default_record()
+                continue
+            parsed[tweet_id] = record
+        fresh.append((text, parsed[tweet_id]))
+    if cache is not None and fresh:
+        await asyncio.to_thread(cache.put_many, fresh)
+    return parsed
+
+def load_checkpoint(shard: tuple = None) -> set:
+    """Return the Tweet_IDs already finished, replaying the checkpoint log
+    (for a shard, also its own log)."""
+    if not os.path.exists(CHECKPOINT_FILE) and os.path.exists(LEGACY_CHECKPOINT_FILE):
+        imported = import_csv_checkpoint(LEGACY_CHECKPOINT_FILE, CHECKPOINT_FILE)
+        print(f"📦 Imported {imported} rows from {LEGACY_CHECKPOINT_FILE}")
+    done = logged_ids(CHECKPOINT_FILE)
+    if shard is not None:
+        done |= logged_ids(shard_path(CHECKPOINT_FILE, *shard))
+    return done
+
+def checkpoint_record(row, extracted, prefiltered=False, local=False) -> dict:
+    return {
+        "Tweet_ID": row["Tweet_ID"],
+        "Posted_Time": row.get("Posted_Time"),
+        "Raw_Tweet": row["Tweet_Content"],
+        "LooksLikeMove": row["LooksLikeMove"],
+        "Prefiltered": prefiltered,
+        "Local_Model": local,
+        **extracted
+    }
+
+async def structure_rows(rows, extractor: AsyncExtractor, gate: PrefilterStats, cache: ResponseCache,
+                         on_results, batch_mode=BATCH_MODE, batch_token_budget=BATCH_TOKEN_BUDGET,
+                         max_batch_size=MAX_BATCH_SIZE, local_gate: LocalGate = None,
+                         route_chunk_size=ROUTE_CHUNK_SIZE):
+    """Run raw tweet rows through prefilter → local model → cache → LLM.
+
+    `on_results(results)` gets lists of (row, record, prefiltered, local) tuples, each row
+    exactly once: a chunk's answered rows, then each LLM batch as it finishes. It runs in one
+    writer thread, one call at a time and in order, so it may block (fsync, disk writes).
+    Reading rows, the prefilter, the local model and the cache also run in a worker thread,
+    a chunk at a time; the event loop only sends requests.
+    Routing and per-tweet stage latency go to `extractor.metrics`.
+    """
+    metrics = extractor.metrics
+    loop = asyncio.get_running_loop()
+    rows = iter(rows)
+    pending = []
+
+    def route():
+        """Next chunk of rows: (answered results, rows for the LLM, whether rows remain)."""
+        answered, candidates, read = [], [], 0
+        for row in islice(rows, route_chunk_size):
+            read += 1
+            # Obvious non-transfer tweets get the null record without an API call...
+            with metrics.time("stage_seconds", stage="prefilter"):
+                row["LooksLikeMove"], allowed = gate.check(row["Tweet_Content"])
+            if not allowed:
+                metrics.inc("tweets_total", route="prefiltered")
+                answered.append((row, default_record(), True, False))
+                continue
+            # ...so do tweets the local model is confident about...
+            if local_gate is not None:
+                with metrics.time("stage_seconds", stage="local_model"):
+                    record = local_gate.record(row["Tweet_Content"])
+                if record is not None:
+                    metrics.inc("tweets_total", route="local_model")
+                    answered.append((row, record, False, True))
+                    continue
+            candidates.append(row)
+
+        # ...and tweets answered before under the same prompt come from the cache
+        cached = [None] * len(candidates)
+        if cache is not None and candidates:
+            cached = cached_records(cache, [row["Tweet_Content"] for row in candidates], metrics)
+        misses = []
+        for row, record in zip(candidates, cached):
+            if record is not None:
+                metrics.inc("tweets_total", route="cache")
+                answered.append((row, record, False, False))
+            else:
+                metrics.inc("tweets_total", route="llm")
+                misses.append(row)
+        return answered, misses, read == route_chunk_size
+
+    async def deliver(results):
+        pending.append(loop.run_in_executor(writer, on_results, results))
+        # Let the writer fall behind by a few deliveries, no more; errors surface here
+        while len(pending) > MAX_PENDING_WRITES or (pending and pending[0].done()):
+            await pending.pop(0)
+
+    async def extract_batch(batch):
+        return await llm_extract_batch_async(
+            extractor, [(row["Tweet_ID"], row["Tweet_Content"]) for row in batch], cache
+        )
+
+    async def on_batch_result(batch, extracted):
+        await deliver([(row, extracted[row["Tweet_ID"]], False, False) for row in batch])
+
+    async def batches():
+        more = True
+        while more:
+            answered, misses, more = await asyncio.to_thread(route)
+            if answered:
+                await deliver(answered)
+            if not batch_mode:
+                for row in misses:
+                    yield [row]
+                continue
+            # Batches are planned per chunk; only its last batch may be short
+            pairs = ((row, row["Tweet_Content"]) for row in misses)
+            for batch in plan_batches(pairs, batch_token_budget, max_batch_size):
+                yield [row for row, _ in batch]
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="structurer-writer") as writer:
+        await extractor.map(batches(), extract_batch, on_batch_result)
+        while pending:
+            await pending.pop(0)
+
+def structure_tweets(input_paths, shard=None, max_concurrency=MAX_CONCURRENCY,
+                     requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                     prefilter_mode=PREFILTER_MODE, batch_mode=BATCH_MODE,
+                     batch_token_budget=BATCH_TOKEN_BUDGET, max_batch_size=MAX_BATCH_SIZE,
+                     cache_file=RESPONSE_CACHE_FILE, chunk_size=INGEST_CHUNK_SIZE,
+                     use_local_model=USE_LOCAL_MODEL, entities_required=ENTITIES_REQUIRED):
+    """Structure every tweet in `input_paths` (files and/or globs), streaming them
+    through prefilter → local model → cache → LLM → checkpoint log.
+
+    With `shard` = (index, count) only that shard's tweets are structured, into its own log.
+    """
+    done_ids = load_checkpoint(shard)
+    checkpoint_file = shard_path(CHECKPOINT_FILE, *shard) if shard else CHECKPOINT_FILE
+    log = CheckpointLog(checkpoint_file)
+
+    gate = PrefilterStats(prefilter_mode)
+    local_gate = LocalGate(ensure_model(), entities_required) if use_local_model else None
+    cache = ResponseCache(cache_file, PROMPT_VERSION, MODEL, TEMPERATURE) if cache_file else None
+    metrics = PipelineMetrics(MODEL)
+    metrics_log = MetricsLog(metrics, shard_path(METRICS_FILE, *shard) if shard else METRICS_FILE, METRICS_INTERVAL)
+    metrics_port = METRICS_PORT + (shard[0] if shard else 0) if METRICS_PORT else None
+    metrics_server = serve_metrics(metrics, metrics_port) if metrics_port else None
+    extractor = AsyncExtractor(
+        model=MODEL,
+        temperature=TEMPERATURE,
+        max_concurrency=max_concurrency,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        metrics=metrics
+    )
+    progress = tqdm(
+        initial=len(done_ids) if not shard else 0, unit="tweet",
+        desc=f"shard {shard[0]}/{shard[1]}" if shard else None, position=shard[0] if shard else None
+    )
+
+    def on_results(results):
+        started = time.perf_counter()
+        log.append_many([checkpoint_record(*result) for result in results])
+        metrics.observe_share("stage_seconds", time.perf_counter() - started, len(results), stage="checkpoint")
+        progress.update(len(results))
+
+    rows = iter_tweets(input_paths, chunksize=chunk_size, skip_ids=done_ids, shard=shard)
+    try:
+        asyncio.run(structure_rows(
+            rows, extractor, gate, cache, on_results, batch_mode, batch_token_budget, max_batch_size,
+            local_gate
+        ))
+    finally:
+        progress.close()
+        log.close()
+        metrics_log.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        print(gate.report())
+        if local_gate is not None:
+            print(local_gate.report())
+        if cache is not None:
+            print(cache.report())
+            cache.close()
+        print(metrics.report())
+
+def run_shards(input_paths, shards: int, **options):
+    """Structure all `shards` shards in parallel worker processes.
+
+    The account's RPM/TPM quota is split evenly between them.
+    """
+    # Done once here, not by every worker at the same time
+    load_checkpoint()
+    if options.get("use_local_model", USE_LOCAL_MODEL):
+        ensure_model()
+    options["requests_per_minute"] = options.get("requests_per_minute", REQUESTS_PER_MINUTE) / shards
+    options["tokens_per_minute"] = options.get("tokens_per_minute", TOKENS_PER_MINUTE) / shards
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(structure_tweets, input_paths, (i, shards), **options) for i in range(shards)]
+        for future in futures:
+            future.result()
+
+def merge_shards(shards: int) -> int:
+    """Merge the main log and every shard log into OUTPUT_FILE (sorted by Tweet_ID)."""
+    logs = [CHECKPOINT_FILE] + [shard_path(CHECKPOINT_FILE, i, shards) for i in range(shards)]
+    return merge_logs(logs, OUTPUT_FILE)
+
+def publish_output(rows: int):
+    # Only needed once the CSV is written, so not imported by runs that never get there
+    from entity_resolution import resolve_file
+    from rumor_store import csv_to_store
+
+    print(f"✅ Full dataset ({rows} tweets) saved to {OUTPUT_FILE}")
+    if RESOLVE_ENTITIES:
+        resolve_file(OUTPUT_FILE, OUTPUT_FILE)
+    print(f"✅ Columnar copy saved to {csv_to_store(OUTPUT_FILE)}")
+
+def compact_output(shards: int = 1) -> int:
+    """Write OUTPUT_FILE from the checkpoint log (merged with `shards` shard logs if > 1)
+    and publish it; returns its row count."""
+    rows = merge_shards(shards) if shards > 1 else compact(CHECKPOINT_FILE, OUTPUT_FILE)
+    publish_output(rows)
+    return rows
+
+def process_all_tweets(input_paths, shards: int = 1, **options):
+    """Structure `input_paths` (in `shards` parallel shards) and write OUTPUT_FILE.
+
+    `options` are passed on to `structure_tweets`.
+    """
+    if shards > 1:
+        run_shards(input_paths, shards, **options)
+    else:
+        structure_tweets(input_paths, **options)
+    compact_output(shards)
@@ -0,0 +1,61 @@
+"""
+sample.py
+
+Quick, clean test run: a balanced sample of rumor-looking and other tweets, structured one
+request at a time with the shared prompt (no checkpoint, cache or prefilter).
+"""
+
+import random
+import time
+
+import pandas as pd
+from tqdm import tqdm
+
+from prefilter import tag_looks_like_move
+from tweet_ingest import iter_tweets
+
+from .config import OUTPUT_FILE
+from .pipeline import llm_extract_entities
+
+# Pause between requests, to stay far below any rate limit
+REQUEST_PAUSE = 1.0
+
+
+# Sample 10 rumors + 10 non-rumors for balanced LLM test
+# Reservoir sampling over the tweet stream, so the export is never loaded whole
+def sample_mixed_tweets(tweets, rumor_count=10, non_rumor_count=10, seed=42):
+    rng = random.Random(seed)
+    wanted = {True: rumor_count, False: non_rumor_count}
+    reservoirs = {True: [], False: []}
+    seen = {True: 0, False: 0}
+    for tweet in tweets:
+        tweet["LooksLikeMove"] = tag_looks_like_move(tweet["Tweet_Content"])
+        key = tweet["LooksLikeMove"]
+        seen[key] += 1
+        if len(reservoirs[key]) < wanted[key]:
+            reservoirs[key].append(tweet)
+        else:
+            slot = rng.randrange(seen[key])
+            if slot < wanted[key]:
+                reservoirs[key][slot] = tweet
+    return reservoirs[True] + reservoirs[False]
+
+
+def process_sample(input_paths, output_csv_path=OUTPUT_FILE, rumor_count=10, non_rumor_count=10,
+                   pause=REQUEST_PAUSE):
+    # Sample for LLM processing (regex tagging happens while streaming)
+    sample = sample_mixed_tweets(iter_tweets(input_paths), rumor_count, non_rumor_count)
+
+    results = []
+    for row in tqdm(sample):
+        tweet = row["Tweet_Content"]
+        results.append({
+            "Tweet_ID": row.get("Tweet_ID", None),
+            "Raw_Tweet": tweet,
+            "LooksLikeMove": row["LooksLikeMove"],
+            **llm_extract_entities(tweet)
+        })
+        time.sleep(pause)
+
+    pd.DataFrame(results).to_csv(output_csv_path, index=False)
+    print(f"✅ Saved structured data to {output_csv_path}")
@@ -0,0 +1,137 @@
+"""
+status.py
+
+Run manifest and progress report, without loading the pipeline (stdlib only).
+- `start_run` / `finish_run`: what the last `run` was asked to do, kept in RUN_FILE so
+  `resume` can repeat it
+- `format_status`: that run, records in the checkpoint log and each shard log, whether the
+  output CSV is behind the logs, and the last metrics snapshot of the run and each shard
+"""
+
+import glob
+import json
+import os
+import re
+import time
+
+from .config import CHECKPOINT_FILE, METRICS_FILE, OUTPUT_FILE, RUN_FILE
+
+READ_CHUNK = 1 << 20
+ROUTE_RE = re.compile(r'^tweets_total\{route="([^"]+)"\}$')
+
+
+def start_run(command: dict, path: str = RUN_FILE) -> dict:
+    run = {**command, "started": time.time(), "finished": None, "pid": os.getpid()}
+    _write(run, path)
+    return run
+
+
+def finish_run(run: dict, path: str = RUN_FILE):
+    run["finished"] = time.time()
+    _write(run, path)
+
+
+def read_run(path: str = RUN_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(run: dict, path: str):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(run, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def count_lines(path: str) -> int:
+    """Complete lines in `path`, read in 1MB blocks (no JSON parsing)."""
+    count = 0
+    with open(path, "rb") as f:
+        while block := f.read(READ_CHUNK):
+            count += block.count(b"\n")
+    return count
+
+
+def last_line(path: str, tail: int = 1 << 16):
+    """Last complete line of `path`, or None."""
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - tail))
+        lines = f.read().split(b"\n")
+    complete = [line for line in lines[:-1] if line.strip()]
+    return complete[-1].decode("utf-8") if complete else None
+
+
+def shard_logs(path: str = CHECKPOINT_FILE) -> list:
+    # Per-shard files of `path`, named as by sharding.shard_path (checkpoint.shard-03-of-08.jsonl)
+    root, ext = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(root)}.shard-*-of-*{ext}"))
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def _age(timestamp: float) -> str:
+    seconds = max(0, time.time() - timestamp)
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.0f}{unit} ago"
+    return f"{seconds:.0f}s ago"
+
+
+def _describe_log(path: str) -> str:
+    return f"{count_lines(path):,} records ({os.path.getsize(path) / 1e6:.1f} MB, updated {_age(os.path.getmtime(path))})"
+
+
+def format_status(run_path: str = RUN_FILE, checkpoint_file: str = CHECKPOINT_FILE,
+                  output_file: str = OUTPUT_FILE, metrics_file: str = METRICS_FILE) -> str:
+    lines = []
+    run = read_run(run_path)
+    if run is None:
+        lines.append("📋 No run recorded yet (start one with `run`)")
+    else:
+        if run.get("finished"):
+            state = f"✅ finished {_age(run['finished'])}"
+        elif _pid_alive(run.get("pid")):
+            state = f"⏳ running (pid {run['pid']})"
+        else:
+            state = "⚠️ interrupted, `resume` continues it"
+        shard = run.get("shard")
+        layout = f"shard {shard[0]}/{shard[1]}" if shard else f"{run.get('shards', 1)} shard(s)"
+        lines.append(f"📋 Last run: started {_age(run['started'])}, {state}; {layout}; inputs: {', '.join(run['inputs'])}")
+
+    logs = [path for path in [checkpoint_file] + shard_logs(checkpoint_file) if os.path.exists(path)]
+    if not logs:
+        lines.append(f"📝 No checkpoint log ({checkpoint_file})")
+    for path in logs:
+        lines.append(f"📝 {path}: {_describe_log(path)}")
+
+    if os.path.exists(output_file):
+        written = os.path.getmtime(output_file)
+        behind = any(os.path.getmtime(path) > written for path in logs)
+        lines.append(f"📄 {output_file}: written {_age(written)}"
+                     + (" — older than the checkpoint log, `compact` to refresh it" if behind else ""))
+    elif logs:
+        lines.append(f"📄 {output_file} not written yet (`compact` writes it)")
+
+    for path in [metrics_file] + shard_logs(metrics_file):
+        snapshot = last_line(path) if os.path.exists(path) else None
+        if not snapshot:
+            continue
+        metrics = json.loads(snapshot)
+        routes = {}
+        for series, value in metrics.get("counters", {}).items():
+            match = ROUTE_RE.match(series)
+            if match:
+                routes[match.group(1)] = value
+        lines.append(
+            f"📊 {path} ({_age(metrics['time'])}): {metrics['elapsed_s']:.0f}s elapsed, "
+            + "".join(f"{value:.0f} {route}, " for route, value in sorted(routes.items()))
+            + f"~${metrics['cost_usd']:.4f}"
+        )
+    return "\n".join(lines)
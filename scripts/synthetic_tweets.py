@@ -0,0 +1,222 @@
+"""
+synthetic_tweets.py
+
+Fabrizio-style tweets at any scale, for benchmarks and dry runs.
+- `synth_tweet(number)`: one tweet and the record a perfect extractor would return for it
+- `write_tweets`: a raw export (Tweet_ID, Posted_Time, Tweet_Content) in the ingest format
+- `rumor_table`: the same tweets as a dashboard table (v2 schema)
+- `responder`: plugs into fake_openai_server.make_app so batch prompts get the true records back
+
+Every tweet is a pure function of (seed, number): nothing is kept in memory, and the fake
+backend can rebuild the answer for a Tweet_ID on its own. Players come from the roster, padded
+with made-up names so larger runs have more distinct rumor threads.
+
+Usage:
+    python scripts/synthetic_tweets.py 100000 -o synthetic_tweets.csv
+"""
+
+import argparse
+import json
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import pandas as pd
+
+from entity_resolution import load_aliases, load_roster
+from extraction_prompt import default_record
+
+# Synthetic Tweet_IDs are TWEET_ID_BASE + number
+TWEET_ID_BASE = 1900000000000000000
+START_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+# Mean gap between consecutive tweets
+MEAN_GAP_MINUTES = 20
+# Share of tweets that are about a transfer at all
+RUMOR_SHARE = 0.6
+# About this many tweets per distinct player, once the roster runs out
+TWEETS_PER_PLAYER = 20
+
+COACHES = [
+    "Enzo Maresca", "Rúben Amorim", "Arne Slot", "Mikel Arteta", "Pep Guardiola",
+    "Hansi Flick", "Carlo Ancelotti", "Xabi Alonso", "Thomas Frank", "Antonio Conte",
+]
+EMOJIS = ["🚨", "🚨🔴", "🔵", "⚪️", "🟡", "🔴⚫️", "🇧🇷", "🇪🇸", "🏴", "✅", "⏳", "🔥"]
+
+# (tweet template, LLM status, dashboard status, typical certainty)
+RUMOR_TEMPLATES = [
+    ("Here we go! {player} to {to}, deal agreed with {from_club} for €{fee}m fee. Contract until June {year}. 🤝",
+     "Here we go", "here we go", 0.95),
+    ("{to} are in advanced talks with {from_club} for {player}. Negotiations ongoing on the structure of the fee.",
+     "Agreement", "advanced talks", 0.7),
+    ("{to} have contacted {player}'s agents. Initial talks only, {from_club} want around €{fee}m.",
+     "Contact", "negotiations ongoing", 0.45),
+    ("Understand {to} submitted an official bid for {player}: €{fee}m plus add-ons. {from_club} are considering it.",
+     "Bid", "deal agreed", 0.6),
+    ("Exclusive: {player} has agreed personal terms with {to}. Clubs still negotiating, {from_club} hold out for €{fee}m. ⏳",
+     "Agreement", "personal terms agreed", 0.75),
+    ("{to} are keen on {player} as top target for the summer. No bid yet to {from_club}.",
+     "Link", "interest", 0.3),
+    ("{player} is on {to} shortlist, {from_club} would only sell for €{fee}m.",
+     "Link", "targeted", 0.25),
+    ("{player} joins {to} on loan from {from_club} with buy option at €{fee}m. Official, documents signed. ✍🏻",
+     "Here we go", "official", 1.0),
+    ("{player} leaves {from_club} as planned: agreement done with {to} for €{fee}m. Medical booked.",
+     "Here we go", "confirmed exit", 0.9),
+    ("{from_club} reject {to} proposal for {player}. €{fee}m not enough, deal off for now. ❌",
+     "Deal off", "rejected", 0.15),
+]
+
+# (tweet template) — no transfer in them; the extractor returns the null record
+OTHER_TEMPLATES = [
+    "{coach}: “We played well and we deserve more. Now we focus on the next game”.",
+    "⚽️ {player} scores again for {club} — {goals} goals in his last {games} games.",
+    "🏆 {club} win the title! Congratulations to everyone at the club.",
+    "{player} injury update: out for {goals} weeks, {club} medical staff say.",
+    "{coach} on {player}: “He’s a fantastic player, very important for us”.",
+    "Full time: {club} {goals}-{games} {club2}. Big night at the stadium.",
+]
+
+STATUS_REASONS = {
+    "here we go": "Deal done language",
+    "official": "Club announcement",
+    "confirmed exit": "Departure confirmed",
+    "rejected": "Bid rejected",
+}
+
+
+@lru_cache(maxsize=None)
+def _clubs() -> tuple:
+    return tuple(load_aliases()["clubs"])
+
+
+@lru_cache(maxsize=4)
+def _players(pool_size: int, seed: int) -> tuple:
+    """(name, market value) for `pool_size` players: the roster first, then made-up names."""
+    roster = load_roster()
+    players = list(zip(roster["name"], roster["market_value_eur"].fillna(0.0).astype(float).tolist()))
+    rng = random.Random(seed)
+    first = [name.split()[0] for name, _ in players if " " in name]
+    last = [name.split()[-1] for name, _ in players if " " in name]
+    names = {name for name, _ in players}
+    while len(players) < pool_size:
+        name = f"{rng.choice(first)} {rng.choice(last)}"
+        if name not in names:
+            names.add(name)
+            players.append((name, float(round(rng.lognormvariate(16, 1.2), -5))))
+    return tuple(players)
+
+
+def player_pool_size(n: int) -> int:
+    return max(len(load_roster()), n // TWEETS_PER_PLAYER)
+
+
+def synth_tweet(number: int, seed: int = 0, pool_size: int = 0) -> dict:
+    """Tweet `number` of a synthetic export, with its true extraction under "record"."""
+    rng = random.Random(seed * 1000003 + number)
+    players = _players(pool_size, seed)
+    player, value = rng.choice(players)
+    clubs = _clubs()
+    from_club, to = rng.sample(clubs, 2)
+    # Timestamps grow with `number`, with jitter that keeps them ordered
+    minutes = number * MEAN_GAP_MINUTES + rng.random() * MEAN_GAP_MINUTES
+    tweet = {
+        "Tweet_ID": TWEET_ID_BASE + number,
+        "Posted_Time": START_TIME + timedelta(seconds=int(minutes * 60)),
+    }
+
+    if rng.random() < RUMOR_SHARE:
+        template, llm_status, status, certainty = rng.choice(RUMOR_TEMPLATES)
+        text = template.format(
+            player=player, from_club=from_club, to=to,
+            fee=rng.choice([5, 8, 12, 15, 20, 25, 30, 40, 45, 50, 60, 70, 80, 100]),
+            year=rng.choice([2027, 2028, 2029, 2030]),
+        )
+        certainty = min(1.0, max(0.0, round(certainty + rng.uniform(-0.1, 0.1), 2)))
+        record = {
+            "Player": player,
+            "From_Club": from_club,
+            "To_Club": to,
+            "Status": llm_status,
+            "Certainty_Score": certainty,
+            "LooksLikeMove_LLM": True,
+            "From_Club_Guess": from_club,
+            "To_Club_Guess": to,
+        }
+        row = {
+            "player": player, "origin_club": from_club, "destination_club": to, "status": status,
+            "certainty_score": certainty, "is_transfer_rumor": True,
+            "reason": STATUS_REASONS.get(status, "Transfer talks reported"),
+        }
+    else:
+        text = rng.choice(OTHER_TEMPLATES).format(
+            player=player, coach=rng.choice(COACHES), club=from_club, club2=to,
+            goals=rng.randint(1, 6), games=rng.randint(2, 9),
+        )
+        record = default_record()
+        row = {
+            "player": None, "origin_club": None, "destination_club": None, "status": None,
+            "certainty_score": 0.0, "is_transfer_rumor": False, "reason": "No transfer context in tweet",
+        }
+
+    tweet["Tweet_Content"] = f"{rng.choice(EMOJIS)} {text}"
+    tweet["record"] = record
+    tweet["row"] = {**row, "tweet_text": tweet["Tweet_Content"], "market_value_eur": value if row["player"] else None}
+    return tweet
+
+
+def iter_synth_tweets(n: int, seed: int = 0):
+    pool_size = player_pool_size(n)
+    for number in range(n):
+        yield synth_tweet(number, seed, pool_size)
+
+
+def write_tweets(path: str, n: int, seed: int = 0, chunk_size: int = 50000) -> str:
+    """Write `n` synthetic tweets as a raw export at `path`, in chunks."""
+    chunk = []
+    written = 0
+    for tweet in iter_synth_tweets(n, seed):
+        chunk.append({"Tweet_ID": tweet["Tweet_ID"], "Posted_Time": tweet["Posted_Time"],
+                      "Tweet_Content": tweet["Tweet_Content"]})
+        if len(chunk) == chunk_size or written + len(chunk) == n:
+            pd.DataFrame(chunk).to_csv(path, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+            chunk = []
+    if not written:
+        pd.DataFrame(columns=["Tweet_ID", "Posted_Time", "Tweet_Content"]).to_csv(path, index=False)
+    return path
+
+
+def rumor_table(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` synthetic tweets in the dashboard (v2) schema."""
+    return pd.DataFrame([tweet["row"] for tweet in iter_synth_tweets(n, seed)])
+
+
+def responder(seed: int = 0, pool_size: int = 0):
+    """A fake_openai_server responder that answers batch prompts with the true records.
+
+    Single-tweet prompts carry no Tweet_ID, so they get the canned null record.
+    """
+    def reply(messages: list) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        tweet_ids = re.findall(r"^Tweet_ID: (\d+)$", prompt, flags=re.MULTILINE)
+        if not tweet_ids:
+            return json.dumps(default_record())
+        records = []
+        for tweet_id in tweet_ids:
+            record = synth_tweet(int(tweet_id) - TWEET_ID_BASE, seed, pool_size)["record"]
+            records.append({"Tweet_ID": tweet_id, **record})
+        return json.dumps(records, ensure_ascii=False)
+
+    return reply
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic raw tweet export")
+    parser.add_argument("n", type=int, help="number of tweets")
+    parser.add_argument("-o", "--output", default="synthetic_tweets.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_tweets(args.output, args.n, args.seed)
+    print(f"✅ {args.n} synthetic tweets → {args.output}")
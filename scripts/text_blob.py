@@ -0,0 +1,91 @@
+"""
+text_blob.py
+
+Long text columns (tweet_text, reason) stored out of line from the rumor table.
+- One UTF-8 blob per column plus an int64 (start, length) span per row, both memory-mapped,
+  so the text costs page cache (shared by every process) rather than per-session heap
+- `TextBlob.get(rows)` decodes only the rows asked for, e.g. the visible table page
+- `ensure_text_blobs` (re)builds the blobs next to a Parquet store when they are missing
+  or older than the store
+
+Layout for data/rumors.parquet:
+    data/rumors.text/tweet_text.bin         concatenated UTF-8
+    data/rumors.text/tweet_text.spans.npy   (start, length) per row; length -1 is missing
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+TEXT_COLUMNS = ["tweet_text", "reason", "Tweet_Content", "Reason"]
+MISSING = -1
+
+
+def blob_dir(store_path: str) -> str:
+    return os.path.splitext(store_path)[0] + ".text"
+
+
+def write_text_blob(values: pd.Series, path: str):
+    """Write `values` as `path` (.bin) and its spans file, atomically per file."""
+    spans = np.empty((len(values), 2), dtype=np.int64)
+    offset = 0
+    with open(path + ".tmp", "wb") as f:
+        for i, value in enumerate(values.tolist()):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                spans[i] = offset, MISSING
+                continue
+            data = str(value).encode("utf-8")
+            f.write(data)
+            spans[i] = offset, len(data)
+            offset += len(data)
+    # np.save appends .npy to names without it, so keep the suffix last
+    spans_tmp = path + ".spans.tmp.npy"
+    np.save(spans_tmp, spans)
+    os.replace(path + ".tmp", path)
+    os.replace(spans_tmp, spans_path(path))
+
+
+def spans_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".spans.npy"
+
+
+class TextBlob:
+    """Read-only view of one text column written by `write_text_blob`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.spans = np.load(spans_path(path), mmap_mode="r")
+        # An empty file can't be memory-mapped (every value is missing or "")
+        size = os.path.getsize(path)
+        self.data = np.memmap(path, dtype=np.uint8, mode="r") if size else np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def get(self, rows) -> list:
+        """Text of each row in `rows` (None where missing)."""
+        values = []
+        for start, length in self.spans[np.asarray(rows, dtype=np.intp)].tolist():
+            values.append(None if length == MISSING else self.data[start:start + length].tobytes().decode("utf-8"))
+        return values
+
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.spans.nbytes
+
+
+def ensure_text_blobs(store_path: str, columns: list) -> dict:
+    """{column: TextBlob} for `columns` of a Parquet store, rebuilding stale blobs first."""
+    directory = blob_dir(store_path)
+    stale = []
+    for column in columns:
+        path = os.path.join(directory, column + ".bin")
+        if not os.path.exists(spans_path(path)) or os.path.getmtime(spans_path(path)) < os.path.getmtime(store_path):
+            stale.append(column)
+    if stale:
+        os.makedirs(directory, exist_ok=True)
+        table = pq.read_table(store_path, columns=stale, memory_map=True)
+        for column in stale:
+            write_text_blob(table.column(column).to_pandas(), os.path.join(directory, column + ".bin"))
+    return {column: TextBlob(os.path.join(directory, column + ".bin")) for column in columns}
@@ -0,0 +1,230 @@
+"""
+text_search.py
+
+Full-text search over tweet_text and reason for the dashboards.
+- `tokenize`: lowercased, accent-folded (Mbappé → mbappe) word tokens; emojis and punctuation
+  are dropped
+- `TextIndex`: inverted index token -> sorted row ids, plus adjacent word pairs so phrases
+  are answered from the index too. `search` intersects posting lists, smallest first, and
+  returns sorted row positions that can be passed to `RumorIndex.query(within=...)`
+- `append` indexes new rows incrementally (e.g. parts published by live_tail.py)
+- `ensure_search_index` (re)builds the on-disk index next to a Parquet store's text blobs;
+  loading memory-maps it, so the postings are shared page cache, not per-process heap
+
+Query syntax:
+    release clause          rows containing both words (any order, either column)
+    "release clause"        the words next to each other, in order, in the same column
+    mbap*                   any word starting with "mbap" (at least 2 characters)
+
+Layout for data/rumors.parquet:
+    data/rumors.text/search.vocab.txt       sorted tokens and word pairs, one per line
+    data/rumors.text/search.offsets.npy     int64, postings of token i are [offsets[i], offsets[i + 1])
+    data/rumors.text/search.postings.npy    int32 row ids, sorted within each token
+"""
+
+import bisect
+import os
+import re
+import unicodedata
+from array import array
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from text_blob import TEXT_COLUMNS, blob_dir
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+# Combining diacritics left over by NFKD (é → e + U+0301), from the combining-mark blocks
+# used with Latin, Greek and Cyrillic; one regex pass is far faster than checking
+# unicodedata.combining per character
+COMBINING_BLOCKS = [(0x0300, 0x036F), (0x1AB0, 0x1AFF), (0x1DC0, 0x1DFF), (0x20D0, 0x20FF), (0xFE20, 0xFE2F)]
+COMBINING_RE = re.compile("[" + "".join(
+    chr(c) for lo, hi in COMBINING_BLOCKS for c in range(lo, hi + 1) if unicodedata.combining(chr(c))
+) + "]")
+# Pair tokens sort before every word, so prefix ranges over the vocab never include them
+PAIR_MARK = "\x01"
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+MIN_PREFIX = 2
+INDEX_FILES = ("search.vocab.txt", "search.offsets.npy", "search.postings.npy")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents; ASCII text skips the Unicode normalization."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    return COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+
+def tokenize(text) -> list:
+    if not isinstance(text, str):
+        return []
+    return TOKEN_RE.findall(fold(text))
+
+
+def parse_query(query: str) -> tuple:
+    """(single tokens, phrases, prefixes). A word that splits into several tokens (N'Golo) is a phrase."""
+    terms, phrases, prefixes = [], [], []
+    for phrase, word in QUERY_RE.findall(query):
+        if word.endswith("*"):
+            tokens = tokenize(word[:-1])
+            if len(tokens) == 1 and len(tokens[0]) >= MIN_PREFIX:
+                prefixes.append(tokens[0])
+                continue
+            word = word[:-1]
+        tokens = tokenize(phrase or word)
+        if len(tokens) == 1:
+            terms.append(tokens[0])
+        elif tokens:
+            phrases.append(tokens)
+    return terms, phrases, prefixes
+
+
+def _pairs(tokens: list) -> list:
+    return [f"{PAIR_MARK}{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def index_tokens(texts) -> set:
+    """Words and adjacent word pairs of one row's texts (pairs never span two columns)."""
+    tokens = set()
+    for text in texts:
+        words = tokenize(text)
+        tokens.update(words)
+        tokens.update(_pairs(words))
+    return tokens
+
+
+class TextIndex:
+    """Inverted index over one or more text columns; rows are positions in the indexed table."""
+
+    def __init__(self, vocab: list = None, offsets: np.ndarray = None, postings: np.ndarray = None,
+                 size: int = 0):
+        # Built part (sorted vocab, CSR postings) plus rows appended since, kept as plain lists
+        self.vocab = vocab or []
+        self.token_ids = {token: i for i, token in enumerate(self.vocab)}
+        self.offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self.postings = postings if postings is not None else np.empty(0, dtype=np.int32)
+        self.pending = {}
+        self.size = size
+
+    def append(self, *columns):
+        """Index the next rows; `columns` are equal-length sequences of text (one per column)."""
+        for texts in zip(*columns):
+            row = self.size
+            for token in index_tokens(texts):
+                self.pending.setdefault(token, []).append(row)
+            self.size += 1
+
+    def rows(self, token: str) -> np.ndarray:
+        """Sorted row ids containing `token`."""
+        built = np.empty(0, dtype=np.int32)
+        i = self.token_ids.get(token)
+        if i is not None:
+            built = self.postings[self.offsets[i]:self.offsets[i + 1]]
+        pending = self.pending.get(token)
+        if not pending:
+            return np.asarray(built)
+        # Appended rows all come after the built ones, so this stays sorted
+        return np.concatenate([built, np.asarray(pending, dtype=np.int32)])
+
+    def prefix_rows(self, prefix: str) -> np.ndarray:
+        """Sorted row ids containing any token starting with `prefix`."""
+        lo = bisect.bisect_left(self.vocab, prefix)
+        hi = bisect.bisect_left(self.vocab, prefix + "\U0010ffff")
+        parts = [self.postings[self.offsets[lo]:self.offsets[hi]]]
+        parts += [np.asarray(rows, dtype=np.int32) for token, rows in self.pending.items() if token.startswith(prefix)]
+        return np.unique(np.concatenate(parts))
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted row positions matching every term, phrase and prefix of `query`.
+
+        A phrase matches rows holding each of its adjacent word pairs in one column, which
+        is exact for two words and, for longer phrases, all but always the phrase itself.
+        """
+        terms, phrases, prefixes = parse_query(query)
+        if not (terms or phrases or prefixes):
+            return np.arange(self.size)
+        tokens = set(terms) | {pair for phrase in phrases for pair in _pairs(phrase)}
+        candidates = [self.rows(token) for token in tokens] + [self.prefix_rows(p) for p in prefixes]
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return np.asarray(result, dtype=np.intp)
+
+    def save(self, directory: str):
+        """Write the index (appended rows included) as sorted vocab + CSR postings."""
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        paths = [os.path.join(directory, name) for name in INDEX_FILES]
+        with open(paths[0] + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(token + "\n" for token in self.vocab)
+        np.save(paths[1] + ".tmp.npy", self.offsets)
+        np.save(paths[2] + ".tmp.npy", self.postings)
+        os.replace(paths[0] + ".tmp", paths[0])
+        os.replace(paths[1] + ".tmp.npy", paths[1])
+        os.replace(paths[2] + ".tmp.npy", paths[2])
+
+    def compact(self):
+        """Fold appended rows into the sorted vocab and CSR arrays."""
+        if not self.pending:
+            return
+        vocab = sorted(set(self.vocab) | set(self.pending))
+        parts = [self.rows(token) for token in vocab]
+        self.offsets = np.concatenate([[0], np.cumsum([len(rows) for rows in parts])]).astype(np.int64)
+        self.postings = np.concatenate(parts).astype(np.int32)
+        self.vocab = vocab
+        self.token_ids = {token: i for i, token in enumerate(vocab)}
+        self.pending = {}
+
+    @classmethod
+    def build(cls, *columns) -> "TextIndex":
+        """Index equal-length text columns from scratch."""
+        # (token id, row) pairs in flat int arrays: a Python list per token would cost
+        # far more memory than the postings themselves at millions of rows
+        ids, pair_tokens, pair_rows = {}, array("i"), array("i")
+        size = 0
+        for texts in zip(*columns):
+            tokens = index_tokens(texts)
+            for token in tokens:
+                pair_tokens.append(ids.setdefault(token, len(ids)))
+            pair_rows.extend([size] * len(tokens))
+            size += 1
+
+        vocab = sorted(ids)
+        # Renumber tokens in vocab order, then sort pairs by token (rows stay ascending)
+        remap = np.empty(len(ids), dtype=np.int32)
+        remap[[ids[token] for token in vocab]] = np.arange(len(vocab), dtype=np.int32)
+        token_ids = remap[np.frombuffer(pair_tokens, dtype=np.int32)]
+        order = np.argsort(token_ids, kind="stable")
+        counts = np.bincount(token_ids, minlength=len(vocab))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        postings = np.frombuffer(pair_rows, dtype=np.int32)[order]
+        return cls(vocab, offsets, postings, size)
+
+    @classmethod
+    def load(cls, directory: str, size: int) -> "TextIndex":
+        paths = [os.path.join(directory, name) for name in INDEX_FILES]
+        with open(paths[0], encoding="utf-8") as f:
+            vocab = f.read().split("\n")[:-1]
+        return cls(vocab, np.load(paths[1], mmap_mode="r"), np.load(paths[2], mmap_mode="r"), size)
+
+
+def search_columns(store_path: str) -> list:
+    """The store's text columns; the index covers all of them, whatever a view loads."""
+    names = pq.read_schema(store_path).names
+    return [c for c in TEXT_COLUMNS if c in names]
+
+
+def ensure_search_index(store_path: str) -> TextIndex:
+    """TextIndex over a Parquet store's text columns, rebuilt first if missing or older than the store."""
+    directory = blob_dir(store_path)
+    columns = search_columns(store_path)
+    size = pq.read_metadata(store_path).num_rows
+    marker = os.path.join(directory, INDEX_FILES[-1])
+    if not os.path.exists(marker) or os.path.getmtime(marker) < os.path.getmtime(store_path):
+        table = pq.read_table(store_path, columns=columns, memory_map=True)
+        TextIndex.build(*(table.column(c).to_pylist() for c in columns)).save(directory)
+    return TextIndex.load(directory, size)
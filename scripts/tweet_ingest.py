@@ -0,0 +1,63 @@
+"""
+tweet_ingest.py
+
+Streaming reader for raw tweet exports (Tweet_ID, Posted_Time, Tweet_Content).
+- Accepts several files and/or glob patterns, e.g. "data/Fabrizio *.csv"
+- Reads each file in chunks, so memory stays bounded whatever the archive size
+- Yields each Tweet_ID once across all inputs (first occurrence wins)
+- Optionally only the tweets of one shard (see sharding.py)
+"""
+
+import glob
+import os
+
+import pandas as pd
+
+from sharding import shard_of
+
+COLUMNS = ["Tweet_ID", "Posted_Time", "Tweet_Content"]
+
+
+def expand_inputs(paths) -> list:
+    """Resolve file paths and glob patterns into a sorted, de-duplicated file list."""
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for pattern in paths:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No input files match {pattern!r}")
+        for path in matches:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def iter_tweets(paths, chunksize: int = 5000, skip_ids=None, shard: tuple = None):
+    """Yield one dict per unique tweet across `paths`, skipping IDs in `skip_ids`.
+
+    `shard` = (index, count) keeps only the tweets that belong to that shard.
+    """
+    seen = set(skip_ids) if skip_ids else set()
+    for path in expand_inputs(paths):
+        reader = pd.read_csv(
+            path,
+            usecols=lambda c: c in COLUMNS,
+            dtype={"Tweet_ID": "Int64", "Tweet_Content": str},
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            chunk = chunk.dropna(subset=["Tweet_ID"])
+            if shard is not None:
+                chunk = chunk[shard_of(chunk["Tweet_ID"].to_numpy("int64"), shard[1]) == shard[0]]
+            for tweet in chunk.to_dict(orient="records"):
+                tweet_id = int(tweet["Tweet_ID"])
+                if tweet_id in seen:
+                    continue
+                seen.add(tweet_id)
+                text = tweet.get("Tweet_Content")
+                tweet["Tweet_ID"] = tweet_id
+                tweet["Tweet_Content"] = text if isinstance(text, str) else ""
+                yield tweet